@@ -17,14 +17,22 @@ import time
 import tkinter as tk
 import subprocess as sp
 import threading as thrd
-from queue import Queue
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscAdaptiveRate
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscPublisher
+from CpscInterfaces import CpscRingBuffer
+from CpscInterfaces import CpscScheduler
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscUiDispatcher
 
 # Create GUI window
 window = tk.Tk()
 
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
+
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
 window.iconphoto(False, p1)
@@ -99,8 +107,6 @@ parList[3][3] = tk.IntVar()          # Show commands toggle
 parList[3][3].set(False)
 parList[3][5] = tk.IntVar()          # OEM toggle
 parList[3][5].set(False)
-parList[3][6] = tk.IntVar()          # Command lock
-parList[3][6].set(False)
 
 
 # Setup text DRIVE labels
@@ -129,9 +135,9 @@ oemList[0][0] = tk.Label(text="OEM Enable: ",master=frm2)
 oemList[1][0] = tk.Label(text="CH1 counter: ",master=frm2) 
 #oemList[2][0] = tk.Label(text="CH2 counter: ",master=frm2) 
 #oemList[3][0] = tk.Label(text="CH3 counter: ",master=frm2) 
-oemList[1][1] = tk.Label(text="0", width = 6, master=frm2) 
-oemList[2][1] = tk.Label(text="0", width = 6, master=frm2) 
-oemList[3][1] = tk.Label(text="0", width = 6, master=frm2) 
+oemList[1][1] = uiDispatcher.Proxy(tk.Label(text="0", width = 6, master=frm2)) 
+oemList[2][1] = uiDispatcher.Proxy(tk.Label(text="0", width = 6, master=frm2)) 
+oemList[3][1] = uiDispatcher.Proxy(tk.Label(text="0", width = 6, master=frm2)) 
 
 # Setup error messages
 errConnect = 'Cannot connect to controller!\nPlease check if CPSC1 is connected to the host via USB and the correct COM port number and Baudrate has been set.\n'
@@ -268,7 +274,7 @@ butCsz1.grid(row=0, column=4)
 v = tk.Scrollbar(frm4, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')     
 lblList[16].pack(side=tk.TOP)
-txtResp = tk.Text(master=frm4, yscrollcommand=v.set)
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(master=frm4, scrollbar=v))
 txtResp.tag_configure('e', foreground='red')
 txtResp.tag_configure('s', foreground='blue')
 txtResp.tag_configure('r', foreground='green')
@@ -279,10 +285,12 @@ butVer = tk.Button(text="Info", master=frm5, padx=10, pady=5)
 butGfs = tk.Button(text="Driver Check", master=frm5, padx=10, pady=5)
 butScm = tk.Button(text="Positioner Check", master=frm5, padx=10, pady=5)
 butTxtRespClear = tk.Button(text="Clear command history", master=frm5, padx=10, pady=5)
+inpTxtRespFilter = txtResp.FilterMenu(frm5) # Show all lines or only sent (s), received (r) or error (e) lines
 butWinDevMan = tk.Button(text="Device Manager\n(Windows)", master=frm5)
 
 # Layout of Info and Checks buttons frame
 butTxtRespClear.grid(row=1, column=1, padx=10, pady=10)  
+inpTxtRespFilter.grid(row=1, column=0, padx=10)
 frm5.grid_columnconfigure(2, minsize=20)
 butVer.grid(row=1, column=3, sticky=tk.W)
 butGfs.grid(row=1, column=4, sticky=tk.W)
@@ -303,15 +311,14 @@ def butVer_handle_thread():
    cmdFiv = 'FIV '
    txtResp.insert('end', ('==> Get firmware version information\n'))
    if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdVer + '\n'), 's') 
-   while not oemReadQueue.empty(): 
-       time.sleep(0.1)
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:   
+       with cpscScheduler as usbVcp:   
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<== CPSC1 version: ' + response + '\n'), 'r')
+           responsesFiv = usbVcp.WriteReadMany([cmdFiv + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFiv + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdFiv + str(x+1), 1)
+               response = responsesFiv[x]
                txtResp.insert('end', ('<== Slot ' + str(x+1) + ': ' + response + '\n'), 'r')            
                txtResp.see("end")
    except IOError:
@@ -324,13 +331,12 @@ def butGfs_handle_click(event):
 def butGfs_handle_thread():  
     cmdGfs = 'GFS '
     txtResp.insert('end', ('==> Get CADM2 failsafe state\n'))
-    while not oemReadQueue.empty(): 
-        time.sleep(0.1)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:    
+       with cpscScheduler as usbVcp:    
+           responsesGfs = usbVcp.WriteReadMany([cmdGfs + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdGfs + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdGfs + str(x+1), 1)
+               response = responsesGfs[x]
                txtResp.insert('end', ('<== Slot ' + str(x+1) + ': ' + response + '\n'), 'r')
                txtResp.see("end")
     except IOError:
@@ -344,13 +350,12 @@ def butScm_handle_thread():
     cmdScm = 'SCM '
     txtResp.insert('end', ('==> Check piezo in positioners (will take some time) ... \n'))
     parList[3][5].set(False)
-    while not oemReadQueue.empty(): 
-        time.sleep(0.1)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp: 
+       with cpscScheduler as usbVcp: 
+           responsesScm = usbVcp.WriteReadMany([cmdScm + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdScm + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdScm + str(x+1), 1)
+               response = responsesScm[x]
                txtResp.insert('end', ('<== Positioner on slot ' + str(x+1) + ': ' + response + '[nF]\n'), 'r')
                txtResp.see("end")
     except IOError:
@@ -372,17 +377,13 @@ def butStp_handle_thread(channel):
     cmdStp = 'STP ' + str(parList[channel-1][0].get())
     txtResp.insert('end', ('==> Stop movement\n'))
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
-    while not oemReadQueue.empty(): 
-        time.sleep(0.1) 
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:          
+       with cpscScheduler as usbVcp:          
            response = usbVcp.WriteRead(cmdStp, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end")
     except IOError:
         txtResp.insert('end', errConnect, 'e')       
-    parList[3][6].set(False)
 #def butMov will move motor indefinately
 def butMov1_handle_click(event):
     butMov1Thrd=thrd.Thread(target=butMov_handle_thread, args=([1]), daemon=True)
@@ -400,17 +401,13 @@ def butMov_handle_thread(channel):
     cmdMov = 'MOV ' + str(parList[channel-1][0].get()) + ' ' + str(parList[channel-1][1].get()) + ' ' + str(parList[channel-1][2].get()) + ' ' + str(parList[channel-1][3].get()) + ' ' + str(parList[channel-1][4].get()) + ' ' + str(parList[3][1].get()) + ' ' + str(parList[channel-1][5].get()) + ' ' + str(parList[channel-1][6].get())
     txtResp.insert('end', ('==> Start movement ...\n'))
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMov + '\n'), 's')
-    while not oemReadQueue.empty(): 
-        time.sleep(0.1)
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMov, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
        txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')    
-    parList[3][6].set(False)
 
 def butCsz1_handle_click(event):
     butCszThrd=thrd.Thread(target=butCsz_handle_thread, args=([1]), daemon=True)
@@ -428,11 +425,9 @@ def butCsz_handle_thread(channel):
     cmdCsz = 'CSZ ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) 
     txtResp.insert('end', ('==> Reset counter for CH' + str(channel) + '... \n'))
     parList[3][5].set(False)
-    while not oemReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdCsz + '\n'), 's')
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdCsz, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end") 
@@ -440,24 +435,12 @@ def butCsz_handle_thread(channel):
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
                 
-def oemRead_thread():
-    while(True):
-        if (parList[3][5].get()) and not(parList[3][6].get()):
-            oemReadQueue.put(1)
-            cmdCgva = 'CGVA ' + str(parList[3][2].get())       
-            try:
-               with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
-                   response = usbVcp.WriteRead(cmdCgva, 1)
-                   responseSplit = response.split(",")                       
-                   oemList[1][1].config(text=responseSplit[0], fg='black') 
-                   #oemList[2][1].config(text=responseSplit[1], fg='black')   
-                   #oemList[3][1].config(text=responseSplit[2], fg='black')                  
-            except IOError:
-                #txtResp.insert('end', '==> Communication briefly interrupted\n', 'e')  
-                #txtResp.see("end")
-                pass
-            oemReadQueue.get(1)
-        time.sleep(0.1)   
+def oemRead_update(sample):
+    oemBuffer.AppendSample(sample)
+    responseSplit = sample.response.split(",")                       
+    oemList[1][1].config(text=responseSplit[0], fg='black') 
+    #oemList[2][1].config(text=responseSplit[1], fg='black')   
+    #oemList[3][1].config(text=responseSplit[2], fg='black')                  
 
 def txtResp_clear_click(event):
     txtResp.delete("1.0", "end")
@@ -508,11 +491,16 @@ window.bind("<Delete>", butStp1_handle_click)
 #window.bind("<End>", butStp2_handle_click)  
 #window.bind("<Next>", butStp3_handle_click)  
 
-# Configure and start RSM read out thread
-oemReadQueue = Queue()
-oemReadThrd=thrd.Thread(target=oemRead_thread)
-oemReadThrd.daemon = True
-oemReadThrd.start()
+# Configure the command scheduler (executes the commands of all handlers), the publisher (shares poll streams between consumers) and the OEM read out: fast while moving, slow when idle
+oemFastInterval = 0.05 # [s] OEM read out interval after a move command and while the positions change
+oemIdleInterval = 1.0  # [s] OEM read out interval when the positions are settled
+oemTolerance = 1       # [counts] largest change between read outs that counts as settled
+oemBufferCapacity = 300000 # OEM counter samples kept in memory (3 per read out)
+oemBuffer = CpscRingBuffer.CpscRingBuffer(oemBufferCapacity)
+cpscScheduler = CpscScheduler.CpscScheduler(lambda: CpscSession.GetSession(str(parList[3][0].get()), str(inpList[3][4].get())))
+cpscPublisher = CpscPublisher.CpscPublisher(cpscScheduler)
+oemReadSubscription = cpscPublisher.Subscribe(lambda: 'CGVA ' + str(parList[3][2].get()), oemFastInterval, oemRead_update, enabled=parList[3][5].get, timestamps=True,
+                                              adaptive=CpscAdaptiveRate.CpscAdaptiveRate(oemFastInterval, oemIdleInterval, oemTolerance))
 
 # Display some initial tips and hints
 txtResp.insert('end', ('*** Note: make sure OEM calibration settings have been set first (CPSC1_OEM-Calibration_GUI) before starting to monitor the counter (CNT) value.\n'))
@@ -520,3 +508,7 @@ txtResp.insert('end', ('*** Remember: the OEM/COE is a relative sensor (it only
 
 # Main loop (loop until window is closed)
 window.mainloop()
+
+# Stop the scheduler and close the shared COM port session
+cpscScheduler.Close()
+CpscSession.CloseAll()
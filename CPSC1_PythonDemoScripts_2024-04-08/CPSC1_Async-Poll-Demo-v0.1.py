@@ -0,0 +1,43 @@
+###############################################################################
+# File name:      CPSC1_Async-Poll-Demo_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+# Description:    Poll one or more CPSC1 controllers over Ethernet from a
+#                 single asyncio event loop (no threads).
+#                 Usage: python CPSC1_Async-Poll-Demo-v0.1.py 10.0.0.5 10.0.0.6
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import asyncio
+import sys
+import time
+
+# JPE imports
+from CpscInterfaces import CpscAsyncInterface as CpscAsync
+
+cmdPoll = '/VER'
+pollDelay = 0.1
+pollCount = 20
+
+async def pollController(ipAddress):
+    try:
+        async with await CpscAsync.OpenTcp(ipAddress) as client:
+            for x in range(pollCount):
+                startTime = time.perf_counter()
+                response = await client.Query(cmdPoll, timeout=1)
+                passedTime = time.perf_counter() - startTime
+                print(f'{ipAddress} <-- {response} ({1000 * passedTime:.1f} [ms])')
+                await asyncio.sleep(pollDelay)
+    except IOError as ex:
+        print(f'{ipAddress} communication error: {ex}')
+
+async def main(ipAddresses):
+    await asyncio.gather(*(pollController(ipAddress) for ipAddress in ipAddresses))
+
+print(f'CPSC1 asyncio poll demo ({verNumber})')
+asyncio.run(main(sys.argv[1:] or ['192.168.1.100']))
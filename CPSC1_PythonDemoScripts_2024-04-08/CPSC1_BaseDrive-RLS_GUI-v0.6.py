@@ -23,18 +23,37 @@ lstDir = ['0','1']
 # 3rd party imports
 import time
 import tkinter as tk
-import csv
-from matplotlib import pyplot as plt
 import subprocess as sp
 import threading as thrd
-from queue import Queue
 import sys
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscAdaptiveRate
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscPublisher
+from CpscInterfaces import CpscReport
+from CpscInterfaces import CpscScheduler
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscStartup
+from CpscInterfaces import CpscUiDispatcher
+
+# Heavy modules (numpy, matplotlib, sqlite3, csv) are loaded on first use, see CpscStartup
+CpscAnalysis = CpscStartup.LazyImport('CpscInterfaces.CpscAnalysis')
+CpscCatalog = CpscStartup.LazyImport('CpscInterfaces.CpscCatalog')
+CpscLivePlot = CpscStartup.LazyImport('CpscInterfaces.CpscLivePlot')
+CpscRingBuffer = CpscStartup.LazyImport('CpscInterfaces.CpscRingBuffer')
+CpscRunLog = CpscStartup.LazyImport('CpscInterfaces.CpscRunLog')
+CpscStatistics = CpscStartup.LazyImport('CpscInterfaces.CpscStatistics')
+
+# Startup timing (window-to-interactive, see CPSC1_Startup-Benchmark)
+startupTimer = CpscStartup.CpscStartupTimer()
+startupTimer.Mark('imports')
 
 # Create GUI window
 window = tk.Tk()
+
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
  
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
@@ -50,10 +69,12 @@ frm3 = tk.Frame(padx=10, pady=5)
 frm4 = tk.Frame(padx=10, pady=5) 
 frm5 = tk.Frame(padx=10, pady=5) 
 frm6 = tk.Frame(padx=10, pady=5) 
+frm7 = tk.Frame(padx=10, pady=5)
 frm1.pack(padx=10, pady=5) # General Inputs
 frm2.pack(padx=10, pady=5) # Feedback Inputs
 frm3.pack(padx=10, pady=5) # Basedrive buttons
 frm4.pack(padx=10, pady=5) # Command history
+frm7.pack(padx=10, pady=5) # Live RLS position plot
 frm5.pack(padx=10, pady=5) # Info and checks
 frm6.pack(padx=10, pady=5) # Disclaimer
 
@@ -111,8 +132,6 @@ parList[3][3] = tk.IntVar()          # Show commands toggle
 parList[3][3].set(True)
 parList[3][5] = tk.IntVar()          # RLS toggle
 parList[3][5].set(False)
-parList[3][6] = tk.IntVar()          # Command lock
-parList[3][6].set(False)
 parList[0][7] = tk.StringVar(window) # Channel 1, Connected stage type (RLS)
 parList[0][7].set('CS021-RLS.X')
 parList[1][7] = tk.StringVar(window) # Channel 2, Connected stage type (RLS)
@@ -173,18 +192,18 @@ rsmList[0][4] = tk.Label(text="Center:",master=frm2)
 rsmList[1][0] = tk.Label(text="CH1 (A): ",master=frm2) 
 rsmList[2][0] = tk.Label(text="CH2 (B): ",master=frm2) 
 rsmList[3][0] = tk.Label(text="CH3 (C): ",master=frm2) 
-rsmList[1][1] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[2][1] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[3][1] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[1][2] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[2][2] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[3][2] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[1][3] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[2][3] = tk.Label(text="0.000000000",master=frm2) 
-rsmList[3][3] = tk.Label(text="0.000000000",master=frm2)
-rsmList[1][4] = tk.Label(text="0.00",master=frm2) 
-rsmList[2][4] = tk.Label(text="0.00",master=frm2) 
-rsmList[3][4] = tk.Label(text="0.00",master=frm2)
+rsmList[1][1] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[2][1] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[3][1] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[1][2] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[2][2] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[3][2] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[1][3] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[2][3] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2)) 
+rsmList[3][3] = uiDispatcher.Proxy(tk.Label(text="0.000000000",master=frm2))
+rsmList[1][4] = uiDispatcher.Proxy(tk.Label(text="0.00",master=frm2)) 
+rsmList[2][4] = uiDispatcher.Proxy(tk.Label(text="0.00",master=frm2)) 
+rsmList[3][4] = uiDispatcher.Proxy(tk.Label(text="0.00",master=frm2))
 
 # Setup error messages
 errConnect = 'Cannot connect to controller!\nPlease check if CPSC1 is connected to the host via USB and the correct COM port number and Baudrate has been set.\n'
@@ -277,9 +296,9 @@ seqList[3][4] = tk.Spinbox(frm2, from_= 1, to = 100, textvariable=parList[2][9],
 seqList[1][5] = tk.Spinbox(frm2, from_= 1, to = 100, textvariable=parList[0][10], width=5) # TimeOut CH1
 seqList[2][5] = tk.Spinbox(frm2, from_= 1, to = 100, textvariable=parList[1][10], width=5) # TimeOut CH2
 seqList[3][5] = tk.Spinbox(frm2, from_= 1, to = 100, textvariable=parList[2][10], width=5) # TimeOut CH3
-seqList[1][6] = tk.Label(text="0.0",master=frm2) # Time Passed value CH1
-seqList[2][6] = tk.Label(text="0.0",master=frm2) # Time Passed value CH2
-seqList[3][6] = tk.Label(text="0.0",master=frm2) # Time Passed value CH3
+seqList[1][6] = uiDispatcher.Proxy(tk.Label(text="0.0",master=frm2)) # Time Passed value CH1
+seqList[2][6] = uiDispatcher.Proxy(tk.Label(text="0.0",master=frm2)) # Time Passed value CH2
+seqList[3][6] = uiDispatcher.Proxy(tk.Label(text="0.0",master=frm2)) # Time Passed value CH3
 
 # Set default parameter values for (Entry) widgets
 seqList[1][1].insert(0, "-0.001") # Setpoint POS A CH1
@@ -466,7 +485,8 @@ v = tk.Scrollbar(frm4, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')     
 lblList[16].pack(side=tk.TOP)
 txtRespFont = ("Courier New", 12)
-txtResp = tk.Text(height = 15, width=140, master=frm4, yscrollcommand=v.set)
+historySpill = None # File for the command history lines older than the last 10000 (e.g. 'CPSC1_History.csv'), None: drop them
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(height = 15, width=140, master=frm4, scrollbar=v, history=CpscHistory.CpscHistory(10000, historySpill)))
 txtResp.tag_configure('e', foreground='red')
 txtResp.tag_configure('s', foreground='blue')
 txtResp.tag_configure('r', foreground='green')
@@ -478,12 +498,14 @@ butVer = tk.Button(text="Info", master=frm5, padx=10)
 butGfs = tk.Button(text="Driver Check", master=frm5, padx=10)
 butScm = tk.Button(text="Positioner Check", master=frm5, padx=10)
 butTxtRespClear = tk.Button(text="Clear command history", master=frm5, padx=10)
+inpTxtRespFilter = txtResp.FilterMenu(frm5) # Show all lines or only sent (s), received (r) or error (e) lines
 butWinDevMan = tk.Button(text="Device Manager (Windows)", master=frm5)
 butInfo = tk.Button(text=">> How To Use <<", master=frm5, width=12, padx=10)
 butStages = tk.Button(text="Stage Types", master=frm5, width=12, padx=10)
 
 # Layout of Info and Checks buttons frame (frm5)
 butTxtRespClear.grid(row=1, column=1, padx=10)  
+inpTxtRespFilter.grid(row=1, column=0, padx=10)
 frm5.grid_columnconfigure(2, minsize=20)
 butVer.grid(row=1, column=3, sticky=tk.W)
 butGfs.grid(row=1, column=4, sticky=tk.W)
@@ -508,21 +530,29 @@ def butVer_handle_thread():
    cmdFiv = 'FIV '
    txtResp.insert('end', ('--> Get firmware version information\n'))
    if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdVer + '\n'), 's') 
-   while not rsmReadQueue.empty(): 
-       time.sleep(0.1)
-   parList[3][6].set(True)    
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:   
+       with cpscScheduler as usbVcp:   
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<-- CPSC1 version: ' + response + '\n'), 'r')
+           responsesFiv = usbVcp.WriteReadMany([cmdFiv + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdFiv + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdFiv + str(x+1), 1)
+               response = responsesFiv[x]
                txtResp.insert('end', ('<-- Slot ' + str(x+1) + ': ' + response + '\n'), 'r')            
                txtResp.see("end")
    except IOError:
        txtResp.insert('end', errConnect, 'e')      
-   parList[3][6].set(False)
+
+def cpscProbe_handle_thread():
+   # Deferred startup task (background thread, the window is already usable): is a CPSC1 connected?
+   cmdVer = '/VER'
+   try:
+       with cpscScheduler as usbVcp:
+           response = usbVcp.WriteRead(cmdVer, 1)
+           txtResp.insert('end', ('<-- CPSC1 version: ' + response + '\n'), 'r')
+   except IOError:
+       txtResp.insert('end', ('--> No CPSC1 found at startup, check the connection and the COM port settings\n'))
+   txtResp.see("end")
 
 def butStages_handle_click(event):
    butStagesThrd=thrd.Thread(target=butStages_handle_thread, daemon=True)
@@ -532,16 +562,12 @@ def butStages_handle_thread():
    cmdStages = '/STAGES'
    txtResp.insert('end', ('--> Get a list of all available Stage Type values\n'))
    if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdStages + '\n'), 's') 
-   while not rsmReadQueue.empty(): 
-       time.sleep(0.1)
-   parList[3][6].set(True)    
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:   
+       with cpscScheduler as usbVcp:   
            response = usbVcp.WriteRead(cmdStages, 1)
            txtResp.insert('end', ('<-- Stage Type values: ' + response + '\n'), 'r')
    except IOError:
        txtResp.insert('end', errConnect, 'e')      
-   parList[3][6].set(False)
 
 def butGfs_handle_click(event):
     butGfsThrd=thrd.Thread(target=butGfs_handle_thread, daemon=True)
@@ -550,19 +576,16 @@ def butGfs_handle_click(event):
 def butGfs_handle_thread():  
     cmdGfs = 'GFS '
     txtResp.insert('end', ('--> Get CADM2 failsafe state\n'))
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:    
+       with cpscScheduler as usbVcp:    
+           responsesGfs = usbVcp.WriteReadMany([cmdGfs + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdGfs + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdGfs + str(x+1), 1)
+               response = responsesGfs[x]
                txtResp.insert('end', ('<-- Slot ' + str(x+1) + ': ' + response + '\n'), 'r')
                txtResp.see("end")
     except IOError:
        txtResp.insert('end', errConnect, 'e')        
-    parList[3][6].set(False)
 
 def butScm_handle_click(event):
     butScmThrd=thrd.Thread(target=butScm_handle_thread, daemon=True)
@@ -572,19 +595,16 @@ def butScm_handle_thread():
     cmdScm = 'SCM '
     txtResp.insert('end', ('--> Check piezo in positioners (will take some time) ... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp: 
+       with cpscScheduler as usbVcp: 
+           responsesScm = usbVcp.WriteReadMany([cmdScm + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdScm + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdScm + str(x+1), 1)
+               response = responsesScm[x]
                txtResp.insert('end', ('<-- Positioner on slot ' + str(x+1) + ': ' + response + '[nF]\n'), 'r')
                txtResp.see("end")
     except IOError:
        txtResp.insert('end', errConnect, 'e')     
-    parList[3][6].set(False)
        
 def butStp1_handle_click(event):
     butStp1Thrd=thrd.Thread(target=butStp_handle_thread, args=([1]), daemon=True)
@@ -602,17 +622,13 @@ def butStp_handle_thread(channel):
     cmdStp = 'STP ' + str(parList[channel-1][0].get())
     txtResp.insert('end', ('--> Stop movement\n'))
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdStp + '\n'), 's')
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1) 
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:          
+       with cpscScheduler as usbVcp:          
            response = usbVcp.WriteRead(cmdStp, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")
     except IOError:
         txtResp.insert('end', errConnect, 'e')       
-    parList[3][6].set(False)
 
 def butMov1_handle_click(event):
     butMov1Thrd=thrd.Thread(target=butMov_handle_thread, args=([1]), daemon=True)
@@ -630,17 +646,13 @@ def butMov_handle_thread(channel):
     cmdMov = 'MOV ' + str(parList[channel-1][0].get()) + ' ' + str(parList[channel-1][1].get()) + ' ' + str(parList[channel-1][2].get()) + ' ' + str(parList[channel-1][3].get()) + ' ' + str(inpList[channel-1][4].get()) + ' ' + str(parList[3][1].get()) + ' ' + str(parList[channel-1][5].get()) + ' ' + str(parList[channel-1][6].get())
     txtResp.insert('end', ('--> Start movement ...\n'))
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMov + '\n'), 's')
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMov, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
        txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')    
-    parList[3][6].set(False)
 
 def butMir1_handle_click(event):
     butMirThrd=thrd.Thread(target=butMir_handle_thread, args=([1]), daemon=True)
@@ -658,19 +670,15 @@ def butMir_handle_thread(channel):
     cmdMir = 'MIR ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) + ' ' + str(parList[channel-1][7].get())
     txtResp.insert('end', ('--> Get current MIR value for CH' + str(channel) + '... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMir + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMir, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            rsmList[channel][2].config(text=response)
        txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
     parList[3][5].set(True)
 
 def butMis1_handle_click(event):
@@ -689,18 +697,14 @@ def butMis_handle_thread(channel):
     cmdMis = 'MIS ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) 
     txtResp.insert('end', ('--> Set current MIS value for CH' + str(channel) + ' ... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMis + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMis, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
     parList[3][5].set(True)
 
 def butMar1_handle_click(event):
@@ -719,19 +723,15 @@ def butMar_handle_thread(channel):
     cmdMar = 'MAR ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) + ' ' + str(parList[channel-1][7].get())
     txtResp.insert('end', ('--> Get current MAR value for CH' + str(channel) + ' ... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMar + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMar, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            rsmList[channel][3].config(text=response)
        txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
     parList[3][5].set(True)
 
 def butMas1_handle_click(event):
@@ -750,18 +750,14 @@ def butMas_handle_thread(channel):
     cmdMas = 'MAS ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) 
     txtResp.insert('end', ('--> Set current MAS value for CH' + str(channel) + '... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMas + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMas, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
     parList[3][5].set(True)
 
 def butMmr1_handle_click(event):
@@ -780,18 +776,14 @@ def butMmr_handle_thread(channel):
     cmdMmr = 'MMR ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) 
     txtResp.insert('end', ('--> Reset MIR and MAR values for CH' + str(channel) + '... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdMmr + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdMmr, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
     parList[3][5].set(True)
 
 def butRss_handle_click(event):
@@ -802,18 +794,14 @@ def butRss_handle_thread():
     cmdRss = 'RSS ' + str(parList[3][2].get())
     txtResp.insert('end', ('--> Store current MIR and MAR values for all Channels ... \n'))
     parList[3][5].set(False)
-    while not rsmReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('--> ' + cmdRss + '\n'), 's')
-    parList[3][6].set(True)
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp:        
            response = usbVcp.WriteRead(cmdRss, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)    
     parList[3][5].set(True)
         
 def butCenter1_handle_click(event):
@@ -834,42 +822,36 @@ def butCenter_handle_thread(channel):
     centerPos = round(((marVal-mirVal)/2)-marVal,6)
     rsmList[channel][4].config(text=str(centerPos))          
         
-def rsmRead_thread():
-    while(True):
-        if (parList[3][5].get()) and not(parList[3][6].get()):
-            rsmReadQueue.put(1)
-            nearCenter = 0.0005 # 0.0005m = 0.5mm
-            cmdPgva = 'PGVA ' + str(parList[3][2].get()) + ' ' + str(parList[0][7].get()) + ' ' + str(parList[1][7].get()) + ' ' + str(parList[2][7].get())
-            try:
-               with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
-                   response = usbVcp.WriteRead(cmdPgva, 1)
-                   #txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
-                   responseSplit = response.split(",")
-                   if float(responseSplit[0]) < float(rsmList[1][2].cget("text")) or float(responseSplit[0]) > float(rsmList[1][3].cget("text")) :
-                       rsmList[1][1].config(text=responseSplit[0], fg='red')   
-                   elif float(responseSplit[0]) > float(rsmList[1][4].cget("text"))-nearCenter and float(responseSplit[0]) < float(rsmList[1][4].cget("text"))+nearCenter :
-                       rsmList[1][1].config(text=responseSplit[0], fg='blue')  
-                   else: 
-                       rsmList[1][1].config(text=responseSplit[0], fg='black')  
-                   if float(responseSplit[1]) < float(rsmList[2][2].cget("text")) or float(responseSplit[1]) > float(rsmList[2][3].cget("text")) :
-                       rsmList[2][1].config(text=responseSplit[1], fg='red')   
-                   elif float(responseSplit[1]) > float(rsmList[2][4].cget("text"))-nearCenter and float(responseSplit[1]) < float(rsmList[2][4].cget("text"))+nearCenter :
-                       rsmList[2][1].config(text=responseSplit[1], fg='blue')  
-                   else: 
-                       rsmList[2][1].config(text=responseSplit[1], fg='black')
-                   if float(responseSplit[2]) < float(rsmList[3][2].cget("text")) or float(responseSplit[2]) > float(rsmList[3][3].cget("text")) :
-                       rsmList[3][1].config(text=responseSplit[2], fg='red')   
-                   elif float(responseSplit[2]) > float(rsmList[3][4].cget("text"))-nearCenter and float(responseSplit[2]) < float(rsmList[3][4].cget("text"))+nearCenter :
-                       rsmList[3][1].config(text=responseSplit[2], fg='blue')  
-                   else: 
-                       rsmList[3][1].config(text=responseSplit[2], fg='black')    
-                                                             
-            except IOError:
-                #txtResp.insert('end', 'communication lost', 'e')  
-                pass      
-            
-            rsmReadQueue.get(1)
-        time.sleep(0.1)   
+def rsmPlot_create():
+    # Deferred startup task (after the window is interactive): the live plot loads numpy and matplotlib
+    global rsmBuffer, rsmPlot
+    rsmBuffer = CpscRingBuffer.CpscRingBuffer(rsmBufferCapacity)
+    rsmPlot = CpscLivePlot.CpscLivePlot(frm7, rsmBuffer, span=rsmPlotSpan, labels=('CH1 (A)', 'CH2 (B)', 'CH3 (C)'))
+    rsmPlot.Widget().pack(side=tk.TOP)
+
+def rsmRead_update(sample):
+    nearCenter = 0.0005 # 0.0005m = 0.5mm
+    if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot (created after startup)
+    #txtResp.insert('end', ('<-- ' + sample.response + '\n'), 'r')
+    responseSplit = sample.response.split(",")
+    if float(responseSplit[0]) < float(rsmList[1][2].cget("text")) or float(responseSplit[0]) > float(rsmList[1][3].cget("text")) :
+        rsmList[1][1].config(text=responseSplit[0], fg='red')   
+    elif float(responseSplit[0]) > float(rsmList[1][4].cget("text"))-nearCenter and float(responseSplit[0]) < float(rsmList[1][4].cget("text"))+nearCenter :
+        rsmList[1][1].config(text=responseSplit[0], fg='blue')  
+    else: 
+        rsmList[1][1].config(text=responseSplit[0], fg='black')  
+    if float(responseSplit[1]) < float(rsmList[2][2].cget("text")) or float(responseSplit[1]) > float(rsmList[2][3].cget("text")) :
+        rsmList[2][1].config(text=responseSplit[1], fg='red')   
+    elif float(responseSplit[1]) > float(rsmList[2][4].cget("text"))-nearCenter and float(responseSplit[1]) < float(rsmList[2][4].cget("text"))+nearCenter :
+        rsmList[2][1].config(text=responseSplit[1], fg='blue')  
+    else: 
+        rsmList[2][1].config(text=responseSplit[1], fg='black')
+    if float(responseSplit[2]) < float(rsmList[3][2].cget("text")) or float(responseSplit[2]) > float(rsmList[3][3].cget("text")) :
+        rsmList[3][1].config(text=responseSplit[2], fg='red')   
+    elif float(responseSplit[2]) > float(rsmList[3][4].cget("text"))-nearCenter and float(responseSplit[2]) < float(rsmList[3][4].cget("text"))+nearCenter :
+        rsmList[3][1].config(text=responseSplit[2], fg='blue')  
+    else: 
+        rsmList[3][1].config(text=responseSplit[2], fg='black')    
 
 def txtResp_clear_click(event):
     txtResp.delete("1.0", "end")
@@ -880,7 +862,7 @@ def butWinDevMan_clear_click(event):
 def butInfo_click(event):
     # Display some initial tips and hints
     txtResp.insert('end', ('1) GENERAL SETTINGS\n'
-                           'A) Set COM port, Baudrate and CADM and RSM addressing first.\n\n'                      
+                           'A) Set COM port (number, device name like /dev/ttyUSB0 or tcp://<IP address>), Baudrate and CADM and RSM addressing first.\n\n'                      
                            '2) DRIVE SETTINGS\n'
                            'A) Make sure to set [Direction], [Freq], [Rss], [# Steps], [Temperature] and correct [Stage Type] before clicking the Move buttons. [Drive Factor] can be left at default value (1.0).\n'
                            'B) Use [Move] and [Stop] buttons to drive a positioner (BaseDrive mode of operation).\n'
@@ -899,6 +881,15 @@ def butInfo_click(event):
 def doNothing(event):
     time.sleep(1)
 
+def report_done(future, pngPath):
+    # Called by the report pool (in a pool thread) when a plot has been rendered
+    try:
+        future.result()
+        txtResp.insert('end', ('==> Plot stored to ' + pngPath + '\n'))
+    except IOError as error:
+        txtResp.insert('end', ('==> ' + str(error) + '\n'), 'e')
+    txtResp.see("end")
+
 def butRunSeq1_handle_click(event): 
     butRunSeqThrd=thrd.Thread(target=butRunSeq_handle_thread, args=([1]), daemon=True)
     butRunSeqThrd.start()
@@ -913,20 +904,17 @@ def butRunSeq3_handle_click(event):
     
 def butRunSeq_handle_thread(channel):    
     parList[3][5].set(False)        # Disable continuous RSM readout first
-    while not rsmReadQueue.empty(): # Wait until queue is empty
-        time.sleep(0.1)
-    parList[3][6].set(True)         # Command 'lock' on
     
     # Set some default values for variables used in this routine
     startTime = 0
     passedTime = 0
-    logTimeA = []
-    logTimeB = []
-    logRlsA = []
-    logRlsB = []
     logElapA = []
     logElapB = []
-    pollDelay = 0.1
+    sequenceStats = CpscStatistics.CpscSequenceStats() # Running leg time / speed statistics per direction
+    abortDeviation = None # E.g. 0.5: abort the sequence when a leg speed deviates more than this fraction from the median of the earlier legs (None: never)
+    pollDelay = 0.1       # [s] fixed RLS sample period during the sequence
+    sampleRetries = 3     # Late or failed RLS samples in a row before the sequence is stopped
+    moving = False        # A MOV has been sent and not yet stopped (STP in the finally clause on errors)
     sequenceDelay = 2.0
     
     # Set up CPSC commands that are used in this routine
@@ -937,13 +925,22 @@ def butRunSeq_handle_thread(channel):
     cmdMar = 'MAR ' + str(parList[3][2].get()) + ' ' + str(parList[channel-1][0].get()) + ' ' + str(parList[channel-1][7].get())
     cmdPgva = 'PGVA ' + str(parList[3][2].get()) + ' ' + str(parList[0][7].get()) + ' ' + str(parList[1][7].get()) + ' ' + str(parList[2][7].get())
 
+    # Binary run log, written while the sequence runs (one row per RLS sample, DIR=1 moves to Pos B, DIR=0 to Pos A)
+    logName = str(parList[channel-1][5].get()) + '_' + str(inpList[channel-1][8].get()) + '-' + str(seqList[channel][4].get())
+    logColumns = [('run', 'i4'), ('dir', 'i4'), ('time', 'f8'), ('position', 'f8')]
+    logMetadata = {'stage': str(parList[channel-1][5].get()), 'serial': str(inpList[channel-1][8].get()), 'channel': channel, 'sequence': str(seqList[channel][4].get()),
+                   'FREQ': str(parList[channel-1][2].get()), 'RSS': str(parList[channel-1][3].get()), 'TEMP': str(parList[3][1].get()), 'DF': str(parList[channel-1][6].get()),
+                   'POSA': str(seqList[channel][1].get()), 'POSB': str(seqList[channel][2].get()), 'runs': str(seqList[channel][3].get()), 'pollDelay': pollDelay}
+    exportCsv = True      # Also export the run log as CSV at the end
+
     # Initial warning message
-    txtResp.insert('end', ('==> Start Move Sequence. Please be patient! There is currently no abort option.\n')) 
+    txtResp.insert('end', ('==> Start Move Sequence. Please be patient! There is currently no manual abort option.\n')) 
     txtResp.see("end") 
     time.sleep(sequenceDelay)
+    runStartTime = time.time() # For the run catalog
  
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+       with cpscScheduler as usbVcp, cpscPublisher.Subscribe(cmdPgva, pollDelay, timestamps=True) as rlsSubscription, CpscRunLog.CpscRunLogWriter(logName + '.cpscrun', logColumns, logMetadata) as runLog:
            txtResp.insert('end', ('==> Get current MIR value for CH' + str(channel) + '... \n'))
            if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMir + '\n'), 's')   
            response = usbVcp.WriteRead(cmdMir, 1)
@@ -956,6 +953,7 @@ def butRunSeq_handle_thread(channel):
            response = usbVcp.WriteRead(cmdMar, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            rsmList[channel][3].config(text=response)
+           runLog.SetMetadata(MIR=rsmList[channel][2].cget("text"), MAR=response)
            txtResp.see("end")    
            
            # Only run sequence if Pos A and Pos B do not exceed MIR/MAR values
@@ -974,48 +972,52 @@ def butRunSeq_handle_thread(channel):
                 if float(responseSplit[channel-1]) > float(seqList[channel][1].get()): # If current position is positive to Pos A, move in DIR=0 direction towards Pos A
                     txtResp.insert('end', ('==> Start moving in DIR=0 until ' + seqList[channel][1].get() + '[m] reached ...\n'))
                     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMvA + '\n'), 's')
-                    startTime = time.time()  
+                    startTime = time.monotonic()  
+                    moving = True
                     response = usbVcp.WriteRead(cmdMvA, 1)
                     txtResp.insert('end', ('<== ' + response + '\n'), 'r') 
                     txtResp.see("end")  
-                    time.sleep(pollDelay) 
+                    rlsSubscription.Clear()
                     while float(responseSplit[channel-1]) >= float(seqList[channel][1].get()) and not passedTime > int(seqList[channel][5].get()): # Keep polling RLS value until Pos A reached OR timeout has occurred
-                        response = usbVcp.WriteRead(cmdPgva, 1)
-                        responseSplit = response.split(",")
+                        sample = rlsSubscription.Get(retries=sampleRetries)
+                        if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                        responseSplit = sample.response.split(",")
                         rsmList[1][1].config(text=responseSplit[0], fg='black')  
                         rsmList[2][1].config(text=responseSplit[1], fg='black')
                         rsmList[3][1].config(text=responseSplit[2], fg='black')
-                        passedTime = time.time() - startTime                                                         
+                        passedTime = sample.Time() - startTime                                                         
                         seqList[channel][6].config(text=str(round(passedTime, 1)), fg='black') 
-                        time.sleep(pollDelay)
                                                                     
                     txtResp.insert('end', ('==> Stop moving\n'))
                     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
                     response = usbVcp.WriteRead(cmdStp, 1)
+                    moving = False
                     txtResp.insert('end', ('<== ' + response + '\n'), 'r')    
                     txtResp.see("end")                 
                     
                 else: # If current position is negative to Pos A, move in DIR=1 direction towards Pos A
                     txtResp.insert('end', ('==> Start moving in DIR=1 until ' + seqList[channel][1].get() + '[m] reached ...\n'))
                     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMvB + '\n'), 's')
-                    startTime = time.time()  
+                    startTime = time.monotonic()  
+                    moving = True
                     response = usbVcp.WriteRead(cmdMvB, 1)
                     txtResp.insert('end', ('<== ' + response + '\n'), 'r')  
                     txtResp.see("end")  
-                    time.sleep(pollDelay)
+                    rlsSubscription.Clear()
                     while float(responseSplit[channel-1]) >= float(seqList[channel][1].get()) and not passedTime > int(seqList[channel][5].get()): # Keep polling RLS value until Pos A reached OR timeout has occurred
-                        response = usbVcp.WriteRead(cmdPgva, 1)
-                        responseSplit = response.split(",")
+                        sample = rlsSubscription.Get(retries=sampleRetries)
+                        if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                        responseSplit = sample.response.split(",")
                         rsmList[1][1].config(text=responseSplit[0], fg='black')  
                         rsmList[2][1].config(text=responseSplit[1], fg='black')
                         rsmList[3][1].config(text=responseSplit[2], fg='black') 
-                        passedTime = time.time() - startTime   
+                        passedTime = sample.Time() - startTime   
                         seqList[channel][6].config(text=str(round(passedTime, 1)), fg='black')                                                       
-                        time.sleep(pollDelay)
              
                     txtResp.insert('end', ('==> Stop moving\n'))
                     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
                     response = usbVcp.WriteRead(cmdStp, 1)
+                    moving = False
                     txtResp.insert('end', ('<== ' + response + '\n'), 'r')   
                     txtResp.see("end")  
         
@@ -1033,30 +1035,35 @@ def butRunSeq_handle_thread(channel):
                         txtResp.insert('end', ('==> Run #' + str(i+1) + '. Move to ' + seqList[channel][2].get() + '[m] ...\n'))
                         if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMvB + '\n'), 's')
                         passedTime = 0
-                        startTime = time.time()       
+                        startTime = time.monotonic()       
+                        sequenceStats.StartLeg(1)
+                        moving = True
                         response = usbVcp.WriteRead(cmdMvB, 1)
                         txtResp.insert('end', ('<== ' + response + '\n'), 'r')  
                         txtResp.see("end")  
-                        response = usbVcp.WriteRead(cmdPgva, 1)
-                        responseSplit = response.split(",")
+                        rlsSubscription.Clear()
+                        sample = rlsSubscription.Get(retries=sampleRetries)
+                        if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                        responseSplit = sample.response.split(",")
                         rsmList[1][1].config(text=responseSplit[0], fg='black')  
                         rsmList[2][1].config(text=responseSplit[1], fg='black')
                         rsmList[3][1].config(text=responseSplit[2], fg='black')     
                         while float(responseSplit[channel-1]) <= float(seqList[channel][2].get()) and not round((passedTime),1) > int(seqList[channel][5].get()): # Keep polling RLS value until Pos B reached OR timeout has occurred
-                            response = usbVcp.WriteRead(cmdPgva, 1)
-                            responseSplit = response.split(",")
+                            sample = rlsSubscription.Get(retries=sampleRetries)
+                            if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                            responseSplit = sample.response.split(",")
                             rsmList[1][1].config(text=responseSplit[0], fg='black')  
                             rsmList[2][1].config(text=responseSplit[1], fg='black')
                             rsmList[3][1].config(text=responseSplit[2], fg='black')                                
-                            logRlsB.append(float(responseSplit[channel-1]))   
-                            passedTime = time.time() - startTime
-                            logTimeB.append(passedTime)
+                            passedTime = sample.Time() - startTime
+                            runLog.Append(i+1, 1, passedTime, float(responseSplit[channel-1]))
+                            sequenceStats.AddSample(passedTime, float(responseSplit[channel-1]))
                             seqList[channel][6].config(text=str(round(passedTime, 1)), fg='black') 
-                            time.sleep(pollDelay)
                             
                         txtResp.insert('end', ('==> Stop moving\n'))
                         if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
                         response = usbVcp.WriteRead(cmdStp, 1)
+                        moving = False
                         txtResp.insert('end', ('<== ' + response + '\n'), 'r')   
                         txtResp.see("end")  
                         
@@ -1065,36 +1072,49 @@ def butRunSeq_handle_thread(channel):
                             txtResp.see("end")
                         
                         logElapB.append(passedTime)
+                        sequenceStats.EndLeg(passedTime)
+                        txtResp.insert('end', ('==> ' + sequenceStats.Text(1) + '\n'))
+                        txtResp.see("end")
+                        runLog.SetMetadata(statistics=sequenceStats.Summary())
+                        if abortDeviation is not None and sequenceStats.deviation > abortDeviation:
+                            txtResp.insert('end', ('==> Sequence aborted at Run #' + str(i+1) + ': speed deviates ' + str(round(100 * sequenceStats.deviation)) + '% from the median of the earlier runs\n'), 'e')
+                            txtResp.see("end")
+                            break
                         time.sleep(sequenceDelay) 
                         
                         # Move towards Pos A
                         txtResp.insert('end', ('==> Run #' + str(i+1) + '. Move to ' + seqList[channel][1].get() + '[m] ...\n'))
                         if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdMvA + '\n'), 's')
                         passedTime = 0
-                        startTime = time.time()   
+                        startTime = time.monotonic()   
+                        sequenceStats.StartLeg(0)
+                        moving = True
                         response = usbVcp.WriteRead(cmdMvA, 1)
                         txtResp.insert('end', ('<== ' + response + '\n'), 'r')  
                         txtResp.see("end")  
-                        response = usbVcp.WriteRead(cmdPgva, 1)
-                        responseSplit = response.split(",")
+                        rlsSubscription.Clear()
+                        sample = rlsSubscription.Get(retries=sampleRetries)
+                        if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                        responseSplit = sample.response.split(",")
                         rsmList[1][1].config(text=responseSplit[0], fg='black')  
                         rsmList[2][1].config(text=responseSplit[1], fg='black')
                         rsmList[3][1].config(text=responseSplit[2], fg='black')     
                         while float(responseSplit[channel-1]) >= float(seqList[channel][1].get()) and not round((passedTime),1) > int(seqList[channel][5].get()): # Keep polling RLS value until Pos A reached OR timeout has occurred
-                            response = usbVcp.WriteRead(cmdPgva, 1)
-                            responseSplit = response.split(",")
+                            sample = rlsSubscription.Get(retries=sampleRetries)
+                            if rsmBuffer is not None: rsmBuffer.AppendSample(sample) # Live plot
+                            responseSplit = sample.response.split(",")
                             rsmList[1][1].config(text=responseSplit[0], fg='black')  
                             rsmList[2][1].config(text=responseSplit[1], fg='black')
                             rsmList[3][1].config(text=responseSplit[2], fg='black')                                                         
-                            logRlsA.append(float(responseSplit[channel-1]))   
-                            passedTime = time.time() - startTime
-                            logTimeA.append(passedTime)
+                            passedTime = sample.Time() - startTime
+                            runLog.Append(i+1, 0, passedTime, float(responseSplit[channel-1]))
+                            sequenceStats.AddSample(passedTime, float(responseSplit[channel-1]))
                             seqList[channel][6].config(text=str(round(passedTime, 1)), fg='black') 
-                            time.sleep(pollDelay)
                  
                         txtResp.insert('end', ('==> Stop moving\n'))
                         if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
                         response = usbVcp.WriteRead(cmdStp, 1)
+                        moving = False
                         txtResp.insert('end', ('<== ' + response + '\n'), 'r')  
                         txtResp.see("end")  
                         
@@ -1103,6 +1123,14 @@ def butRunSeq_handle_thread(channel):
                             txtResp.see("end")
                         
                         logElapA.append(passedTime)
+                        sequenceStats.EndLeg(passedTime)
+                        txtResp.insert('end', ('==> ' + sequenceStats.Text(0) + '\n'))
+                        txtResp.see("end")
+                        runLog.SetMetadata(statistics=sequenceStats.Summary())
+                        if abortDeviation is not None and sequenceStats.deviation > abortDeviation:
+                            txtResp.insert('end', ('==> Sequence aborted at Run #' + str(i+1) + ': speed deviates ' + str(round(100 * sequenceStats.deviation)) + '% from the median of the earlier runs\n'), 'e')
+                            txtResp.see("end")
+                            break
                         time.sleep(sequenceDelay)     
                                  
                     txtResp.insert('end', ('==> Movement Sequence completed\n'))
@@ -1113,64 +1141,66 @@ def butRunSeq_handle_thread(channel):
                txtResp.see("end")         
            
             
-       a = sum(logElapA) / len(logElapA)
-       b = sum(logElapB) / len(logElapB)
-       c = (float(seqList[channel][2].get())-float(seqList[channel][1].get()))*1000
-       d = round(c / a, 2)
-       e = round(c / b, 2)  
+       # Speed analysis of the logged trajectory (DIR 0: B->A, DIR 1: A->B)
+       rlsLog = CpscRunLog.CpscRunLog(logName + '.cpscrun')
+       if len(rlsLog['run']) == 0: # Sequence not started (Pos A/B outside MIR/MAR or Pos A not reached): nothing to analyse
+           txtResp.insert('end', ('==> No RLS samples logged: no analysis, plot or run catalog entry\n'))
+       else:
+           legs = CpscAnalysis.AnalyseLegs(rlsLog['time'], rlsLog['position'], rlsLog['run'], rlsLog['dir'],
+                                           float(seqList[channel][1].get()), float(seqList[channel][2].get()))
+           statistics = CpscAnalysis.RunStatistics(legs)
+           a = sum(logElapA) / len(logElapA) if logElapA else float('nan')
+           b = sum(logElapB) / len(logElapB) if logElapB else float('nan')
+           c = (float(seqList[channel][2].get())-float(seqList[channel][1].get()))*1000
+           d = round(1000 * CpscAnalysis.Mean(statistics, 0, 'steadySpeed'), 2)
+           e = round(1000 * CpscAnalysis.Mean(statistics, 1, 'steadySpeed'), 2)
+           txtResp.insert('end', ('==> [AVRG Time B->A]: ' + str(round(a, 2)) + '[s] [AVRG Time A->B]: ' + str(round(b, 2)) + '[s] [Distance A<->B]: ' + str(round(c, 6)) + '[mm]' +
+                                  ' [Speed B->A]: ' + str(d) + '[mm/s] [Speed A->B]: ' + str(e) + '[mm/s]\n'))
        
-       #Consolde debug info
-       print('[AVRG Time B->A]: ' + str(a) + '[s]')
-       print('[AVRG Time A->B]: ' + str(b) + '[s]')
-       print('[Distance A<->B]: ' + str(c) + '[mm]')
-       print('Speed B->A: ' + str(d) + '[mm/s]')
-       print('Speed A->B: ' + str(e) + '[mm/s]')
+           # Plot rendered by a worker process (CpscReport), the handler thread does not wait for it
+           plotTitle = ('Sequence #' + str(seqList[channel][4].get()) + ' of ' + str(parList[channel-1][5].get()) + ' #' + str(inpList[channel-1][8].get()) +
+                       '\nTest Params: [FREQ]:' + str(parList[channel-1][2].get()) + ' [RSS]:' + str(parList[channel-1][3].get()) + ' [TEMP]:' + str(parList[3][1].get()) + 
+                       ' [DF]:' + str(parList[channel-1][6].get()) + ' [#Runs]:' + str(seqList[channel][3].get()) + 
+                       '\n[MIR]:' + str(rsmList[channel][2].cget("text")) + ' [MAR]:' + str(rsmList[channel][3].cget("text")) + 
+                       ' [POSA]:' + str(seqList[channel][1].get()) + ' [POSB]:' + str(seqList[channel][2].get()) +
+                       '\n[AVRG Speed B->A]: ' + str(d) + '[mm/s]' + ' [AVRG Speed A->B]: ' + str(e) + '[mm/s]' +
+                       '\n[AVRG Overshoot A]: ' + str(round(1e6 * CpscAnalysis.Mean(statistics, 0, 'overshoot'), 3)) + '[um]' +
+                       ' [AVRG Overshoot B]: ' + str(round(1e6 * CpscAnalysis.Mean(statistics, 1, 'overshoot'), 3)) + '[um]')
+           reportPool.Submit('sequence', callback=lambda future: report_done(future, logName + '.png'),
+                             dataPath=logName + '.cpscrun', pngPath=logName + '.png', title=plotTitle, script=str(sys.argv[0]))
        
-       txtResp.insert('end', ('==> Create plot and store data to file ... \n'))
-       fig, (ax1, ax2) = plt.subplots(2)
-       fig.suptitle('Sequence #' + str(seqList[channel][4].get()) + ' of ' + str(parList[channel-1][5].get()) + ' #' + str(inpList[channel-1][8].get()) +
-                    '\nTest Params: [FREQ]:' + str(parList[channel-1][2].get()) + ' [RSS]:' + str(parList[channel-1][3].get()) + ' [TEMP]:' + str(parList[3][1].get()) + 
-                    ' [DF]:' + str(parList[channel-1][6].get()) + ' [#Runs]:' + str(seqList[channel][3].get()) + 
-                    '\n[MIR]:' + str(rsmList[channel][2].cget("text")) + ' [MAR]:' + str(rsmList[channel][3].cget("text")) + 
-                    ' [POSA]:' + str(seqList[channel][1].get()) + ' [POSB]:' + str(seqList[channel][2].get()) +
-                    '\n[AVRG Speed B->A]: ' + str(d) + '[mm/s]' + ' [AVRG Speed A->B]: ' + str(e) + '[mm/s]', fontsize=7)  # CALCULATION NOT CORRECT!!
+           if exportCsv:
+               CpscRunLog.ExportCsv(logName + '.cpscrun', logName + '.csv')
+           txtResp.insert('end', ('==> Data stored to ' + logName + '.cpscrun, plot queued for ' + logName + '.png\n'))
        
-       ax1.set_xlabel('Time [s]')
-       ax1.set_ylabel('RLS Position [m]', color='b')
-       ax1.plot(logTimeB, logRlsB, color='b', linestyle='None', marker='.', markersize=3) 
-       ax1.tick_params(axis='y', labelcolor='b')
-       ax1.grid(which='major', linestyle='--', linewidth=0.2)
-       ax1.grid(which='minor', linestyle='-', linewidth=0.1)
-       ax1.minorticks_on()
-       ax2.set_xlabel('Time [s]')
-       ax2.set_ylabel('RLS Position [m]', color='g')
-       ax2.plot(logTimeA, logRlsA, color='g', linestyle='None', marker='.', markersize=3) 
-       ax2.tick_params(axis='y', labelcolor='g')
-       ax2.grid(which='major', linestyle='--', linewidth=0.2)
-       ax2.grid(which='minor', linestyle='-', linewidth=0.1)
-       ax2.minorticks_on()
-                
-       plt.figtext(0.01, 0.01, str(sys.argv[0]), fontsize=5)
-       fig.tight_layout()
-         
-       plt.savefig(str(parList[channel-1][5].get()) + '_' + str(inpList[channel-1][8].get()) + '-' + str(seqList[channel][4].get()) + '.png', dpi=300)
-       plt.show()
-       #plt.close()
-         
-       logData = list(zip(logTimeB, logRlsB, logTimeA, logRlsA))
-        
-       with open(str(parList[channel-1][5].get()) + '_' + str(inpList[channel-1][8].get()) + '-' + str(seqList[channel][4].get()) + '.csv', 'w', newline="") as x:
-           csv.writer(x, delimiter=";", dialect='excel').writerows(logData)
-       x.close()        
+           # Register the run in the run catalog
+           try:
+               with CpscCatalog.CpscCatalog() as catalog:
+                   catalog.AddRun('sequence', runStartTime, duration=time.time() - runStartTime, stage=parList[channel-1][5].get(), positionerId=inpList[channel-1][8].get(),
+                                  channel=channel, sequence=seqList[channel][4].get(), freq=parList[channel-1][2].get(), rss=parList[channel-1][3].get(), temp=parList[3][1].get(),
+                                  df=parList[channel-1][6].get(), mir=rsmList[channel][2].cget("text"), mar=rsmList[channel][3].cget("text"), posA=seqList[channel][1].get(),
+                                  posB=seqList[channel][2].get(), runs=seqList[channel][3].get(), speedToA=d, speedToB=e, dataPath=logName + '.cpscrun',
+                                  csvPath=logName + '.csv' if exportCsv else None, plotPath=logName + '.png', script=sys.argv[0])
+           except CpscCatalog.Error as error:
+               txtResp.insert('end', ('==> Run not registered in the run catalog: ' + str(error) + '\n'), 'e')
 
        txtResp.insert('end', ('==> Sequence Run function finished!\n'))
        txtResp.see("end")       
         
     except IOError:
-        txtResp.insert('end', '==> Communication lost', 'e') 
+        txtResp.insert('end', '==> Communication lost\n', 'e') 
         pass        
+    finally:
+        if moving: # Leg interrupted (communication error): do not leave the positioner running
+            txtResp.insert('end', ('==> Stop moving\n'))
+            if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdStp + '\n'), 's')
+            try:
+                response = cpscScheduler.WriteRead(cmdStp, 1)
+                txtResp.insert('end', ('<== ' + response + '\n'), 'r')
+            except IOError:
+                txtResp.insert('end', ('==> STP failed, stop the positioner manually!\n'), 'e')
+            txtResp.see("end")
 
-    parList[3][6].set(False)
 
 # Bind button press (left mouse click) events to functions
 butVer.bind("<Button-1>", butVer_handle_click)
@@ -1253,11 +1283,30 @@ window.bind("<Delete>", butStp1_handle_click)
 window.bind("<End>", butStp2_handle_click)  
 window.bind("<Next>", butStp3_handle_click)  
 
-# Configure and start RSM read out thread
-rsmReadQueue = Queue()
-rsmReadThrd=thrd.Thread(target=rsmRead_thread)
-rsmReadThrd.daemon = True
-rsmReadThrd.start()
+# Configure the command scheduler (executes the commands of all handlers), the publisher (shares poll streams between consumers) and the RSM read out: fast while moving, slow when idle
+rsmFastInterval = 0.05 # [s] RSM read out interval after a move command and while the positions change
+rsmIdleInterval = 1.0  # [s] RSM read out interval when the positions are settled
+rsmTolerance = 5e-9    # [m] largest change between read outs that counts as settled
+rsmBufferCapacity = 300000 # RSM position samples kept in memory (3 per read out)
+rsmPlotSpan = 60.0     # [s] time shown in the live RLS position plot
+rsmBuffer = None       # Created with the live plot after startup (rsmPlot_create)
+rsmPlot = None
+cpscScheduler = CpscScheduler.CpscScheduler(lambda: CpscSession.GetSession(str(parList[3][0].get()), str(inpList[3][4].get())))
+cpscPublisher = CpscPublisher.CpscPublisher(cpscScheduler)
+reportPool = CpscReport.CpscReportPool() # Sequence plots rendered in worker processes (one per CPU core)
+rsmReadSubscription = cpscPublisher.Subscribe(lambda: 'PGVA ' + str(parList[3][2].get()) + ' ' + str(parList[0][7].get()) + ' ' + str(parList[1][7].get()) + ' ' + str(parList[2][7].get()), rsmFastInterval, rsmRead_update, enabled=parList[3][5].get, timestamps=True,
+                                              adaptive=CpscAdaptiveRate.CpscAdaptiveRate(rsmFastInterval, rsmIdleInterval, rsmTolerance))
+
+# Deferred startup: the live plot in the main loop and the CPSC1 check in a background thread, once the window is interactive
+probeAtStartup = True  # Check for a connected CPSC1 (/VER) after startup
+startupTimer.Defer('livePlot', rsmPlot_create)
+if probeAtStartup: startupTimer.DeferThread('probe', cpscProbe_handle_thread)
+startupTimer.Start(window)
 
 # Main loop (loop until window is closed)
 window.mainloop()
+
+# Stop the scheduler, wait for the queued plots and close the shared COM port session
+cpscScheduler.Close()
+reportPool.Close()
+CpscSession.CloseAll()
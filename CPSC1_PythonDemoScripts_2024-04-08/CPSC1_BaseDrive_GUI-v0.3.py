@@ -24,11 +24,16 @@ import subprocess as sp
 import threading as thrd
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscUiDispatcher
 
 # Create GUI window
 window = tk.Tk()
 
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
+
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
 window.iconphoto(False, p1)
@@ -144,7 +149,7 @@ v = tk.Scrollbar(frm3, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')     
 lblTextBox.pack(side=tk.TOP)
 txtRespFont = ("Courier New", 12)
-txtResp = tk.Text(height=15, width=60, master=frm3, yscrollcommand=v.set)
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(height=15, width=60, master=frm3, scrollbar=v))
 txtResp.tag_configure('e', foreground='red')
 txtResp.tag_configure('s', foreground='blue')
 txtResp.tag_configure('r', foreground='green')
@@ -156,10 +161,12 @@ butVer = tk.Button(text="Info", master=frm4, padx=10, pady=5)
 butGfs = tk.Button(text="Driver Check", master=frm4, padx=10, pady=5)
 butScm = tk.Button(text="Positioner Check", master=frm4, padx=10, pady=5)
 butTxtRespClear = tk.Button(text="Clear command history", master=frm4, padx=10, pady=5)
+inpTxtRespFilter = txtResp.FilterMenu(frm4) # Show all lines or only sent (s), received (r) or error (e) lines
 butWinDevMan = tk.Button(text="Device Manager\n(Windows)", master=frm4)
 
 # Layout of Info and Checks buttons frame
 butTxtRespClear.grid(row=1, column=1, padx=10, pady=10)  
+inpTxtRespFilter.grid(row=1, column=0, padx=10)
 frm4.grid_columnconfigure(2, minsize=20)
 butVer.grid(row=1, column=3, sticky=tk.W)
 butGfs.grid(row=1, column=4, sticky=tk.W)
@@ -182,12 +189,13 @@ def butVer_handle_thread():
    txtResp.insert('end', ('--> Get firmware version information\n'))
    if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdVer + '\n'), 's') 
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:   
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:   
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<-- CPSC1 version: ' + response + '\n'), 'r')
+           responsesFiv = usbVcp.WriteReadMany([cmdFiv + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdFiv + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdFiv + str(x+1), 1)
+               response = responsesFiv[x]
                txtResp.insert('end', ('<-- Slot ' + str(x+1) + ': ' + response + '\n'), 'r')            
                txtResp.see("end")
    except IOError:
@@ -201,10 +209,11 @@ def butGfs_handle_thread():
     cmdGfs = 'GFS '
     txtResp.insert('end', ('--> Get CADM2 failsafe state\n'))
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:    
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:    
+           responsesGfs = usbVcp.WriteReadMany([cmdGfs + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdGfs + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdGfs + str(x+1), 1)
+               response = responsesGfs[x]
                txtResp.insert('end', ('<-- Slot ' + str(x+1) + ': ' + response + '\n'), 'r')
                txtResp.see("end")
     except IOError:
@@ -218,10 +227,11 @@ def butScm_handle_thread():
     cmdScm = 'SCM '
     txtResp.insert('end', ('--> Check piezo in positioners (will take some time) ... \n'))
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:    
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:    
+           responsesScm = usbVcp.WriteReadMany([cmdScm + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdScm + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdScm + str(x+1), 1)
+               response = responsesScm[x]
                txtResp.insert('end', ('<-- Positioner on slot ' + str(x+1) + ': ' + response + '[nF]\n'), 'r')
                txtResp.see("end")
     except IOError:
@@ -236,7 +246,7 @@ def butStp_handle_thread():
     txtResp.insert('end', ('--> Stop movement\n'))
     if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdStp + '\n'), 's')
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:          
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:          
            response = usbVcp.WriteRead(cmdStp, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
            txtResp.see("end")
@@ -253,7 +263,7 @@ def butDir0_handle_thread():
     txtResp.insert('end', ('--> Start movement in DIR=0 direction\n'))
     if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdMov + '\n'), 's')
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:         
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:         
            response = usbVcp.WriteRead(cmdMov, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
        txtResp.see("end")    
@@ -270,7 +280,7 @@ def butDir1_handle_thread():
     txtResp.insert('end', ('--> Start movement in DIR=1 direction\n'))
     if (optVerbose.get()): txtResp.insert('end', ('--> ' + cmdMov + '\n'), 's')
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:    
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:    
            response = usbVcp.WriteRead(cmdMov, 1)
            txtResp.insert('end', ('<-- ' + response + '\n'), 'r')
        txtResp.see("end")
@@ -310,3 +320,6 @@ window.bind("<Prior>", butDir0_handle_click)
  
 # Main loop (loop until window is closed)
 window.mainloop()
+
+# Close the shared COM port session
+CpscSession.CloseAll()
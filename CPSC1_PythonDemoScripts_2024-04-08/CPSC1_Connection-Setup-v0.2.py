@@ -19,11 +19,16 @@ import subprocess as sp
 import threading as thrd
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscFactory
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscUiDispatcher
 
 # Create GUI window
 window = tk.Tk()
 
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
+
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
 window.iconphoto(False, p1)
@@ -146,7 +151,7 @@ v = tk.Scrollbar(frm3, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')                                                                         # Setup scrollbar for frm3
 lblList[11].pack(side=tk.TOP)                                                                           # LABEL: Command History
 txtRespFont = ("Courier New", 11)                                                                       # Set specific font for TEXTBOX
-txtResp = tk.Text(height=15, width=60, master=frm3, yscrollcommand=v.set)                             # Setup TEXTBOX
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(height=15, width=60, master=frm3, scrollbar=v))                             # Setup TEXTBOX
 txtResp.tag_configure('e', foreground='red')                                                            # Setup text in TEXTBOX
 txtResp.tag_configure('s', foreground='blue')                                                           # Setup text in TEXTBOX
 txtResp.tag_configure('r', foreground='green')                                                          # Setup text in TEXTBOX
@@ -170,7 +175,7 @@ def butVer_handle_thread():
    txtResp.insert('end', ('==> Get firmware version information\n'))
    if (optList[2].get()): txtResp.insert('end', ('==> ' + cmdVer + '\n'), 's') 
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optList[0].get())), str(inpList[1].get())) as usbVcp:   
+       with CpscFactory.OpenCpsc(CpscFactory.PortUrl(optList[0].get(), inpList[1].get())) as usbVcp:   
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<== CPSC1 version: ' + response + '\n'), 'r')
            for x in range(6):
@@ -195,7 +200,7 @@ def butBaudrateGet(interface):
     if (optList[2].get()): txtResp.insert('end', ('==> ' + cmdGbr + '\n'), 's')
  
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optList[0].get())), str(inpList[1].get())) as usbVcp:           
+       with CpscFactory.OpenCpsc(CpscFactory.PortUrl(optList[0].get(), inpList[1].get())) as usbVcp:           
            response = usbVcp.WriteRead(cmdGbr, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end")
@@ -225,7 +230,7 @@ def butBaudrateSet(interface):
     if (optList[2].get()): txtResp.insert('end', ('==> ' + cmdSbr + '\n'), 's')
  
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optList[0].get())), str(inpList[1].get())) as usbVcp:           
+       with CpscFactory.OpenCpsc(CpscFactory.PortUrl(optList[0].get(), inpList[1].get())) as usbVcp:           
            response = usbVcp.WriteRead(cmdSbr, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end")
@@ -242,7 +247,7 @@ def funcIpGet():
     if (optList[2].get()): txtResp.insert('end', ('==> ' + cmdIpr + '\n'), 's')
  
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optList[0].get())), str(inpList[1].get())) as usbVcp:    
+       with CpscFactory.OpenCpsc(CpscFactory.PortUrl(optList[0].get(), inpList[1].get())) as usbVcp:    
            response = usbVcp.WriteRead(cmdIpr, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end")
@@ -273,7 +278,7 @@ def funcIpSet():
     if (optList[2].get()): txtResp.insert('end', ('==> ' + cmdIps + '\n'), 's')
  
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optList[0].get())), str(inpList[1].get())) as usbVcp:    
+       with CpscFactory.OpenCpsc(CpscFactory.PortUrl(optList[0].get(), inpList[1].get())) as usbVcp:    
            response = usbVcp.WriteRead(cmdIps, 1)
            txtResp.insert('end', ('<== ' + response + '\n'), 'r')
            txtResp.see("end")
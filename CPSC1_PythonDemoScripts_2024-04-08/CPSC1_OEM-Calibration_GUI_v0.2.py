@@ -16,16 +16,32 @@ verNumber = 'v0.2'
 import time
 import tkinter as tk
 import subprocess as sp
-import csv
-from matplotlib import pyplot as plt
 import threading as thrd
+import sys
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscReport
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscStartup
+from CpscInterfaces import CpscUiDispatcher
+
+# Heavy modules (numpy, matplotlib, sqlite3, csv) are loaded on first use, see CpscStartup
+CpscCatalog = CpscStartup.LazyImport('CpscInterfaces.CpscCatalog')
+CpscLivePlot = CpscStartup.LazyImport('CpscInterfaces.CpscLivePlot')
+CpscLogWriter = CpscStartup.LazyImport('CpscInterfaces.CpscLogWriter')
+CpscRingBuffer = CpscStartup.LazyImport('CpscInterfaces.CpscRingBuffer')
+
+# Startup timing (window-to-interactive, see CPSC1_Startup-Benchmark)
+startupTimer = CpscStartup.CpscStartupTimer()
+startupTimer.Mark('imports')
 
 # Create GUI window
 window = tk.Tk()
 
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
+
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
 window.iconphoto(False, p1)
@@ -38,9 +54,11 @@ frm2 = tk.Frame(width=500, padx=10, pady=10)
 frm3 = tk.Frame(width=500, height=350, padx=10, pady=10) 
 frm4 = tk.Frame(width=500, padx=10, pady=10) 
 frm5 = tk.Frame(width=500, padx=10, pady=10) 
+frm6 = tk.Frame(width=500, padx=10, pady=10)
 frm1.pack() # Inputs
 frm2.pack() # Basedrive buttons
 frm3.pack() # Command history
+frm6.pack() # Live COE plot
 frm4.pack() # Info and checks
 frm5.pack() # Disclaimer
 
@@ -250,7 +268,8 @@ butCoe.grid(row=8, column=9, columnspan=2)
 v = tk.Scrollbar(frm3, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')     
 lblTextBox.pack(side=tk.TOP)
-txtResp = tk.Text(height = 20, master=frm3, yscrollcommand=v.set)
+historySpill = None # File for the command history lines older than the last 10000 (e.g. 'CPSC1_History.csv'), None: drop them
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(height = 20, master=frm3, scrollbar=v, history=CpscHistory.CpscHistory(10000, historySpill)))
 txtResp.tag_configure('e', foreground='red')
 txtResp.tag_configure('s', foreground='blue')
 txtResp.tag_configure('r', foreground='green')
@@ -261,10 +280,12 @@ butVer = tk.Button(text="Info", master=frm4, padx=10, pady=5)
 butGfs = tk.Button(text="Driver Check", master=frm4, padx=10, pady=5)
 butScm = tk.Button(text="Positioner Check", master=frm4, padx=10, pady=5)
 butTxtRespClear = tk.Button(text="Clear command history", master=frm4, padx=10, pady=5)
+inpTxtRespFilter = txtResp.FilterMenu(frm4) # Show all lines or only sent (s), received (r) or error (e) lines
 butWinDevMan = tk.Button(text="Device Manager\n(Windows)", master=frm4)
 
 # Layout of Info and Checks buttons frame
 butTxtRespClear.grid(row=1, column=1, padx=10, pady=10)  
+inpTxtRespFilter.grid(row=1, column=0, padx=10)
 frm4.grid_columnconfigure(2, minsize=20)
 butVer.grid(row=1, column=3, sticky=tk.W)
 butGfs.grid(row=1, column=4, sticky=tk.W)
@@ -282,26 +303,46 @@ def butVer_handle_click(event):
    cmdFiv = 'FIV '
    txtResp.insert('end', ('==> Get firmware version information\n'))
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:   
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:   
            if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdVer + '\n'), 's') 
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<== CPSC1 version: ' + response + '\n'), 'r')
+           responsesFiv = usbVcp.WriteReadMany([cmdFiv + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdFiv + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdFiv + str(x+1), 1)
+               response = responsesFiv[x]
                txtResp.insert('end', ('<== Slot ' + str(x+1) + ': ' + response + '\n'), 'r')            
            txtResp.see("end")
    except IOError:
        txtResp.insert('end', errConnect, 'e')     
 
+def cpscProbe_handle_thread():
+   # Deferred startup task (background thread, the window is already usable): is a CPSC1 connected?
+   cmdVer = '/VER'
+   try:
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:
+           response = usbVcp.WriteRead(cmdVer, 1)
+           txtResp.insert('end', ('<== CPSC1 version: ' + response + '\n'), 'r')
+   except IOError:
+       txtResp.insert('end', ('==> No CPSC1 found at startup, check the connection and the COM port settings\n'))
+   txtResp.see("end")
+
+def coePlot_create():
+    # Deferred startup task (after the window is interactive): the live plot loads numpy and matplotlib
+    global coeBuffer, coePlot
+    coeBuffer = CpscRingBuffer.CpscRingBuffer(coeBufferCapacity)
+    coePlot = CpscLivePlot.CpscLivePlot(frm6, coeBuffer, channels=(1,), span=coePlotSpan, ylabel='COE POS [counts]', labels=('COE POS',), colors=('r',))
+    coePlot.Widget().pack(side=tk.TOP)
+
 def butGfs_handle_click(event):
     cmdGfs = 'GFS '
     txtResp.insert('end', ('==> Get CADM2 failsafe state\n'))
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:    
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:    
+           responsesGfs = usbVcp.WriteReadMany([cmdGfs + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdGfs + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdGfs + str(x+1), 1)
+               response = responsesGfs[x]
                txtResp.insert('end', ('<== Slot ' + str(x+1) + ': ' + response + '\n'), 'r')
            txtResp.see("end")
     except IOError:
@@ -315,10 +356,11 @@ def butScm_handle_thread():
     cmdScm = 'SCM '
     txtResp.insert('end', ('==> Check piezo in positioners (will take some time) ... \n'))
     try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:    
+       with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:    
+           responsesScm = usbVcp.WriteReadMany([cmdScm + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdScm + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdScm + str(x+1), 1)
+               response = responsesScm[x]
                txtResp.insert('end', ('<== Positioner on slot ' + str(x+1) + ': ' + response + '[nF]\n'), 'r')
            txtResp.see("end")
     except IOError:
@@ -332,10 +374,11 @@ def butMls_handle_thread():
     cmdMls = 'MLS ' + str(optOemAddr.get()) + ' '
     txtResp.insert('end', ('==> Get current OEM calibration values.\n'))
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:   
+        with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:   
+            responsesMls = usbVcp.WriteReadMany([cmdMls + str(x+1) for x in range(3)], 1)
             for x in range(3):
                 if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdMls + str(x+1) + '\n'), 's')
-                response = usbVcp.WriteRead(cmdMls + str(x+1), 1)
+                response = responsesMls[x]
                 responseOem = response.split(",")  
                 txtResp.insert('end', ('<== Ch' + str(x+1) + ': Gain: ' + responseOem[0] + '  Lower Threshold: ' + responseOem[2] + '  Upper Threshold: ' + responseOem[1] + '\n'), 'r')            
             txtResp.see("end")
@@ -354,7 +397,7 @@ def butMss_handle_thread():
     txtResp.insert('end', ('==> Store selected OEM calibration values.\n'))
       
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:   
+        with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp:   
             for x in range(3):
                 if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdDsg + str(x+1) + '\n'), 's')
                 response = usbVcp.WriteRead(cmdDsg + str(x+1) + ' ' + str(inpOemCal[0][x].get()), 1)
@@ -375,6 +418,15 @@ def butCoe_handle_click(event):
     butCoeThrd=thrd.Thread(target=butCoe_handle_thread)
     butCoeThrd.start()
     
+def report_done(future, pngPath):
+    # Called by the report pool (in a pool thread) when a plot has been rendered
+    try:
+        future.result()
+        txtResp.insert('end', ('==> Plot stored to ' + pngPath + '\n'))
+    except IOError as error:
+        txtResp.insert('end', ('==> ' + str(error) + '\n'), 'e')
+    txtResp.see("end")
+
 def butCoe_handle_thread():    
     startTime = 0
     passedTime = 0
@@ -392,10 +444,15 @@ def butCoe_handle_thread():
     cmdDgv = 'DGV ' + str(optOemAddr.get()) + ' ' + str(optOemCh.get())
     cmdCgv = 'CGV ' + str(optOemAddr.get()) + ' ' + str(optOemCh.get())
 
+    # Log file, written while the COE check runs (one row per sample)
+    logFile = str(optStage.get()) + '_' + str(inpPosId.get()) + '_' + str(inpCoeId.get()) + '-' + str(optCoeRun.get()) + '.csv'
+    logHeader = ['Time [s]', 'COE POS [counts]', 'COE RAW value']
+
     txtResp.insert('end', ('==> Start COE check. Please be patient!\n'))
+    runStartTime = time.time() # For the run catalog
        
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(optCom.get())), str(inpBdr.get())) as usbVcp:   
+        with CpscSession.GetSession(str(optCom.get()), str(inpBdr.get())) as usbVcp, CpscLogWriter.CpscLogWriter(logFile, logHeader) as coeLog:
             txtResp.insert('end', ('==> Get current OEM calibration values.\n'))  
             if (optVerbose.get()): txtResp.insert('end', ('==> ' + cmdMls + '\n'), 's')
             response = usbVcp.WriteRead(cmdMls, 1)
@@ -432,12 +489,13 @@ def butCoe_handle_thread():
             txtResp.insert('end', ('<== ' + response + '\n'), 'r')
             
             while not (passedTime > int(optCoeTimerB.get())):        
-                responseDgvTemp = usbVcp.WriteRead(cmdDgv, 1)
+                responseDgvTemp, responseCgvTemp = usbVcp.WriteReadMany([cmdDgv, cmdCgv], 1)
                 responseDgv.append(int(responseDgvTemp))
-                responseCgvTemp = usbVcp.WriteRead(cmdCgv, 1)
                 responseCgv.append(int(responseCgvTemp))       
                 passedTime = time.time() - startTime
                 responseTime.append(passedTime)
+                coeLog.WriteRow([passedTime, responseCgvTemp, responseDgvTemp])
+                if coeBuffer is not None: coeBuffer.Append(time.monotonic(), 1, int(responseCgvTemp)) # Live plot (created after startup)
                 txtResp.insert('end', ('<== ET: ' + str(round((passedTime),1)) + ', CGV: ' + responseCgvTemp + ', DGV: ' + responseDgvTemp + '\n'), 'r')
                 txtResp.see("end")
    
@@ -451,34 +509,26 @@ def butCoe_handle_thread():
         txtResp.insert('end', errConnect, 'e')       
            
     txtResp.insert('end', ('==> Create plot and store data to file ... \n'))
-    fig, (ax1) = plt.subplots(1)
-    fig.suptitle(str(optStage.get()) + ' #' + str(inpPosId.get()) + ' | COE #' + str(inpCoeId.get()) + ' | Run #' + str(optCoeRun.get()) + 
+    # Plot rendered by a worker process (CpscReport) from the log file, the handler thread does not wait for it
+    plotFile = str(optStage.get()) + '_' + str(inpPosId.get()) + '_' + str(inpCoeId.get()) + '-' + str(optCoeRun.get()) + '.png'
+    plotTitle = (str(optStage.get()) + ' #' + str(inpPosId.get()) + ' | COE #' + str(inpCoeId.get()) + ' | Run #' + str(optCoeRun.get()) + 
                  '\nTest Param: [FREQ]:' + str(optCoeFreq.get()) + ' [RSS]:' + str(optRss.get()) + ' [TEMP]:' + str(optTemp.get()) + ' [DF]:' + str(optDf.get()) + 
                  ' | OEM [GAIN]:' + responseOem[0] + ' [UT]:' + responseOem[1] + ' [LT]:' + responseOem[2] +
-                 '\n(measured around mid-stroke of COE)', fontsize=8)
-    ax1.set_xlabel('Time [s]')
-    ax1.set_ylabel('COE POS [counts]', color='r')
-    ax1.plot(responseTime, responseCgv, color='r', linewidth=0.5)
-    ax1.tick_params(axis='y', labelcolor='r')
-    ax1.grid(linestyle = '--', linewidth = 0.2)
-    ax2 = ax1.twinx()
-    ax2.set_ylabel('COE RAW value', color='b')
-    ax2.plot(responseTime, responseDgv, color='b', linewidth=0.5)
-    ax2.tick_params(axis='y', labelcolor='b')
-    ax2.axhline(y = int(responseOem[1]), color = 'tab:gray', linestyle = 'dashed')
-    ax2.axhline(y = int(responseOem[2]), color = 'tab:gray', linestyle = 'dashed')
-    fig.tight_layout()
-     
-    plt.savefig(str(optStage.get()) + '_' + str(inpPosId.get()) + '_' + str(inpCoeId.get()) + '-' + str(optCoeRun.get()) + '.png', dpi=300)
-    plt.show()
+                 '\n(measured around mid-stroke of COE)')
+    reportPool.Submit('coe', callback=lambda future: report_done(future, plotFile),
+                      csvPath=logFile, pngPath=plotFile, title=plotTitle, upperThreshold=responseOem[1], lowerThreshold=responseOem[2])
     
-    #plt.close()
+    # Register the run in the run catalog
+    try:
+        with CpscCatalog.CpscCatalog() as catalog:
+            catalog.AddRun('coe', runStartTime, duration=time.time() - runStartTime, stage=optStage.get(), positionerId=inpPosId.get(), coeId=inpCoeId.get(),
+                           sequence=optCoeRun.get(), freq=optCoeFreq.get(), rss=optRss.get(), temp=optTemp.get(), df=optDf.get(), dataPath=logFile,
+                           plotPath=plotFile, script=sys.argv[0],
+                           gain=responseOem[0], upperThreshold=responseOem[1], lowerThreshold=responseOem[2], coeCount=max(responseCgv, default=None))
+    except CpscCatalog.Error as error:
+        txtResp.insert('end', ('==> Run not registered in the run catalog: ' + str(error) + '\n'), 'e')
      
-    TimeData = list(zip(responseTime, responseCgv, responseDgv))
-    
-    with open(str(optStage.get()) + '_' + str(inpPosId.get()) + '_' + str(inpCoeId.get()) + '-' + str(optCoeRun.get()) +'.csv', 'w', newline="") as x:
-        csv.writer(x, delimiter=";", dialect='excel').writerows(TimeData)
-    x.close()        
+    txtResp.insert('end', ('==> Data stored to ' + logFile + ', plot queued for ' + plotFile + '\n'))
 
     txtResp.insert('end', ('==> COE Count: ' + str(max(responseCgv)) + '\n'))
     txtResp.insert('end', ('==> Duration: ' + str(round((passedTime),1)) + '\n'))
@@ -506,5 +556,24 @@ txtResp.insert('end', ('==> Note: check CADM Address and OEM Address/Channel set
 txtResp.insert('end', ('==> Run "Start COE check" to see if these values are okay for the connected stage type (a graph will be created and stored in the script folder).\n'))
 txtResp.insert('end', ('==> If necessary update Gain and Threshold values and store settings ("Store OEM values") and run "Start COE check" again.\n'))
 
+# Live plot of the COE counter during a COE check
+coeBufferCapacity = 300000 # COE samples kept in memory
+coePlotSpan = 120.0   # [s] time shown in the live COE plot
+coeBuffer = None      # Created with the live plot after startup (coePlot_create)
+coePlot = None
+
+# COE check plots rendered in worker processes (one per CPU core)
+reportPool = CpscReport.CpscReportPool()
+
+# Deferred startup: the live plot in the main loop and the CPSC1 check in a background thread, once the window is interactive
+probeAtStartup = True # Check for a connected CPSC1 (/VER) after startup
+startupTimer.Defer('livePlot', coePlot_create)
+if probeAtStartup: startupTimer.DeferThread('probe', cpscProbe_handle_thread)
+startupTimer.Start(window)
+
 # Main loop (loop until window is closed)
 window.mainloop()
+
+# Wait for the queued plots and close the shared COM port session
+reportPool.Close()
+CpscSession.CloseAll()
@@ -0,0 +1,60 @@
+###############################################################################
+# File name:      CPSC1_Run-Catalog_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+# Description:    Query the run catalog (CPSC1_Runs.sqlite, see
+#                 CpscInterfaces/CpscCatalog.py) that the RLS GUI and the OEM
+#                 calibration GUI fill, or add existing binary run logs.
+#                 Usage: python CPSC1_Run-Catalog-v0.1.py [column=value | column=low..high | since=date | until=date | limit=n] ...
+#                        e.g. stage=CLA2601 temp=0..10 since=2026-10-01
+#                        python CPSC1_Run-Catalog-v0.1.py import CLA2601_1234-1.cpscrun ...
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import os
+import sys
+import time
+
+# JPE imports
+from CpscInterfaces import CpscCatalog
+from CpscInterfaces import CpscRunLog
+
+# Run log settings (see CPSC1_BaseDrive-RLS_GUI): catalog column
+runLogColumns = {'stage': 'stage', 'serial': 'positionerId', 'channel': 'channel', 'sequence': 'sequence', 'FREQ': 'freq', 'RSS': 'rss',
+                 'TEMP': 'temp', 'DF': 'df', 'MIR': 'mir', 'MAR': 'mar', 'POSA': 'posA', 'POSB': 'posB', 'runs': 'runs'}
+
+def importRunLog(catalog, path):
+    runLog = CpscRunLog.CpscRunLog(path)
+    fields = {}
+    for name, value in runLog.metadata.items():
+        fields[runLogColumns.get(name, name)] = value
+    return catalog.AddRun('sequence', os.path.getmtime(path), dataPath=path, **fields)
+
+def parseCondition(argument):
+    name, value = argument.split('=', 1)
+    if '..' in value:
+        return name, tuple(value.split('..', 1))
+    return name, value
+
+print(f'CPSC1 run catalog ({verNumber}): {CpscCatalog.defaultPath}')
+with CpscCatalog.CpscCatalog() as catalog:
+    if len(sys.argv) > 1 and sys.argv[1] == 'import':
+        for path in sys.argv[2:]:
+            print(f'Added {path} as run {importRunLog(catalog, path)}')
+        sys.exit(0)
+
+    conditions = dict(parseCondition(argument) for argument in sys.argv[1:])
+    startTime = time.perf_counter()
+    runs = catalog.Find(**conditions)
+    queryTime = time.perf_counter() - startTime
+    print(f'{"id":>5} {"started":19} {"kind":8} {"stage":12} {"pos. ID":10} {"FREQ":>6} {"TEMP":>6} {"->A":>8} {"->B":>8}  data')
+    for run in runs:
+        print(f'{run["id"]:5} {run["started"]:19} {run["kind"]:8} {run["stage"] or "":12} {run["positionerId"] or "":10} '
+              f'{run["freq"] if run["freq"] is not None else "":>6} {run["temp"] if run["temp"] is not None else "":>6} '
+              f'{run["speedToA"] if run["speedToA"] is not None else "":>8} {run["speedToB"] if run["speedToB"] is not None else "":>8}  {run["dataPath"] or ""}')
+    print(f'{len(runs)} of {catalog.Count()} runs, query {1000 * queryTime:.1f} [ms]')
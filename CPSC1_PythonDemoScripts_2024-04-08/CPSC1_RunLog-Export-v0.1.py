@@ -0,0 +1,35 @@
+###############################################################################
+# File name:      CPSC1_RunLog-Export_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+# Description:    Show the settings of a binary run log (*.cpscrun, see
+#                 CpscInterfaces/CpscRunLog.py) and export it as ';'
+#                 separated CSV, e.g. for Excel.
+#                 Usage: python CPSC1_RunLog-Export-v0.1.py CLA2601_1234-1.cpscrun [csv file]
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import sys
+import time
+
+# JPE imports
+from CpscInterfaces import CpscRunLog
+
+if len(sys.argv) < 2:
+    print('Usage: python CPSC1_RunLog-Export-v0.1.py <run log> [csv file]')
+    sys.exit(2)
+logPath = sys.argv[1]
+csvPath = sys.argv[2] if len(sys.argv) > 2 else None
+
+runLog = CpscRunLog.CpscRunLog(logPath)
+print(f'CPSC1 run log export ({verNumber}): {logPath}, {len(runLog)} rows, columns {", ".join(runLog.names)}')
+for name, value in runLog.metadata.items():
+    print(f'  {name:10} {value}')
+startTime = time.perf_counter()
+csvPath = CpscRunLog.ExportCsv(logPath, csvPath)
+print(f'Exported to {csvPath} in {time.perf_counter() - startTime:.1f} [s]')
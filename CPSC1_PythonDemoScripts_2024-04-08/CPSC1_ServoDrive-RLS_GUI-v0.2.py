@@ -17,14 +17,20 @@ import time
 import tkinter as tk
 import subprocess as sp
 import threading as thrd
-from queue import Queue
 
 # JPE imports
-from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscHistory
+from CpscInterfaces import CpscPublisher
+from CpscInterfaces import CpscScheduler
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscUiDispatcher
 
 # Create GUI window
 window = tk.Tk()
 
+# Widgets updated by worker threads go through the UI dispatcher (executed in batches by the Tk main loop)
+uiDispatcher = CpscUiDispatcher.CpscUiDispatcher(window)
+
 # Setup icon global window parameters
 p1 = tk.PhotoImage(file = 'jpe.png')
 window.iconphoto(False, p1)
@@ -77,8 +83,6 @@ parList[3][0] = tk.StringVar(window) # COM Port
 parList[3][0].set('1')
 parList[3][3] = tk.IntVar()          # Show commands toggle
 parList[3][3].set(False)
-parList[3][6] = tk.IntVar()          # Command lock
-parList[3][6].set(False)
 
 # Setup text labels
 lblList = [0]*22
@@ -140,14 +144,14 @@ inpList[3][4].insert(0, "115200") # BaudRate
 
 # Setup Status List
 stsList = [[0]*8 for i in range(4)]
-stsList[0][0] = tk.Label(text="0",master=frm2) 
-stsList[0][1] = tk.Label(text="0",master=frm2) 
-stsList[1][0] = tk.Label(text="0",master=frm2) 
-stsList[1][1] = tk.Label(text="0",master=frm2) 
-stsList[1][2] = tk.Label(text="0",master=frm2) 
-stsList[2][0] = tk.Label(text="0",master=frm2) 
-stsList[2][1] = tk.Label(text="0",master=frm2) 
-stsList[2][2] = tk.Label(text="0",master=frm2) 
+stsList[0][0] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[0][1] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[1][0] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[1][1] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[1][2] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[2][0] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[2][1] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
+stsList[2][2] = uiDispatcher.Proxy(tk.Label(text="0",master=frm2)) 
 
 # Setup Move and Stop buttons   
 butFben = tk.Button(text="FBEN [Home]", master=frm3, padx=20)
@@ -211,7 +215,7 @@ butFbcs.grid(row=1, column=7)
 v = tk.Scrollbar(frm4, orient='vertical')
 v.pack(side=tk.RIGHT, fill='y')     
 lblList[10].pack(side=tk.TOP)
-txtResp = tk.Text(master=frm4, yscrollcommand=v.set)
+txtResp = uiDispatcher.Proxy(CpscHistory.CpscHistoryView(master=frm4, scrollbar=v))
 txtResp.tag_configure('e', foreground='red')
 txtResp.tag_configure('s', foreground='blue')
 txtResp.tag_configure('r', foreground='green')
@@ -220,10 +224,12 @@ txtResp.pack(side=tk.TOP)
 # Setup Info and Checks buttons
 butVer = tk.Button(text="Info", master=frm5, padx=10, pady=5)
 butTxtRespClear = tk.Button(text="Clear command history", master=frm5, padx=10, pady=5)
+inpTxtRespFilter = txtResp.FilterMenu(frm5) # Show all lines or only sent (s), received (r) or error (e) lines
 butWinDevMan = tk.Button(text="Device Manager\n(Windows)", master=frm5)
 
 # Layout of Info and Checks buttons frame
 butTxtRespClear.grid(row=1, column=1, padx=10, pady=10)  
+inpTxtRespFilter.grid(row=1, column=0, padx=10)
 frm5.grid_columnconfigure(2, minsize=20)
 butVer.grid(row=1, column=3, sticky=tk.W)
 frm5.grid_columnconfigure(6, minsize=20)
@@ -242,16 +248,15 @@ def butVer_handle_thread():
    cmdFiv = 'FIV '
    txtResp.insert('end', ('==> Get firmware version information\n'))
    if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdVer + '\n'), 's') 
-   while not fbstReadQueue.empty(): 
-       time.sleep(0.1)
    parList[2][2].set(False)
    try:
-       with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:   
+       with cpscScheduler as usbVcp:   
            response = usbVcp.WriteRead(cmdVer, 1)
            txtResp.insert('end', ('<== CPSC1 version: ' + response + '\n'), 'r')
+           responsesFiv = usbVcp.WriteReadMany([cmdFiv + str(x+1) for x in range(6)], 1)
            for x in range(6):
                if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFiv + str(x+1) + '\n'), 's')
-               response = usbVcp.WriteRead(cmdFiv + str(x+1), 1)
+               response = responsesFiv[x]
                txtResp.insert('end', ('<== Slot ' + str(x+1) + ': ' + response + '\n'), 'r')            
                txtResp.see("end")
    except IOError:
@@ -264,19 +269,15 @@ def butFben_handle_click(event):
 def butFben_handle_thread():  
     cmdFben = 'FBEN ' + str(parList[0][0].get()) + ' ' + str(parList[0][1].get()) + ' ' + str(parList[0][2].get()) + ' ' + str(parList[0][3].get()) + ' ' + str(parList[0][4].get()) + ' ' + str(parList[0][5].get()) + ' ' + str(parList[2][0].get()) + ' ' + str(parList[2][1].get())
     txtResp.insert('end', ('==> Enable Servodrive mode with set parameters ... \n'))
-    while not fbstReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFben + '\n'), 's')
     parList[2][2].set(True)
-    parList[3][6].set(True)
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+        with cpscScheduler as usbVcp:        
             response = usbVcp.WriteRead(cmdFben, 1)
             txtResp.insert('end', ('<== ' + response + '\n'), 'r')
             txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
 
 def butFbxt_handle_click(event):
     butFbxtThrd=thrd.Thread(target=butFbxt_handle_thread, daemon=True)
@@ -285,18 +286,14 @@ def butFbxt_handle_click(event):
 def butFbxt_handle_thread():  
     cmdFbxt = 'FBXT' 
     txtResp.insert('end', ('==> Disable Servodrvie mode... \n'))
-    while not fbstReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFbxt + '\n'), 's')  
-    parList[3][6].set(True)
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+        with cpscScheduler as usbVcp:        
             response = usbVcp.WriteRead(cmdFbxt, 1)
             txtResp.insert('end', ('<== ' + response + '\n'), 'r')
             txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
 
 def butFbes_handle_click(event):
     butFbesThrd=thrd.Thread(target=butFbes_handle_thread, daemon=True)
@@ -305,18 +302,14 @@ def butFbes_handle_click(event):
 def butFbes_handle_thread():  
     cmdFbes = 'FBES' 
     txtResp.insert('end', ('==> Stop current ServoDrive motion... \n'))
-    while not fbstReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFbes + '\n'), 's')  
-    parList[3][6].set(True)
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+        with cpscScheduler as usbVcp:        
             response = usbVcp.WriteRead(cmdFbes, 1)
             txtResp.insert('end', ('<== ' + response + '\n'), 'r')
             txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
 
 def butFbcs_handle_click(event):
     butFbcsThrd=thrd.Thread(target=butFbcs_handle_thread, daemon=True)
@@ -325,43 +318,28 @@ def butFbcs_handle_click(event):
 def butFbcs_handle_thread():  
     cmdFbcs = 'FBCS ' + str(inpList[1][0].get()) + ' ' + str(parList[1][1].get()) + ' ' + str(inpList[1][2].get()) + ' ' + str(parList[1][3].get()) + ' ' + str(inpList[1][4].get()) + ' ' + str(parList[1][5].get())
     txtResp.insert('end', ('==> Start moving to setpoint ... \n'))
-    while not fbstReadQueue.empty(): 
-        time.sleep(0.1)
     if (parList[3][3].get()): txtResp.insert('end', ('==> ' + cmdFbcs + '\n'), 's')
     parList[2][2].set(True)
-    parList[3][6].set(True)
     try:
-        with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
+        with cpscScheduler as usbVcp:        
             response = usbVcp.WriteRead(cmdFbcs, 1)
             txtResp.insert('end', ('<== ' + response + '\n'), 'r')
             txtResp.see("end")    
     except IOError:
         txtResp.insert('end', errConnect, 'e')  
-    parList[3][6].set(False)
            
-def fbstRead_thread():
-    while(True):
-        if (parList[2][2].get()) and not(parList[3][6].get()):
-            fbstReadQueue.put(1)
-            cmdFbst = 'FBST'
-            try:
-                with CpscSerial.CpscSerialInterface(('COM' + str(parList[3][0].get())), str(inpList[3][4].get())) as usbVcp:        
-                    response = usbVcp.WriteRead(cmdFbst, 1)
-                    responseSplit = response.split(",")
-                    stsList[0][0].config(text=responseSplit[0], fg='green') # Enable flag
-                    stsList[0][1].config(text=responseSplit[1], fg='purple') # Finished flag
-                    stsList[1][0].config(text=responseSplit[2], fg='red') # Invalid SP X
-                    stsList[1][1].config(text=responseSplit[3], fg='red') # Invalid SP Y
-                    stsList[1][2].config(text=responseSplit[4], fg='red') # Invalid SP Z
-                    stsList[2][0].config(text=responseSplit[5], fg='blue') # Pos Error X
-                    stsList[2][1].config(text=responseSplit[6], fg='blue') # Pos Error Y
-                    stsList[2][2].config(text=responseSplit[7], fg='blue') # Pos Error Z
-                    #txtResp.insert('end', ('<== ' + response + '\n'), 'r')
-                    #txtResp.see("end")    
-            except IOError:
-                pass
-            fbstReadQueue.get(1)
-        time.sleep(0.5)   
+def fbstRead_update(response):
+    responseSplit = response.split(",")
+    stsList[0][0].config(text=responseSplit[0], fg='green') # Enable flag
+    stsList[0][1].config(text=responseSplit[1], fg='purple') # Finished flag
+    stsList[1][0].config(text=responseSplit[2], fg='red') # Invalid SP X
+    stsList[1][1].config(text=responseSplit[3], fg='red') # Invalid SP Y
+    stsList[1][2].config(text=responseSplit[4], fg='red') # Invalid SP Z
+    stsList[2][0].config(text=responseSplit[5], fg='blue') # Pos Error X
+    stsList[2][1].config(text=responseSplit[6], fg='blue') # Pos Error Y
+    stsList[2][2].config(text=responseSplit[7], fg='blue') # Pos Error Z
+    #txtResp.insert('end', ('<== ' + response + '\n'), 'r')
+    #txtResp.see("end")    
 
 def txtResp_clear_click(event):
     txtResp.delete("1.0", "end")
@@ -395,10 +373,10 @@ window.bind("<End>", butFbxt_handle_click)
 window.bind("<Prior>", butFbes_handle_click)
 window.bind("<Next>", butFbcs_handle_click)  
 
-fbstReadQueue = Queue()
-fbstReadThrd=thrd.Thread(target=fbstRead_thread)
-fbstReadThrd.daemon = True
-fbstReadThrd.start()
+# Configure the command scheduler (executes the commands of all handlers), the publisher (shares poll streams between consumers) and the FBST read out
+cpscScheduler = CpscScheduler.CpscScheduler(lambda: CpscSession.GetSession(str(parList[3][0].get()), str(inpList[3][4].get())))
+cpscPublisher = CpscPublisher.CpscPublisher(cpscScheduler)
+fbstReadSubscription = cpscPublisher.Subscribe(lambda: 'FBST', 0.5, fbstRead_update, enabled=parList[2][2].get)
 
 # Display some initial tips and hints
 txtResp.insert('end', ('==> Note: Before using ServoDrive make sure the connected RSM module has been calibrated for the connected -RLS sensor(s). See Software User Manual for more information.\n'))
@@ -406,5 +384,6 @@ txtResp.insert('end', ('==> Note: Before using ServoDrive make sure the connecte
 # Main loop (loop until window is closed)
 window.mainloop()
 
-
-
+# Stop the scheduler and close the shared COM port session
+cpscScheduler.Close()
+CpscSession.CloseAll()
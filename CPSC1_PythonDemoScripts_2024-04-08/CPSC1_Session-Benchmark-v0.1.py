@@ -0,0 +1,60 @@
+###############################################################################
+# File name:      CPSC1_Session-Benchmark_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9, requires pyserial
+# Description:    Measure the number of commands per second when opening the
+#                 COM port for every command (as the GUIs used to do) versus
+#                 using one shared CpscSession.
+#                 Prints the latency per command and of opening the port
+#                 (CpscMetrics), optionally stored as JSON.
+#                 Usage: python CPSC1_Session-Benchmark-v0.1.py COM7 115200 200 [metrics.json]
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import sys
+import time
+
+# JPE imports
+from CpscInterfaces import CpscMetrics
+from CpscInterfaces import CpscSerialInterface as CpscSerial
+from CpscInterfaces import CpscSession
+
+comPort = sys.argv[1] if len(sys.argv) > 1 else 'COM1'
+baudrate = sys.argv[2] if len(sys.argv) > 2 else '115200'
+cmdCount = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+metricsPath = sys.argv[4] if len(sys.argv) > 4 else None
+cmdBench = '/VER'
+metrics = CpscMetrics.Enable()
+
+print(f'CPSC1 session benchmark ({verNumber}): {cmdCount}x {cmdBench} on {comPort} @ {baudrate}')
+
+# Before: open, flush and close the port for every command
+startTime = time.perf_counter()
+for x in range(cmdCount):
+    with CpscSerial.CpscSerialInterface(comPort, baudrate) as usbVcp:
+        usbVcp.WriteRead(cmdBench, 1)
+passedTime = time.perf_counter() - startTime
+openRate = cmdCount / passedTime
+print(f'Port open per command: {openRate:8.1f} [cmd/s] ({1000 * passedTime / cmdCount:.2f} [ms/cmd])')
+
+# After: one shared session for all commands
+startTime = time.perf_counter()
+for x in range(cmdCount):
+    with CpscSession.GetSession(comPort, baudrate) as usbVcp:
+        usbVcp.WriteRead(cmdBench, 1)
+passedTime = time.perf_counter() - startTime
+sessionRate = cmdCount / passedTime
+print(f'Shared session:        {sessionRate:8.1f} [cmd/s] ({1000 * passedTime / cmdCount:.2f} [ms/cmd])')
+print(f'Speed-up:              {sessionRate / openRate:8.1f}x')
+
+CpscSession.CloseAll()
+print()
+print(metrics.Report())
+if metricsPath:
+    metrics.Dump(metricsPath)
+    print(f'Metrics stored in {metricsPath}')
@@ -0,0 +1,44 @@
+###############################################################################
+# File name:      CPSC1_Simulator_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+# Description:    Run a simulated CPSC1 (see CpscInterfaces/CpscSimulator.py)
+#                 on TCP port 2000 and, on Linux/macOS, on a pseudo terminal
+#                 that can be used as COM port in the GUIs and benchmarks.
+#                 Usage: python CPSC1_Simulator-v0.1.py [latency ms] [jitter ms] [tcp port]
+#                 e.g. 'python CPSC1_Simulator-v0.1.py 2 1' and enter
+#                 tcp://127.0.0.1 or the printed /dev/pts/N as COM port.
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import sys
+import time
+
+# JPE imports
+from CpscInterfaces import CpscSimulator
+
+latency = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.002
+jitter = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.0
+tcpPort = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+simulator = CpscSimulator.CpscSimulator(latency, jitter)
+print(f'CPSC1 simulator ({verNumber}), response latency {1000 * latency:.1f} [ms] + 0..{1000 * jitter:.1f} [ms] jitter')
+server = CpscSimulator.ServeTcp(simulator, '0.0.0.0', tcpPort)
+print(f'Ethernet:    tcp://127.0.0.1:{tcpPort}')
+try:
+    print(f'Serial port: {CpscSimulator.ServePty(simulator, 115200)} (115200 baud transfer time)')
+except (ImportError, OSError):
+    print('Serial port: not available on this platform')
+print('Press Ctrl+C to stop')
+
+try:
+    while True:
+        time.sleep(1)
+except KeyboardInterrupt:
+    server.shutdown()
+    print(f'Stopped after {simulator.commandCount} commands')
@@ -0,0 +1,64 @@
+###############################################################################
+# File name:      CPSC1_Startup-Benchmark_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9, requires tkinter
+# Description:    Measure the startup time of the GUIs: every GUI is started
+#                 'runs' times with CPSC_STARTUP_BENCHMARK set (CpscStartup),
+#                 it reports its startup phases and closes itself when the
+#                 deferred startup tasks are done. Prints per phase the
+#                 median, min and max time since the launch [ms], the
+#                 window-to-interactive time (window shown until the main
+#                 loop handles input) and the load times of the lazy modules.
+#                 Usage: python CPSC1_Startup-Benchmark-v0.1.py [runs] [GUI script ...]
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import os
+import sys
+import json
+import time
+import statistics
+import subprocess as sp
+
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+scripts = sys.argv[2:] or ['CPSC1_BaseDrive-RLS_GUI-v0.6.py', 'CPSC1_OEM-Calibration_GUI_v0.2.py']
+timeout = 60.0 # [s] per start
+scriptDir = os.path.dirname(os.path.abspath(__file__)) # The GUIs load jpe.png from the working directory
+
+def StartGui(script):
+    # Start the GUI once; returns its report (marks, loads) with the time until the process ended
+    environment = dict(os.environ, CPSC_STARTUP_BENCHMARK=repr(time.time()))
+    launchTime = time.time()
+    result = sp.run([sys.executable, script], cwd=scriptDir, env=environment, capture_output=True, text=True, timeout=timeout)
+    exitTime = time.time() - launchTime
+    for line in result.stdout.splitlines():
+        if line.startswith('CPSC_STARTUP '):
+            report = json.loads(line[len('CPSC_STARTUP '):])
+            report['marks']['exit'] = exitTime
+            return report
+    raise RuntimeError(f'{script} did not report its startup (exit code {result.returncode}): {result.stderr.strip()[-500:]}')
+
+print(f'CPSC1 startup benchmark ({verNumber}): {runs} starts per GUI')
+for script in scripts:
+    reports = [StartGui(script) for x in range(runs)]
+    print()
+    print(f'{script}')
+    print(f'  {"phase":<22}{"median":>10}{"min":>10}{"max":>10} [ms since launch]')
+    for phase in reports[0]['marks']:
+        values = [1000 * report['marks'][phase] for report in reports if phase in report['marks']]
+        print(f'  {phase:<22}{statistics.median(values):10.1f}{min(values):10.1f}{max(values):10.1f}')
+    values = [1000 * (report['marks']['interactive'] - report['marks']['mapped']) for report in reports]
+    print(f'  {"window-to-interactive":<22}{statistics.median(values):10.1f}{min(values):10.1f}{max(values):10.1f}')
+    values = [1000 * report['marks']['interactive'] for report in reports]
+    print(f'  {"launch-to-interactive":<22}{statistics.median(values):10.1f}{min(values):10.1f}{max(values):10.1f}')
+    loads = {}
+    for report in reports:
+        for module, loadTime in report['loads'].items():
+            loads.setdefault(module, []).append(1000 * loadTime)
+    for module, values in loads.items():
+        print(f'  lazy load {module}: median {statistics.median(values):.1f} [ms]')
@@ -0,0 +1,136 @@
+###############################################################################
+# File name:      CPSC1_Stop-Latency-Test_vX.y.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+# Description:    Measure how long an STP command takes while poll threads
+#                 keep the link busy, with and without the priority lane of
+#                 CpscSession, and through CpscScheduler (as in the GUIs)
+#                 while it runs poll jobs and WriteReadMany() batches. Both
+#                 the priority lane and the scheduler are checked against
+#                 the stop-latency bound:
+#                 one command in flight + the STP itself = 2 round trips
+#                 (+ tolerance for thread scheduling).
+#                 Exits with code 1 if the bound is exceeded, so it can be
+#                 used as a regression test (e.g. against the simulator).
+#                 Usage: python CPSC1_Stop-Latency-Test-v0.1.py COM7 115200 100 3
+#                        (port, baudrate, number of stops, poll threads)
+# Disclaimer:     This program is provided 'As Is' without any express or
+#                 implied warranty of any kind.
+###############################################################################
+
+verNumber = 'v0.1'
+
+# 3rd party imports
+import sys
+import time
+import random
+import statistics
+import threading as thrd
+
+# JPE imports
+from CpscInterfaces import CpscSession
+from CpscInterfaces import CpscScheduler
+
+comPort = sys.argv[1] if len(sys.argv) > 1 else 'COM1'
+baudrate = sys.argv[2] if len(sys.argv) > 2 else '115200'
+stopCount = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+pollThreads = int(sys.argv[4]) if len(sys.argv) > 4 else 3
+cmdPoll = '/VER'
+cmdBatch = ['FIV ' + str(module) for module in range(1, 7)] # Module sweep as in the GUIs
+pollInterval = 0.005 # [s] poll jobs of the scheduler
+pollDelay = 0.001 # [s] pause between polls of one thread (the GUIs also sleep between polls)
+cmdStp = 'STP 1'
+tolerance = 0.005 # [s] thread wake-up and scheduling jitter
+
+session = CpscSession.GetSession(comPort, baudrate)
+
+def measureRoundTrip(count=50):
+    roundTrips = []
+    for x in range(count):
+        startTime = time.perf_counter()
+        session.WriteRead(cmdPoll, 1)
+        roundTrips.append(time.perf_counter() - startTime)
+    return roundTrips
+
+def poll_thread(running):
+    while running.is_set():
+        try:
+            session.WriteRead(cmdPoll, 1)
+        except IOError:
+            pass
+        time.sleep(pollDelay)
+
+def measureStops(priority):
+    running = thrd.Event()
+    running.set()
+    pollers = [thrd.Thread(target=poll_thread, args=(running,), daemon=True) for x in range(pollThreads)]
+    for poller in pollers:
+        poller.start()
+    latencies = []
+    for x in range(stopCount):
+        time.sleep(random.uniform(0.001, 0.01)) # Stop at a random moment of the poll traffic
+        startTime = time.perf_counter()
+        session.WriteRead(cmdStp, 1, priority=priority)
+        latencies.append(time.perf_counter() - startTime)
+    running.clear()
+    for poller in pollers:
+        poller.join()
+    return latencies
+
+def batch_thread(scheduler, running):
+    while running.is_set():
+        try:
+            scheduler.WriteReadMany(cmdBatch, 1)
+        except IOError:
+            pass
+        time.sleep(pollDelay)
+
+def measureSchedulerStops():
+    # STP through the scheduler while it runs poll jobs and WriteReadMany() batches
+    scheduler = CpscScheduler.CpscScheduler(session)
+    polls = [scheduler.AddPoll(cmdPoll, pollInterval, lambda response: None) for x in range(pollThreads)]
+    running = thrd.Event()
+    running.set()
+    batcher = thrd.Thread(target=batch_thread, args=(scheduler, running), daemon=True)
+    batcher.start()
+    latencies = []
+    try:
+        for x in range(stopCount):
+            time.sleep(random.uniform(0.001, 0.01))
+            startTime = time.perf_counter()
+            scheduler.WriteRead(cmdStp, 1)
+            latencies.append(time.perf_counter() - startTime)
+    finally:
+        running.clear()
+        batcher.join()
+        for poll in polls:
+            poll.Cancel()
+        scheduler.Close()
+    return latencies
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+    print(f'{name:22} median {1000 * statistics.median(latencies):7.2f}  p99 {1000 * p99:7.2f}  max {1000 * latencies[-1]:7.2f} [ms]')
+    return latencies[-1]
+
+print(f'CPSC1 stop latency test ({verNumber}): {stopCount}x {cmdStp} with {pollThreads} poll threads ({cmdPoll}) on {comPort} @ {baudrate}')
+try:
+    roundTrips = measureRoundTrip()
+    report('Round trip (idle):', roundTrips)
+    stopBound = 2 * max(roundTrips) + tolerance
+    report('STP, no priority:', measureStops(False))
+    stopMax = report('STP, priority lane:', measureStops(True))
+    stopMax = max(stopMax, report('STP, scheduler:', measureSchedulerStops()))
+except IOError as ex:
+    print(f'Communication error: {ex}')
+    sys.exit(2)
+finally:
+    CpscSession.CloseAll()
+
+print(f'Stop-latency bound:    {1000 * stopBound:7.2f} [ms] (2 round trips + {1000 * tolerance:.0f} ms)')
+if stopMax > stopBound:
+    print('FAIL: STP latency exceeds the bound')
+    sys.exit(1)
+print('PASS')
@@ -0,0 +1,75 @@
+###############################################################################
+# File name:      CpscAdaptiveRate.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Motion-aware poll interval for position read outs (PGVA, CGVA, ...).
+# Positions are polled at fastInterval after a motion command (MOV, FBCS,
+# FBEN) and as long as a polled value changes by more than 'tolerance'.
+# Once all values are settled for 'settleTime' the interval grows by a
+# factor 'decay' per poll up to idleInterval, so idle channels cause little
+# bus traffic and controller load.
+#
+# Pass an instance to CpscScheduler.AddPoll(..., adaptive=...): the
+# scheduler boosts the poll when it sends a motion command and updates the
+# interval with every response. Responses that are not a list of numbers
+# (e.g. an error message) do not change the interval.
+###############################################################################
+
+# 3rd party imports
+import time
+import threading
+
+# JPE imports
+from CpscInterfaces.CpscMetrics import Mnemonic
+
+motionCommands = ('MOV', 'FBCS', 'FBEN')
+
+def IsMotion(txMessage):
+    return Mnemonic(txMessage) in motionCommands
+
+def ParseValues(response):
+    try:
+        return [float(value) for value in response.split(',')]
+    except ValueError:
+        return None
+
+class CpscAdaptiveRate:
+
+    def __init__(self, fastInterval, idleInterval, tolerance=0.0, settleTime=1.0, decay=2.0):
+        self.fastInterval = fastInterval # [s] poll interval while moving
+        self.idleInterval = idleInterval # [s] poll interval when settled
+        self.tolerance = tolerance       # Largest change of a value that counts as settled (unit of the response)
+        self.settleTime = settleTime     # [s] time without motion before the interval grows
+        self.decay = decay
+        self.lock = threading.Lock()
+        self.interval = fastInterval
+        self.values = None
+        self.motionTime = time.monotonic()
+
+    def Boost(self, now=None):
+        # Motion expected (e.g. MOV sent): poll fast from now on
+        with self.lock:
+            self.motionTime = time.monotonic() if now is None else now
+            self.interval = self.fastInterval
+            return self.interval
+
+    def IsMoving(self, values):
+        if self.values is None or len(values) != len(self.values):
+            return False
+        return any(abs(value - previous) > self.tolerance for value, previous in zip(values, self.values))
+
+    def Update(self, response, now=None):
+        # Return the interval to use after this response
+        now = time.monotonic() if now is None else now
+        values = ParseValues(response)
+        with self.lock:
+            if values is not None:
+                if self.IsMoving(values):
+                    self.motionTime = now
+                    self.interval = self.fastInterval
+                elif now - self.motionTime >= self.settleTime:
+                    self.interval = min(self.interval * self.decay, self.idleInterval)
+                self.values = values
+            return self.interval
@@ -0,0 +1,134 @@
+###############################################################################
+# File name:      CpscAnalysis.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Speed analysis of sampled trajectories, e.g. the RLS positions logged
+# during a sequence run (columns run, dir, time, position of a run log).
+# All functions work on numpy arrays without Python loops over samples, so
+# 10^6 samples are analysed in a fraction of a second.
+#
+# A leg is a continuous range of samples with the same run number and
+# direction (DIR=1 towards Pos B, DIR=0 towards Pos A). Per leg:
+# - duration, distance and mean speed: from the first to the last sample
+# - steady speed: displacement / time of the samples in the middle of the leg
+#   (without the first and last 'margin' part of the leg time), so the
+#   start and the stop at the target do not count
+# - max speed and max acceleration (absolute) of the sampled trajectory
+# - overshoot: how far the stage moved past the target (positive) or
+#   stopped before it (negative), when posA/posB are given
+#
+# Velocity() and Acceleration() return the instantaneous values between
+# samples (NaN across leg boundaries). Speeds are in position units per
+# second (m/s for RLS positions in m).
+###############################################################################
+
+# 3rd party imports
+import numpy as np
+
+legQuantities = ('duration', 'distance', 'meanSpeed', 'steadySpeed', 'maxSpeed', 'maxAcceleration', 'overshoot')
+
+def LegStarts(*keys):
+    # Index of the first sample of every leg: where one of the keys changes
+    count = len(keys[0])
+    if count == 0:
+        return np.zeros(0, dtype=np.int64)
+    changed = np.zeros(count - 1, dtype=bool)
+    for key in keys:
+        key = np.asarray(key)
+        changed |= key[1:] != key[:-1]
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+def LegIndex(starts, count):
+    # Leg number of every sample
+    index = np.zeros(count, dtype=np.int64)
+    index[starts[1:]] = 1
+    return np.cumsum(index)
+
+def Velocity(time, position, starts):
+    # Times (midpoints) and velocities between samples, NaN between legs
+    time = np.asarray(time, dtype=np.float64)
+    position = np.asarray(position, dtype=np.float64)
+    deltaTime = np.diff(time)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        velocity = np.diff(position) / deltaTime
+    velocity[starts[1:] - 1] = np.nan  # Interval from the last sample of a leg to the first of the next
+    velocity[deltaTime <= 0] = np.nan
+    return (time[1:] + time[:-1]) / 2, velocity
+
+def Acceleration(midTime, velocity):
+    # Times and accelerations between velocity values (NaN where a velocity is NaN)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        acceleration = np.diff(velocity) / np.diff(midTime)
+    return (midTime[1:] + midTime[:-1]) / 2, acceleration
+
+def GroupMax(values, groups, groupCount):
+    # Maximum of the values per group, ignoring NaN (NaN for groups without values)
+    valid = ~np.isnan(values)
+    result = np.full(groupCount, -np.inf)
+    np.maximum.at(result, groups[valid], values[valid])
+    result[np.isinf(result)] = np.nan
+    return result
+
+def AnalyseLegs(time, position, run, direction, posA=None, posB=None, margin=0.2):
+    time = np.asarray(time, dtype=np.float64)
+    position = np.asarray(position, dtype=np.float64)
+    run = np.asarray(run)
+    direction = np.asarray(direction)
+    starts = LegStarts(run, direction)
+    legCount = len(starts)
+    legs = {'run': run[starts], 'dir': direction[starts], 'samples': np.diff(np.append(starts, len(time)))}
+    if legCount == 0:
+        legs.update({name: np.zeros(0) for name in legQuantities})
+        return legs
+    ends = np.append(starts[1:], len(time)) - 1 # Last sample of every leg
+    legs['duration'] = time[ends] - time[starts]
+    legs['distance'] = position[ends] - position[starts]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        legs['meanSpeed'] = np.abs(legs['distance']) / legs['duration']
+
+    # Steady speed: displacement / time of the intervals in the middle of the leg
+    midTime, velocity = Velocity(time, position, starts)
+    intervalLeg = LegIndex(starts, len(time))[:-1]
+    legStart = time[starts][intervalLeg]
+    legDuration = legs['duration'][intervalLeg]
+    steady = ~np.isnan(velocity) & (midTime >= legStart + margin * legDuration) & (midTime <= legStart + (1 - margin) * legDuration)
+    steadyDisplacement = np.bincount(intervalLeg[steady], weights=np.diff(position)[steady], minlength=legCount) # Signed: jitter cancels out
+    steadyTime = np.bincount(intervalLeg[steady], weights=np.diff(time)[steady], minlength=legCount)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        legs['steadySpeed'] = np.where(steadyTime > 0, np.abs(steadyDisplacement) / steadyTime, np.nan)
+
+    legs['maxSpeed'] = GroupMax(np.abs(velocity), intervalLeg, legCount)
+    accelerationTime, acceleration = Acceleration(midTime, velocity)
+    legs['maxAcceleration'] = GroupMax(np.abs(acceleration), intervalLeg[1:], legCount)
+
+    # Overshoot past the target of the leg: Pos B when moving in DIR=1, Pos A in DIR=0
+    legs['overshoot'] = np.full(legCount, np.nan)
+    if posB is not None:
+        toB = legs['dir'] == 1
+        legs['overshoot'][toB] = np.maximum.reduceat(position, starts)[toB] - posB
+    if posA is not None:
+        toA = legs['dir'] == 0
+        legs['overshoot'][toA] = posA - np.minimum.reduceat(position, starts)[toA]
+    return legs
+
+def RunStatistics(legs):
+    # {direction: {quantity: {'count', 'mean', 'std', 'min', 'max'}}} over the legs (runs) of each direction
+    statistics = {}
+    for direction in np.unique(legs['dir']):
+        selected = legs['dir'] == direction
+        statistics[int(direction)] = {}
+        for name in legQuantities:
+            values = legs[name][selected]
+            values = values[~np.isnan(values)]
+            if len(values):
+                statistics[int(direction)][name] = {'count': len(values), 'mean': float(values.mean()), 'std': float(values.std()),
+                                                    'min': float(values.min()), 'max': float(values.max())}
+            else:
+                statistics[int(direction)][name] = {'count': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+    return statistics
+
+def Mean(statistics, direction, name):
+    # Mean of a quantity over the runs, NaN if there are none
+    return statistics.get(direction, {}).get(name, {}).get('mean', np.nan)
@@ -0,0 +1,105 @@
+###############################################################################
+# File name:      CpscAsyncInterface.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscAsyncInterface handles asyncio communication with a CPSC over Ethernet
+# (TCP port 2000) or a serial port. One event loop can drive many
+# controllers and poll loops without a thread per command.
+#
+# Open a connection with one of:
+# - client = await OpenTcp('10.0.0.5')
+# - client = await OpenSerial('COM7', 115200)   (requires pyserial-asyncio)
+# - client = await OpenUrl('tcp://10.0.0.5')    (see CpscFactory for URLs)
+#
+# Then send commands with 'response = await client.Query("PGVA 2 ...")'.
+# \r\n is added to the command and removed from the response.
+#
+# Query() raises CpscTimeoutError if no response arrived within the timeout
+# (default 10 seconds) and CpscConnectionLostError if the connection is
+# closed. A timed out or cancelled Query() leaves the link usable: the late
+# response is read and dropped before the next response is returned.
+#
+# Use the client in an 'async with' 'as' construction to ensure the
+# connection is always closed.
+###############################################################################
+
+# 3rd party imports
+import asyncio
+
+# JPE imports
+from CpscInterfaces.CpscErrors import CpscTimeoutError, CpscConnectionLostError
+from CpscInterfaces.CpscFactory import ParseUrl
+
+class CpscAsyncInterface:
+
+    def __init__(self,reader,writer):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = 10
+        self.discard = 0 # Number of late responses to drop (timed out or cancelled queries)
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self,exType,exValue,trcbck):
+        await self.Close()
+
+    async def Close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+
+    async def ReadFrame(self):
+        try:
+            return await self.reader.readuntil(b'\r\n')
+        except asyncio.IncompleteReadError as ex:
+            raise CpscConnectionLostError('Connection closed by CPSC') from ex
+        except OSError as ex:
+            raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+
+    async def Query(self, txMessage, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        async with self.lock:
+            self.discard += 1 # Until our own response has been read
+            try:
+                self.writer.write((txMessage + '\r\n').encode('ascii'))
+                await self.writer.drain()
+            except OSError as ex:
+                raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+            try:
+                rxMessage = await asyncio.wait_for(self.ReadResponse(), timeout)
+            except asyncio.TimeoutError:
+                raise CpscTimeoutError(f'No response from CPSC within {timeout} seconds to: {txMessage}') from None
+            return rxMessage.decode().replace('\r\n', '')
+
+    async def ReadResponse(self):
+        # Drop responses of earlier timed out or cancelled queries first
+        while self.discard > 1:
+            await self.ReadFrame()
+            self.discard -= 1
+        rxMessage = await self.ReadFrame()
+        self.discard -= 1
+        return rxMessage
+
+async def OpenTcp(ipAddress, tcpPort=2000):
+    reader, writer = await asyncio.open_connection(ipAddress, tcpPort, limit=2**20)
+    return CpscAsyncInterface(reader, writer)
+
+async def OpenSerial(comPort, baudrate):
+    try:
+        import serial_asyncio
+    except ImportError as ex:
+        raise ImportError('OpenSerial() requires pyserial-asyncio (pip install pyserial-asyncio)') from ex
+    reader, writer = await serial_asyncio.open_serial_connection(url=comPort, baudrate=int(baudrate), limit=2**20)
+    return CpscAsyncInterface(reader, writer)
+
+async def OpenUrl(url):
+    scheme, target, options = ParseUrl(url)
+    if scheme == 'serial':
+        return await OpenSerial(target, options['baud'])
+    return await OpenTcp(*target)
@@ -0,0 +1,148 @@
+###############################################################################
+# File name:      CpscCatalog.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Local SQLite catalog of measurement runs (sequence runs of the RLS GUI,
+# COE checks of the OEM calibration GUI, ...), so runs can be found by
+# stage type, positioner ID, temperature, frequency, date, ... without
+# listing directories of <Stage>_<PosId>-<Seq#>.csv files.
+#
+# - AddRun(kind, stage=..., freq=..., ...) registers a run. Numeric settings
+#   given as strings (Tk variables) are stored as numbers; keyword
+#   arguments that are not a column are stored in the JSON 'metadata'.
+# - Find(stage='CLA2601', temp=(0, 10), since='2026-10-01') returns the
+#   matching runs as dicts, newest first: a value selects equal values,
+#   a (low, high) tuple a range; since/until compare the start time.
+#
+# The columns used in queries are indexed, so queries over thousands of
+# runs take milliseconds. The database uses write-ahead logging, so the
+# GUIs can register runs while other tools query the catalog.
+###############################################################################
+
+# 3rd party imports
+import json
+import time
+import sqlite3
+import threading
+
+defaultPath = 'CPSC1_Runs.sqlite'
+Error = sqlite3.Error # Database errors (e.g. database locked); the GUIs catch CpscCatalog.Error without importing sqlite3
+
+# Column: SQL type
+columns = {'kind': 'TEXT',           # 'sequence', 'coe', ...
+           'started': 'TEXT',        # Local time 'YYYY-MM-DD HH:MM:SS'
+           'duration': 'REAL',       # [s]
+           'stage': 'TEXT',
+           'positionerId': 'TEXT',
+           'coeId': 'TEXT',
+           'channel': 'INTEGER',
+           'sequence': 'TEXT',       # Sequence / run number entered in the GUI
+           'freq': 'REAL',           # [Hz]
+           'rss': 'REAL',            # [%]
+           'temp': 'REAL',           # [K]
+           'df': 'REAL',
+           'mir': 'REAL',            # [m]
+           'mar': 'REAL',            # [m]
+           'posA': 'REAL',           # [m]
+           'posB': 'REAL',           # [m]
+           'runs': 'INTEGER',
+           'speedToA': 'REAL',       # [mm/s]
+           'speedToB': 'REAL',       # [mm/s]
+           'dataPath': 'TEXT',
+           'csvPath': 'TEXT',
+           'plotPath': 'TEXT',
+           'script': 'TEXT'}
+indexedColumns = ('kind', 'started', 'stage', 'positionerId', 'freq', 'temp')
+
+def ToColumn(name, value):
+    # Convert a GUI value to the column type, None if not a number
+    if value is None or columns[name] == 'TEXT':
+        return None if value is None else str(value)
+    try:
+        return int(value) if columns[name] == 'INTEGER' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+def RowToRun(row):
+    run = dict(row)
+    run['metadata'] = json.loads(run['metadata'] or '{}')
+    return run
+
+def StartTime(startTime=None):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(startTime))
+
+class CpscCatalog:
+
+    def __init__(self, path=defaultPath):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False) # Shared by GUI threads, see lock
+        self.connection.row_factory = sqlite3.Row
+        with self.lock, self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            definitions = ', '.join(f'{name} {sqlType}' for name, sqlType in columns.items())
+            self.connection.execute(f'CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, {definitions}, metadata TEXT)')
+            for name in indexedColumns:
+                self.connection.execute(f'CREATE INDEX IF NOT EXISTS runs_{name} ON runs ({name})')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def Close(self):
+        with self.lock:
+            self.connection.close()
+
+    def AddRun(self, kind, startTime=None, **fields):
+        # Register a run (startTime: time.time() at the start, default now); returns the run id
+        values = {'kind': kind, 'started': StartTime(startTime)}
+        metadata = {}
+        for name, value in fields.items():
+            if name in columns:
+                values[name] = ToColumn(name, value)
+            else:
+                metadata[name] = value
+        names = list(values) + ['metadata']
+        with self.lock, self.connection:
+            cursor = self.connection.execute(f'INSERT INTO runs ({", ".join(names)}) VALUES ({", ".join("?" * len(names))})',
+                                             list(values.values()) + [json.dumps(metadata, default=str)])
+            return cursor.lastrowid
+
+    def Find(self, since=None, until=None, limit=None, **conditions):
+        where = []
+        parameters = []
+        for name, value in conditions.items():
+            if name not in columns:
+                raise ValueError(f'Unknown column {name}')
+            if isinstance(value, tuple):
+                where.append(f'{name} BETWEEN ? AND ?')
+                parameters += [ToColumn(name, value[0]), ToColumn(name, value[1])]
+            else:
+                where.append(f'{name} = ?')
+                parameters.append(ToColumn(name, value))
+        if since is not None:
+            where.append('started >= ?')
+            parameters.append(since)
+        if until is not None:
+            where.append('started < ?')
+            parameters.append(until)
+        query = 'SELECT * FROM runs' + (' WHERE ' + ' AND '.join(where) if where else '') + ' ORDER BY started DESC, id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            parameters.append(int(limit))
+        with self.lock:
+            rows = self.connection.execute(query, parameters).fetchall()
+        return [RowToRun(row) for row in rows]
+
+    def Get(self, runId):
+        with self.lock:
+            row = self.connection.execute('SELECT * FROM runs WHERE id = ?', (runId,)).fetchone()
+        return None if row is None else RowToRun(row)
+
+    def Count(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
@@ -0,0 +1,23 @@
+###############################################################################
+# File name:      CpscErrors.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Exceptions raised by the CPSC interfaces.
+#
+# All exceptions derive from IOError, so existing 'except IOError' handlers
+# in the GUIs keep catching them.
+###############################################################################
+
+class CpscTimeoutError(IOError):
+    # No complete response received from the CPSC before the deadline
+    pass
+
+class CpscConnectionLostError(IOError):
+    # Connection closed or reset by the CPSC (or the network)
+    pass
+
+class CpscReportError(IOError):
+    # Rendering a report (plot) in a worker process failed
+    pass
@@ -1,6 +1,7 @@
 ###############################################################################
 # File name:      CpscEthernetInterface.py
 # Creation:       2021-12-13 12:47:32
+# Updated:        2026-10-18
 # Author:         JPE, Robin Drossaert
 # Python version: 3.9.7
 #
@@ -13,6 +14,15 @@
 #
 # Since the CPSC always send a response following a command, only the
 # WriteRead() function should be used for normal communication.
+# WriteRead(txMessage, txTermination) is shared with CpscSerialInterface,
+# see CpscInterface. txTermination defaults to 0 (message sent as is).
+#
+# Read() waits in a selector until data arrives, so no CPU is used while
+# waiting on the CPSC. Data is received into a CpscFrameBuffer, which also
+# keeps any further responses received in the same read. If no
+# complete response has been received within the timeout a
+# CpscTimeoutError is raised, if the connection is closed or reset a
+# CpscConnectionLostError is raised (both are IOErrors).
 #
 # Use the CpscEthernetInterface in a 'with' 'as' construction to ensure
 # the socket is always closed after running the program.
@@ -20,43 +30,83 @@
 
 # 3rd party imports
 import socket
+import selectors
 import time
 
-class CpscEthernetInterface:
+# JPE imports
+from CpscInterfaces.CpscErrors import CpscTimeoutError, CpscConnectionLostError
+from CpscInterfaces.CpscFraming import CpscFrameBuffer
+from CpscInterfaces.CpscInterface import CpscInterface
+
+class CpscEthernetInterface(CpscInterface):
 
     def __init__(self,ipAddress,tcpPort):
+        super().__init__()
         self.port = tcpPort
         self.timeout = 10
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.sock.connect((ipAddress,self.port))
+        self.rxFrames = CpscFrameBuffer() # Reused for every response
+        self.sock = socket.create_connection((ipAddress,self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         self.sock.setblocking(False)
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self,exType,exValue,trcbck):
-        self.Close()
+        # Separate selectors so a reader and a writer thread can wait at the same time
+        self.rxSelector = selectors.DefaultSelector()
+        self.rxSelector.register(self.sock, selectors.EVENT_READ)
+        self.txSelector = selectors.DefaultSelector()
+        self.txSelector.register(self.sock, selectors.EVENT_WRITE)
+        self.Opened()
 
     def Close(self):
+        self.rxSelector.close()
+        self.txSelector.close()
         self.sock.close()
 
-    def Write(self,txMessage):
-        self.sock.send(txMessage.encode('ascii')) # Sent message as ASCII string
+    def Wait(self, selector, deadline):
+        # Block until the socket is ready for selector or the deadline has passed
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CpscTimeoutError(f'No response from CPSC within {self.timeout} seconds')
+            if selector.select(remaining):
+                return
+
+    def WriteMessage(self,txMessage):
+        txView = memoryview(txMessage.encode('ascii')) # Sent message as ASCII string
+        deadline = time.monotonic() + self.timeout
+        while txView:
+            try:
+                txView = txView[self.sock.send(txView):]
+            except BlockingIOError:
+                self.Wait(self.txSelector, deadline)
+            except OSError as ex:
+                raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+
+    def FlushInput(self):
+        # Drop responses that have been received but not read
+        self.rxFrames.Clear()
+        while True:
+            try:
+                if self.sock.recv_into(self.rxFrames.WriteView()) == 0:
+                    raise CpscConnectionLostError('Connection closed by CPSC')
+            except BlockingIOError:
+                break
+            except OSError as ex:
+                raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+        self.rxFrames.Clear()
 
-    def Read(self):
-        rxMessage = ''.encode()
-        startTime = time.time()
-        passedTime = 0
-        # Repeat read until termination characters or nothing has been received for 10 seconds
-        while rxMessage.find('\r\n'.encode()) == -1 and passedTime < self.timeout:
+    def ReadMessage(self):
+        deadline = time.monotonic() + self.timeout
+        # Repeat read until termination characters or the deadline has passed
+        while True:
+            rxMessage = self.rxFrames.NextFrame()
+            if rxMessage is not None:
+                return rxMessage
+            self.Wait(self.rxSelector, deadline)
             try:
-                rxMessage += self.sock.recv(100)
-                startTime = time.time() # Byte received so reset timer
-            except:
-                passedTime = time.time() - startTime
-        return rxMessage.decode() # Convert message to Python3 string
-
-    def WriteRead(self, txMessage):
-        self.Write(txMessage)
-        rxMessage = self.Read()
-        return rxMessage
+                received = self.sock.recv_into(self.rxFrames.WriteView())
+            except BlockingIOError:
+                continue
+            except OSError as ex:
+                raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+            if received == 0:
+                raise CpscConnectionLostError('Connection closed by CPSC')
+            self.rxFrames.Commit(received)
@@ -0,0 +1,56 @@
+###############################################################################
+# File name:      CpscFactory.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# OpenCpsc() opens a CPSC link from a URL and returns a CpscInterface, so
+# scripts can switch between USB/RS422 and Ethernet without code changes:
+# - serial://COM7?baud=115200
+# - serial:///dev/ttyUSB0?baud=921600
+# - serial:///dev/serial/by-id/usb-JPE_CPSC1-if00?baud=115200
+# - tcp://10.0.0.5:2000              (port defaults to 2000)
+#
+# PortUrl() turns the port field of the GUIs into a URL: a number N becomes
+# COMN (as before), a device name like /dev/ttyUSB0 is used as is and a
+# complete URL (e.g. tcp://10.0.0.5) is returned unchanged.
+###############################################################################
+
+# 3rd party imports
+from urllib.parse import urlsplit, parse_qs
+
+defaultBaudrate = 115200
+defaultTcpPort = 2000
+
+def ParseUrl(url):
+    # Return (scheme, target, options); target is a serial device or (ipAddress, tcpPort)
+    parts = urlsplit(url)
+    options = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    if parts.scheme == 'serial':
+        device = parts.netloc + parts.path # serial://COM7 or serial:///dev/ttyUSB0
+        if not device:
+            raise ValueError(f'No serial device in CPSC URL: {url}')
+        options['baud'] = int(options.get('baud', defaultBaudrate))
+        return parts.scheme, device, options
+    if parts.scheme == 'tcp':
+        if not parts.hostname:
+            raise ValueError(f'No IP address in CPSC URL: {url}')
+        return parts.scheme, (parts.hostname, parts.port or defaultTcpPort), options
+    raise ValueError(f'Unknown CPSC URL scheme (use serial:// or tcp://): {url}')
+
+def OpenCpsc(url):
+    scheme, target, options = ParseUrl(url)
+    # Interfaces are imported here, so pyserial is only needed for serial links
+    if scheme == 'serial':
+        from CpscInterfaces.CpscSerialInterface import CpscSerialInterface
+        return CpscSerialInterface(target, options['baud'])
+    from CpscInterfaces.CpscEthernetInterface import CpscEthernetInterface
+    return CpscEthernetInterface(*target)
+
+def PortUrl(port, baudrate=defaultBaudrate):
+    port = str(port).strip()
+    if '://' in port:
+        return port
+    if port.isdigit():
+        port = 'COM' + port
+    return f'serial://{port}?baud={baudrate}'
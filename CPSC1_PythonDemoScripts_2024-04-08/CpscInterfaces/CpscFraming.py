@@ -0,0 +1,83 @@
+###############################################################################
+# File name:      CpscFraming.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscFrameBuffer splits the byte stream received from a CPSC into
+# responses terminated by \r\n. It is shared by the serial and the Ethernet
+# interface.
+#
+# Received bytes are written directly into one reusable bytearray through
+# a memoryview (WriteView() + Commit()), without intermediate bytes objects.
+# The search for \r\n continues where the previous search stopped, so every
+# received byte is scanned once, no matter how long the response is. A
+# single read may contain several complete responses; NextFrame() returns
+# them one by one.
+###############################################################################
+
+class CpscFrameBuffer:
+
+    def __init__(self,size=65536,terminator=b'\r\n'):
+        self.terminator = terminator
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.start = 0 # First byte of the next response
+        self.end = 0   # End of the received bytes
+        self.scan = 0  # Position to continue the terminator search
+
+    def __len__(self):
+        return self.end - self.start
+
+    def WriteView(self, size=None):
+        # Return a writable view of 'size' free bytes (default: all free bytes, at least 4096)
+        needed = size if size is not None else 4096
+        if len(self.buffer) - self.end < needed:
+            self.Compact()
+        if len(self.buffer) - self.end < needed:
+            self.view.release() # Grow buffer, only for responses larger than the buffer
+            self.buffer.extend(bytes(max(len(self.buffer), needed)))
+            self.view = memoryview(self.buffer)
+        if size is None:
+            return self.view[self.end:]
+        return self.view[self.end:self.end + size]
+
+    def Commit(self, count):
+        # Mark 'count' bytes written into the last WriteView() as received
+        self.end += count
+
+    def Feed(self, data):
+        # Copy received data into the buffer (for transports without readinto/recv_into)
+        self.WriteView(len(data))[:] = data
+        self.Commit(len(data))
+
+    def NextFrame(self):
+        # Return the next complete response including \r\n, or None
+        index = self.buffer.find(self.terminator, self.scan, self.end)
+        if index == -1:
+            self.scan = max(self.end - len(self.terminator) + 1, self.start)
+            return None
+        frameEnd = index + len(self.terminator)
+        frame = str(self.view[self.start:frameEnd], 'ascii', 'replace')
+        self.start = self.scan = frameEnd
+        if self.start == self.end:
+            self.start = self.end = self.scan = 0 # Buffer empty, restart at the front
+        return frame
+
+    def Flush(self):
+        # Return and remove an incomplete response (e.g. after a timeout)
+        frame = str(self.view[self.start:self.end], 'ascii', 'replace')
+        self.Clear()
+        return frame
+
+    def Clear(self):
+        self.start = self.end = self.scan = 0
+
+    def Compact(self):
+        # Move unread bytes to the front of the buffer
+        if self.start > 0:
+            length = self.end - self.start
+            self.view[:length] = self.view[self.start:self.end]
+            self.scan -= self.start
+            self.start = 0
+            self.end = length
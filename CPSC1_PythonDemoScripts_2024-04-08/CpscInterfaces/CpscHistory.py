@@ -0,0 +1,221 @@
+###############################################################################
+# File name:      CpscHistory.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Command history of the GUIs (txtResp) with fixed memory, also for runs
+# that log hundreds of thousands of lines (sequence runs, COE checks):
+# - CpscHistory keeps the last 'capacity' lines (time, text, tag) in a
+#   ring; older lines are dropped or, with a spillPath, written to a ';'
+#   separated log file (time;tag;text). Thread safe. Per filter (tags) an
+#   index of the matching lines is kept up to date from its first use, so
+#   Window() returns the visible lines without going through the history.
+# - CpscHistoryView shows a CpscHistory in a tk.Text (default wrap='none', so
+#   every line takes one row) that only holds the visible lines, so
+#   inserting stays fast however long the history is. It
+#   has the insert/see/delete methods used with the tk.Text, and scrolls with
+#   its own scrollbar and the mouse wheel. SetFilter(('e',)) shows only the
+#   lines with the given tags ('s' sent, 'r' received, 'e' errors, None
+#   without tag); FilterMenu() creates an option menu for this.
+#
+# Rendering is done once per idle loop of Tk after changes, so the view
+# must be used from the Tk main loop (see CpscUiDispatcher).
+###############################################################################
+
+# 3rd party imports
+import time
+import threading
+import collections
+import tkinter as tk
+
+# JPE imports
+from CpscInterfaces import CpscStartup
+
+CpscLogWriter = CpscStartup.LazyImport('CpscInterfaces.CpscLogWriter') # Only with a spill file
+
+class CpscHistory:
+
+    def __init__(self, capacity=10000, spillPath=None):
+        self.lines = collections.deque(maxlen=capacity) # (time, text, tag)
+        self.partial = None          # Line without newline yet, continued by the next Insert()
+        self.lock = threading.Lock()
+        self.spill = CpscLogWriter.CpscLogWriter(spillPath, ['time', 'tag', 'text']) if spillPath else None
+        self.dropped = 0             # Lines removed from the ring without spill file
+        self.spilled = 0
+        self.first = 0               # Number of the oldest line in the ring (lines are numbered from the start)
+        self.indexes = {}            # Filter tags: numbers of the lines in the ring with one of the tags
+
+    def __len__(self):
+        return len(self.lines)
+
+    def Insert(self, text, tag=None):
+        # Add text, like tk.Text.insert('end', text, tag); a line keeps the tag (and time) of its first part
+        with self.lock:
+            now = time.time()
+            pieces = text.split('\n')
+            last = pieces.pop()
+            if self.partial is not None:
+                partialTime, partialText, partialTag = self.partial
+                if pieces:
+                    self.Append((partialTime, partialText + pieces.pop(0), partialTag)) # Completes the pending line
+                else:
+                    last, now, tag = partialText + last, partialTime, partialTag # Still no newline
+            for piece in pieces:
+                self.Append((now, piece, tag))
+            self.partial = (now, last, tag) if last else None
+
+    def Append(self, line):
+        if len(self.lines) == self.lines.maxlen:
+            oldest = self.lines[0]
+            if self.spill is not None:
+                self.spill.WriteRow([time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(oldest[0])), oldest[2] or '', oldest[1]])
+                self.spilled += 1
+            else:
+                self.dropped += 1
+            self.first += 1
+            for index in self.indexes.values():
+                if index and index[0] < self.first:
+                    index.popleft()
+        self.lines.append(line)
+        number = self.first + len(self.lines) - 1
+        for tags, index in self.indexes.items():
+            if line[2] in tags:
+                index.append(number)
+
+    def Index(self, tags):
+        # Numbers of the lines with one of the tags; built once, then updated by Append()
+        index = self.indexes.get(tags)
+        if index is None:
+            index = self.indexes[tags] = collections.deque(self.first + position for position, line in enumerate(self.lines) if line[2] in tags)
+        return index
+
+    def Window(self, tags, top, count):
+        # (number of lines, index of the first line returned, up to 'count' lines from 'top') of the lines
+        # with the given tags (tuple, None: all); top None: the last lines
+        with self.lock:
+            index = None if tags is None else self.Index(tags)
+            lineCount = len(self.lines) if index is None else len(index)
+            partial = self.partial is not None and (tags is None or self.partial[2] in tags)
+            total = lineCount + partial
+            start = max(total - count, 0)
+            if top is not None:
+                start = min(top, start)
+            lines = [self.lines[position] if index is None else self.lines[index[position] - self.first]
+                     for position in range(start, min(start + count, lineCount))]
+            if partial and start + count > lineCount:
+                lines.append(self.partial)
+            return total, start, lines
+
+    def Lines(self, tags=None):
+        # Copy of the lines (time, text, tag), only the given tags if not None
+        with self.lock:
+            lines = list(self.lines)
+            if self.partial is not None:
+                lines.append(self.partial)
+        if tags is not None:
+            lines = [line for line in lines if line[2] in tags]
+        return lines
+
+    def Clear(self):
+        with self.lock:
+            self.first += len(self.lines)
+            self.lines.clear()
+            self.partial = None
+            for index in self.indexes.values():
+                index.clear()
+
+    def Close(self):
+        if self.spill is not None:
+            self.spill.Close()
+
+# Filter menu entry: tags shown
+filters = {'All': None, 'Sent (s)': ('s',), 'Received (r)': ('r',), 'Errors (e)': ('e',), 'Sent + received': ('s', 'r')}
+
+class CpscHistoryView:
+
+    def __init__(self, master=None, history=None, scrollbar=None, height=24, wheelLines=3, **options):
+        self.history = history if history is not None else CpscHistory()
+        options.setdefault('wrap', 'none') # One row per line, so the last lines are visible
+        self.text = tk.Text(master=master, height=height, **options)
+        self.height = height
+        self.wheelLines = wheelLines
+        self.tags = None             # Tags shown, None: all lines
+        self.top = None              # Index of the first visible line, None: follow the end
+        self.lineCount = 0           # Lines (after filtering) at the last rendering
+        self.scheduled = False
+        self.scrollbar = scrollbar
+        if scrollbar is not None:
+            scrollbar.config(command=self.yview)
+        self.text.bind('<MouseWheel>', lambda event: self.Scroll(-event.delta // 120 * self.wheelLines))
+        self.text.bind('<Button-4>', lambda event: self.Scroll(-self.wheelLines))
+        self.text.bind('<Button-5>', lambda event: self.Scroll(self.wheelLines))
+
+    def __getattr__(self, name):
+        # tag_configure, configure, pack, grid, ... of the tk.Text
+        return getattr(self.text, name)
+
+    # tk.Text compatible methods used by the GUIs
+    def insert(self, index, text, *tags):
+        self.history.Insert(text, tags[0] if tags else None)
+        self.Refresh()
+
+    def see(self, index):
+        if index == 'end':
+            self.top = None
+            self.Refresh()
+
+    def delete(self, first, last=None):
+        self.history.Clear()
+        self.top = None
+        self.Refresh()
+
+    def yview(self, *args):
+        # Scrollbar command: ('moveto', fraction) or ('scroll', count, 'units' or 'pages')
+        if not args:
+            return self.text.yview()
+        if args[0] == 'moveto':
+            self.ScrollTo(int(float(args[1]) * self.lineCount))
+        elif args[0] == 'scroll':
+            count = int(args[1])
+            self.Scroll(count * self.height if args[2] == 'pages' else count)
+
+    def Scroll(self, lines):
+        top = self.top if self.top is not None else max(self.lineCount - self.height, 0)
+        self.ScrollTo(top + lines)
+        return 'break' # No scrolling of the tk.Text itself
+
+    def ScrollTo(self, top):
+        top = max(top, 0)
+        self.top = None if top >= self.lineCount - self.height else top # At the end: follow new lines
+        self.Refresh()
+
+    def SetFilter(self, tags):
+        self.tags = None if tags is None else tuple(tags)
+        self.top = None
+        self.Refresh()
+
+    def FilterMenu(self, master):
+        selected = tk.StringVar(master=master, value='All')
+        menu = tk.OptionMenu(master, selected, *filters, command=lambda name: self.SetFilter(filters[name]))
+        menu.config(width=14)
+        return menu
+
+    def Refresh(self):
+        if not self.scheduled:
+            self.scheduled = True
+            self.text.after_idle(self.Render)
+
+    def Render(self):
+        self.scheduled = False
+        self.lineCount, top, lines = self.history.Window(self.tags, self.top, self.height)
+        self.text.delete('1.0', 'end')
+        for lineTime, text, tag in lines:
+            self.text.insert('end', text + '\n', tag)
+        if self.top is None:
+            self.text.see('end') # Following the end, also with wrapped lines
+        if self.scrollbar is not None:
+            if self.lineCount:
+                self.scrollbar.set(top / self.lineCount, min(top + self.height, self.lineCount) / self.lineCount)
+            else:
+                self.scrollbar.set(0, 1)
@@ -0,0 +1,105 @@
+###############################################################################
+# File name:      CpscInterface.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscInterface is the common base of CpscSerialInterface and
+# CpscEthernetInterface. Code that only uses the methods below works with
+# both links, see CpscFactory.OpenCpsc() to open one from a URL.
+#
+# - Write(txMessage)     send a message as is
+# - Read()               read one response including \r\n
+# - WriteRead(txMessage, txTermination=0)
+#                        send a message and read the response. With
+#                        txTermination=1 \r\n is added to the txMessage and
+#                        removed from the rxMessage.
+# - FlushInput()         drop responses that have not been read
+# - Close()
+#
+# WriteRead() holds the interface lock from Write() to Read(), so threads
+# sharing one interface (e.g. a button handler and a poll thread) can not
+# interleave their commands and each gets its own response. Callers no
+# longer need to wait for each other; code that sends several commands as
+# one transaction can hold 'with interface.lock:' around them. STP
+# commands are served before other waiting commands, see CpscPriorityLock.
+#
+# Subclasses implement WriteMessage(), ReadMessage(), FlushInput() and
+# Close(). Write() and Read() add the optional CpscMetrics instrumentation
+# (latency per command, bytes, timeouts), see CpscMetrics.Enable().
+#
+# Use a CpscInterface in a 'with' 'as' construction to ensure the link is
+# always closed after running the program.
+###############################################################################
+
+# 3rd party imports
+import time
+from collections import deque
+
+# JPE imports
+from CpscInterfaces import CpscMetrics
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+from CpscInterfaces.CpscPriorityLock import CpscPriorityLock, IsPriority
+
+class CpscInterface:
+
+    def __init__(self):
+        self.lock = CpscPriorityLock() # Serializes WriteRead() between threads, STP first
+        self.metrics = CpscMetrics.metrics # None unless CpscMetrics.Enable() has been called
+        self.sentCommands = deque() # (mnemonic, send time) of commands waiting for a response
+        self.openTime = time.perf_counter()
+
+    def Opened(self):
+        # Called by the subclass when the port is open
+        if self.metrics is not None:
+            self.metrics.Opened(time.perf_counter() - self.openTime)
+
+    def Write(self,txMessage):
+        if self.metrics is None:
+            return self.WriteMessage(txMessage)
+        mnemonic = CpscMetrics.Mnemonic(txMessage)
+        self.sentCommands.append((mnemonic, time.perf_counter()))
+        try:
+            self.WriteMessage(txMessage)
+        except IOError:
+            self.sentCommands.clear()
+            self.metrics.Lost(mnemonic)
+            raise
+        self.metrics.Sent(mnemonic, len(txMessage))
+
+    def Read(self):
+        if self.metrics is None:
+            return self.ReadMessage()
+        mnemonic, sendTime = self.sentCommands.popleft() if self.sentCommands else ('(unsolicited)', time.perf_counter())
+        try:
+            rxMessage = self.ReadMessage()
+        except CpscTimeoutError:
+            self.metrics.TimedOut(mnemonic)
+            raise
+        except IOError:
+            self.sentCommands.clear() # Responses of commands in flight are lost too
+            self.metrics.Lost(mnemonic)
+            raise
+        if rxMessage.endswith('\r\n'):
+            self.metrics.Received(mnemonic, len(rxMessage), time.perf_counter() - sendTime)
+        else:
+            self.metrics.TimedOut(mnemonic, len(rxMessage)) # Serial timeout, incomplete response
+        return rxMessage
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def WriteRead(self, txMessage, txTermination=0):
+        with self.lock.Hold(IsPriority(txMessage)):
+            if txTermination == 0:
+                self.Write(txMessage)
+                rxMessage = self.Read()
+                return rxMessage
+            else:
+                self.Write(txMessage + '\r\n')
+                rxMessage = self.Read()
+                rxMessageClean = rxMessage.replace('\r\n', '')
+                return rxMessageClean
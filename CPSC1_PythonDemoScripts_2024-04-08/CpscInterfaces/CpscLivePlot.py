@@ -0,0 +1,139 @@
+###############################################################################
+# File name:      CpscLivePlot.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Live plot panel (matplotlib FigureCanvasTkAgg) of the samples in a
+# CpscRingBuffer, e.g. the RLS positions of the RSM read out and of a
+# sequence run. The acquisition threads only append to the ring buffer; the
+# plot is updated by the Tk main loop (after()) every frameInterval seconds:
+# - the last 'span' seconds are shown, time relative to now (x = -span..0)
+# - every channel is decimated to at most maxPoints points: the minimum and
+#   maximum of every bucket of samples are kept (Decimate()), so peaks stay
+#   visible and the drawing time does not depend on the number of samples
+# - only the lines are drawn on a copy of the background (blitting); axes,
+#   ticks and labels are drawn again only when the y range changes
+#
+# Stats() returns the frame times (histogram) and the number of full redraws.
+###############################################################################
+
+# 3rd party imports
+import time
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# JPE imports
+from CpscInterfaces import CpscMetrics
+from CpscInterfaces import CpscRingBuffer
+
+def ChannelView(window, channel, channelCount):
+    # Times and values of one channel: views (no copy) when the channels are stored in a fixed order
+    # (AppendSample() of a response with channelCount values), otherwise copies (CpscRingBuffer.Channel)
+    times, channels, values = window
+    first = int(np.argmax(channels[:channelCount] == channel)) if len(channels) else 0
+    if len(channels) and channels[first] == channel and np.all(channels[first::channelCount] == channel):
+        return times[first::channelCount], values[first::channelCount]
+    return CpscRingBuffer.Channel(window, channel)
+
+def Decimate(times, values, maxPoints):
+    # Minimum and maximum (in time order) of every bucket of samples, about maxPoints points
+    count = len(times)
+    if count <= maxPoints:
+        return times, values
+    buckets = maxPoints // 2
+    size = count // buckets            # Samples per bucket
+    start = count - buckets * size     # The oldest samples that do not fill a bucket form one extra bucket
+    bucketValues = values[start:].reshape(buckets, size)
+    low = bucketValues.argmin(axis=1)
+    high = bucketValues.argmax(axis=1)
+    offsets = start + np.arange(buckets) * size
+    index = np.column_stack((offsets + np.minimum(low, high), offsets + np.maximum(low, high))).ravel()
+    if start:
+        head = values[:start]
+        index = np.concatenate((np.sort([head.argmin(), head.argmax()]), index))
+    return times[index], values[index]
+
+class CpscLivePlot:
+
+    def __init__(self, master, buffer, channels=(1, 2, 3), span=60.0, maxPoints=2000, frameInterval=0.04,
+                 ylabel='RLS Position [m]', labels=None, colors=('b', 'g', 'r'), figsize=(8, 2.5), margin=0.1):
+        self.buffer = buffer
+        self.channels = channels
+        self.span = span                   # [s] time shown
+        self.maxPoints = maxPoints         # Points per line after decimation
+        self.frameInterval = frameInterval # [s] 25 frames/s
+        self.margin = margin               # Extra y range (fraction) at a full redraw, so it is not needed every frame
+        self.figure = Figure(figsize=figsize, dpi=100)
+        self.axes = self.figure.add_subplot(1, 1, 1)
+        self.axes.set_xlim(-span, 0)
+        self.axes.set_xlabel('Time [s]')
+        self.axes.set_ylabel(ylabel)
+        self.axes.grid(which='major', linestyle='--', linewidth=0.2)
+        self.lines = []
+        for index, channel in enumerate(channels):
+            label = labels[index] if labels else f'CH{channel}'
+            line, = self.axes.plot([], [], color=colors[index % len(colors)], linewidth=0.8, label=label, animated=True)
+            self.lines.append(line)
+        self.axes.legend(loc='upper left', fontsize=7)
+        self.figure.tight_layout()
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.OnDraw)
+        self.frameTimes = CpscMetrics.CpscLatencyHistogram()
+        self.redraws = 0
+        self.paused = False
+        self.canvas.get_tk_widget().after(int(1000 * frameInterval), self.Update)
+
+    def Widget(self):
+        return self.canvas.get_tk_widget()
+
+    def OnDraw(self, event):
+        # After a full redraw (resize, new y range): store the background without the lines
+        self.background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self.DrawLines()
+
+    def DrawLines(self):
+        for line in self.lines:
+            self.axes.draw_artist(line)
+        self.canvas.blit(self.axes.bbox)
+
+    def Update(self):
+        startTime = time.perf_counter()
+        if not self.paused:
+            now = time.monotonic()
+            window = self.buffer.Since(now - self.span)
+            low, high = np.inf, -np.inf
+            for channel, line in zip(self.channels, self.lines):
+                times, values = ChannelView(window, channel, len(self.channels))
+                times, values = Decimate(times, values, self.maxPoints)
+                line.set_data(times - now, values)
+                if len(values):
+                    low, high = min(low, values.min()), max(high, values.max())
+            if self.ScaleY(low, high) or self.background is None:
+                self.redraws += 1
+                self.canvas.draw_idle()    # Axes drawn again, then OnDraw() draws the lines
+            else:
+                self.canvas.restore_region(self.background)
+                self.DrawLines()
+            self.frameTimes.Add(time.perf_counter() - startTime)
+        self.canvas.get_tk_widget().after(int(1000 * self.frameInterval), self.Update)
+
+    def ScaleY(self, low, high):
+        # New y limits when the data leave the range or use less than half of it; returns True if changed
+        if low > high:
+            return False
+        span = max(high - low, abs(high) * 1e-6, 1e-12) # Minimum range for (almost) constant values
+        bottom, top = self.axes.get_ylim()
+        if bottom <= low and high <= top and top - bottom <= 2 * span * (1 + 2 * self.margin):
+            return False
+        middle = (low + high) / 2
+        self.axes.set_ylim(middle - span * (0.5 + self.margin), middle + span * (0.5 + self.margin))
+        return True
+
+    def Clear(self):
+        self.buffer.Clear()
+
+    def Stats(self):
+        return {'redraws': self.redraws, 'frame': self.frameTimes.Summary()}
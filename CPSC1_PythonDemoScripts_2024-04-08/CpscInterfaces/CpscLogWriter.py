@@ -0,0 +1,77 @@
+###############################################################################
+# File name:      CpscLogWriter.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Streaming CSV writer for measurement logs (sequence runs, COE checks).
+# Every row is written when the sample arrives, instead of writing all data
+# at the end of a run, so a crash or reboot loses at most the last seconds:
+# - the file buffer is flushed every flushInterval seconds (and at Flush()),
+#   so other tools can follow the file live (e.g. tail -f or Excel refresh)
+# - the file is synced to disk (os.fsync) every syncInterval seconds and
+#   when it is closed
+#
+# The format is the same as the CSV files written before: ';' separated,
+# Excel dialect, an optional header row first. Use one row per sample with
+# the run and leg in the row (e.g. run;leg;time;value), so runs and legs of
+# different lengths are stored completely.
+###############################################################################
+
+# 3rd party imports
+import os
+import csv
+import time
+import threading
+
+class CpscLogWriter:
+
+    def __init__(self, path, header=None, flushInterval=1.0, syncInterval=10.0, delimiter=';'):
+        self.path = path
+        self.flushInterval = flushInterval # [s]
+        self.syncInterval = syncInterval   # [s]
+        self.lock = threading.RLock()
+        self.file = open(path, 'w', newline="")
+        self.writer = csv.writer(self.file, delimiter=delimiter, dialect='excel')
+        self.rowCount = 0
+        self.flushTime = self.syncTime = time.monotonic()
+        if header is not None:
+            self.writer.writerow(header)
+            self.Flush(True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def WriteRow(self, row):
+        with self.lock:
+            self.writer.writerow(row)
+            self.rowCount += 1
+            now = time.monotonic()
+            if now - self.syncTime >= self.syncInterval:
+                self.Flush(True)
+            elif now - self.flushTime >= self.flushInterval:
+                self.Flush()
+
+    def WriteRows(self, rows):
+        for row in rows:
+            self.WriteRow(row)
+
+    def Flush(self, sync=False):
+        # Hand the buffered rows to the OS (visible to readers) and optionally write them to disk
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            self.flushTime = time.monotonic()
+            if sync:
+                os.fsync(self.file.fileno())
+                self.syncTime = self.flushTime
+
+    def Close(self):
+        with self.lock:
+            if not self.file.closed:
+                self.Flush(True)
+                self.file.close()
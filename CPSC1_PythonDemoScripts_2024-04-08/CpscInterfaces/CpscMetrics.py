@@ -0,0 +1,161 @@
+###############################################################################
+# File name:      CpscMetrics.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Opt-in instrumentation of the CPSC interfaces. Call Enable() before
+# opening a link; every CpscSerialInterface and CpscEthernetInterface
+# opened afterwards records:
+# - the round-trip latency of every command, per mnemonic (PGVA, MOV, ...)
+#   in a histogram with p50/p95/p99/max
+# - bytes sent and received, per mnemonic
+# - timeouts (no complete response) and lost connections, per mnemonic
+# - the time needed to open the port, and reconnects of a CpscSession
+#
+# The latency is measured from Write() to the Read() returning the matching
+# response (FIFO), so pipelined commands (WriteReadMany) are measured too.
+#
+# Query the numbers at runtime with metrics.Summary() (a dict) or
+# metrics.Report() (a text table), or store them with metrics.Dump(path)
+# as JSON. When metrics are not enabled the interfaces do no extra work.
+###############################################################################
+
+# 3rd party imports
+import json
+import math
+import threading
+
+class CpscLatencyHistogram:
+
+    # Logarithmic buckets from 10 us, 8 per doubling (about 9% resolution)
+    base = 1e-5
+    bucketsPerDoubling = 8
+    bucketCount = 200
+
+    def __init__(self):
+        self.buckets = [0] * self.bucketCount
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def Add(self, seconds):
+        if seconds <= self.base:
+            index = 0
+        else:
+            index = min(int(math.log2(seconds / self.base) * self.bucketsPerDoubling) + 1, self.bucketCount - 1)
+        self.buckets[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def Percentile(self, percent):
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(percent / 100 * self.count)
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                if index == 0:
+                    return min(self.base, self.max)
+                upper = self.base * 2 ** (index / self.bucketsPerDoubling) # Upper edge of the bucket
+                return min(upper, self.max)
+        return self.max
+
+    def Summary(self):
+        return {'count': self.count,
+                'mean': self.total / self.count if self.count else 0.0,
+                'p50': self.Percentile(50),
+                'p95': self.Percentile(95),
+                'p99': self.Percentile(99),
+                'max': self.max}
+
+class CpscMetrics:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.Clear()
+
+    def Clear(self):
+        with self.lock:
+            self.latency = {}   # Mnemonic: CpscLatencyHistogram
+            self.counters = {}  # Mnemonic: {'txBytes', 'rxBytes', 'timeouts', 'lost'}
+            self.opens = CpscLatencyHistogram()
+            self.reconnects = 0
+
+    def Counters(self, mnemonic):
+        counters = self.counters.get(mnemonic)
+        if counters is None:
+            counters = self.counters[mnemonic] = {'txBytes': 0, 'rxBytes': 0, 'timeouts': 0, 'lost': 0}
+        return counters
+
+    def Sent(self, mnemonic, byteCount):
+        with self.lock:
+            self.Counters(mnemonic)['txBytes'] += byteCount
+
+    def Received(self, mnemonic, byteCount, seconds):
+        with self.lock:
+            self.Counters(mnemonic)['rxBytes'] += byteCount
+            histogram = self.latency.get(mnemonic)
+            if histogram is None:
+                histogram = self.latency[mnemonic] = CpscLatencyHistogram()
+            histogram.Add(seconds)
+
+    def TimedOut(self, mnemonic, byteCount=0):
+        with self.lock:
+            counters = self.Counters(mnemonic)
+            counters['timeouts'] += 1
+            counters['rxBytes'] += byteCount
+
+    def Lost(self, mnemonic):
+        with self.lock:
+            self.Counters(mnemonic)['lost'] += 1
+
+    def Opened(self, seconds):
+        with self.lock:
+            self.opens.Add(seconds)
+
+    def Reconnected(self):
+        with self.lock:
+            self.reconnects += 1
+
+    def Summary(self):
+        with self.lock:
+            commands = {}
+            for mnemonic, counters in self.counters.items():
+                histogram = self.latency.get(mnemonic, CpscLatencyHistogram())
+                commands[mnemonic] = dict(histogram.Summary(), **counters)
+            return {'commands': commands, 'opens': self.opens.Summary(), 'reconnects': self.reconnects}
+
+    def Dump(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.Summary(), file, indent=2)
+
+    def Report(self):
+        summary = self.Summary()
+        lines = [f'{"Command":10} {"count":>7} {"p50":>8} {"p95":>8} {"p99":>8} {"max":>8} [ms] {"tx":>9} {"rx":>9} [B] {"t/o":>4} {"lost":>4}']
+        rows = sorted(summary['commands'].items(), key=lambda item: -item[1]['mean'] * item[1]['count']) # Most total time first
+        rows.append(('(open)', dict(summary['opens'], txBytes=0, rxBytes=0, timeouts=0, lost=0)))
+        for mnemonic, row in rows:
+            lines.append(f'{mnemonic:10} {row["count"]:7} {1000 * row["p50"]:8.2f} {1000 * row["p95"]:8.2f} {1000 * row["p99"]:8.2f} {1000 * row["max"]:8.2f}      '
+                         f'{row["txBytes"]:9} {row["rxBytes"]:9}     {row["timeouts"]:4} {row["lost"]:4}')
+        lines.append(f'Reconnects: {summary["reconnects"]}')
+        return '\n'.join(lines)
+
+def Mnemonic(txMessage):
+    parts = txMessage.split(None, 1)
+    return parts[0].upper() if parts else '(empty)'
+
+# Shared metrics, None until Enable() is called
+metrics = None
+
+def Enable():
+    global metrics
+    if metrics is None:
+        metrics = CpscMetrics()
+    return metrics
+
+def Disable():
+    global metrics
+    metrics = None
@@ -0,0 +1,125 @@
+###############################################################################
+# File name:      CpscPipeline.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscPipeline keeps up to 'window' commands outstanding on one CPSC
+# interface (CpscSerialInterface or CpscEthernetInterface) instead of
+# waiting for every response before sending the next command.
+#
+# The CPSC answers commands in the order they were received, so responses
+# are matched to their commands in FIFO order by a reader thread.
+#
+# Submit() sends a command and returns a concurrent.futures.Future that
+# holds the response (\r\n removed). An optional callback is called with
+# the response from the reader thread; an exception raised by the callback
+# is counted in 'failed' and does not stop the reader. WriteReadMany() sends
+# a list of commands and returns the list of responses.
+#
+# A timeout fails all outstanding commands with CpscTimeoutError. Their
+# responses may still come; they are counted in 'discard' and dropped when
+# they arrive, so later commands still get their own responses.
+#
+# The pipeline must be the only user of the interface while it is open.
+# To pipeline commands on a shared CpscSession use
+# CpscSession.WriteReadMany() instead.
+#
+# Use the CpscPipeline in a 'with' 'as' construction to ensure the reader
+# thread is always stopped (the interface itself is not closed).
+###############################################################################
+
+# 3rd party imports
+import collections
+import threading
+from concurrent.futures import Future
+
+# JPE imports
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+
+class CpscPipeline:
+
+    def __init__(self,interface,window=8):
+        self.interface = interface
+        self.window = threading.Semaphore(window)
+        self.pending = collections.deque() # (future, callback) in send order
+        self.condition = threading.Condition()
+        self.running = True
+        self.failed = 0                    # Callbacks that raised an exception
+        self.discard = 0                   # Late responses of timed out commands to drop
+        self.reader = threading.Thread(target=self.ReadLoop, daemon=True)
+        self.reader.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def Close(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.reader.join()
+
+    def Submit(self, txMessage, callback=None):
+        future = Future()
+        self.window.acquire() # Blocks while 'window' commands are outstanding
+        with self.condition:
+            if not self.running:
+                self.window.release()
+                raise IOError('CpscPipeline is closed')
+            try:
+                self.interface.Write(txMessage + '\r\n')
+            except IOError:
+                self.window.release()
+                raise
+            self.pending.append((future, callback))
+            self.condition.notify()
+        return future
+
+    def WriteReadMany(self, txMessages):
+        futures = [self.Submit(txMessage) for txMessage in txMessages]
+        return [future.result() for future in futures]
+
+    def ReadLoop(self):
+        while True:
+            with self.condition:
+                while self.running and not self.pending:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+            try:
+                rxMessage = self.interface.Read()
+                if not rxMessage.endswith('\r\n'):
+                    raise CpscTimeoutError('No complete response from CPSC within timeout')
+            except IOError as ex:
+                late = self.FailPending(ex) # Link state unknown, fail all outstanding commands
+                if isinstance(ex, CpscTimeoutError):
+                    self.discard += late # Their responses may still come
+                continue
+            if self.discard > 0:
+                self.discard -= 1 # Late response of a timed out command
+                continue
+            with self.condition:
+                future, callback = self.pending.popleft()
+            self.window.release()
+            rxMessage = rxMessage.replace('\r\n', '')
+            future.set_result(rxMessage)
+            if callback is not None:
+                self.Callback(callback, rxMessage)
+
+    def Callback(self, callback, rxMessage):
+        try:
+            callback(rxMessage)
+        except Exception:
+            self.failed += 1 # The reader thread must keep matching responses to commands
+
+    def FailPending(self, ex):
+        with self.condition:
+            failed = list(self.pending)
+            self.pending.clear()
+        for future, callback in failed:
+            self.window.release()
+            future.set_exception(ex)
+        return len(failed)
@@ -0,0 +1,84 @@
+###############################################################################
+# File name:      CpscPoller.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Fixed-rate polling of a CPSC command, e.g. PGVA during a sequence run.
+# Polls are sent on a fixed grid of time.monotonic() deadlines
+# (startTime + tick * interval) instead of sleeping a fixed delay after each
+# poll, so the sample period does not grow with the round trip and does not
+# drift with load.
+#
+# A tick that is late is still sent as long as the next tick has not come.
+# Ticks that are passed by a full interval or more are skipped (and counted)
+# rather than sent back to back to catch up.
+#
+# Every poll returns a CpscSample with the tick number, the time the command
+# was sent and the time the response was received (time.monotonic()).
+# sample.Time() is the middle of both, the best estimate of when the value
+# was read; tick * interval is the nominal sample time.
+#
+# The same grid is used by the poll jobs of CpscScheduler (see NextTick()).
+###############################################################################
+
+# 3rd party imports
+import time
+from collections import namedtuple
+
+class CpscSample(namedtuple('CpscSample', ['tick', 'sendTime', 'receiveTime', 'response'])):
+    __slots__ = ()
+
+    def Time(self):
+        return (self.sendTime + self.receiveTime) / 2
+
+    def RoundTrip(self):
+        return self.receiveTime - self.sendTime
+
+def NextTick(dueTime, interval, now):
+    # Return the due time on the grid dueTime + k * interval to poll next and
+    # the number of ticks skipped: a tick passed by a full interval is skipped
+    if now < dueTime + interval:
+        return dueTime, 0
+    skipped = int((now - dueTime) / interval)
+    return dueTime + skipped * interval, skipped
+
+class CpscFixedRatePoller:
+
+    def __init__(self, link, txMessage, interval, txTermination=1, startTime=None):
+        self.link = link                 # CpscSession, CpscScheduler, ... (anything with WriteRead)
+        self.txMessage = txMessage       # Command or function returning the command
+        self.interval = interval         # [s]
+        self.txTermination = txTermination
+        self.startTime = time.monotonic() if startTime is None else startTime
+        self.tick = 0                    # Tick of the next poll
+        self.skipped = 0
+
+    def __iter__(self):
+        while True:
+            yield self.Poll()
+
+    def DueTime(self):
+        return self.startTime + self.tick * self.interval
+
+    def Wait(self):
+        # Sleep until the next tick is due, skipping ticks that are missed
+        now = time.monotonic()
+        dueTime, skipped = NextTick(self.DueTime(), self.interval, now)
+        self.tick += skipped
+        self.skipped += skipped
+        if dueTime > now:
+            time.sleep(dueTime - now)
+
+    def Poll(self):
+        self.Wait()
+        txMessage = self.txMessage() if callable(self.txMessage) else self.txMessage
+        sendTime = time.monotonic()
+        response = self.link.WriteRead(txMessage, self.txTermination)
+        sample = CpscSample(self.tick, sendTime, time.monotonic(), response)
+        self.tick += 1
+        return sample
+
+    def Elapsed(self, sample):
+        # Time of the sample relative to the start of the poller
+        return sample.Time() - self.startTime
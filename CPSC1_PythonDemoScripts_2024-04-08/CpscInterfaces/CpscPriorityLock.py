@@ -0,0 +1,98 @@
+###############################################################################
+# File name:      CpscPriorityLock.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscPriorityLock is a reentrant lock with a priority lane. A thread that
+# acquires it with priority=True is served before every normally waiting
+# thread, as soon as the thread holding the lock releases it. CpscInterface
+# and CpscSession use it so an emergency stop (STP) does not queue behind
+# PGVA/CGVA/FBST poll commands.
+#
+# Stop-latency bound: a priority command waits for at most the command in
+# flight (one round trip, or the 10 s interface timeout if the CPSC does not
+# answer) plus its own round trip. WriteReadMany() stops sending when a
+# priority command is waiting, so there it waits for at most 'window'
+# outstanding responses. CPSC1_Stop-Latency-Test-v0.1.py measures the bound.
+#
+# IsPriority(txMessage) tells whether a command uses the priority lane, see
+# priorityCommands.
+###############################################################################
+
+# 3rd party imports
+import threading
+from contextlib import contextmanager
+
+priorityCommands = ('STP',) # Commands sent ahead of all other commands
+
+def IsPriority(txMessage):
+    return txMessage.lstrip().upper().startswith(priorityCommands)
+
+class CpscPriorityLock:
+
+    def __init__(self):
+        self.condition = threading.Condition(threading.Lock())
+        self.owner = None
+        self.count = 0
+        self.priorityWaiting = 0 # Number of threads waiting in the priority lane
+
+    def __enter__(self):
+        self.Acquire()
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Release()
+
+    def Acquire(self, priority=False):
+        threadId = threading.get_ident()
+        with self.condition:
+            if self.owner == threadId:
+                self.count += 1
+                return
+            if priority:
+                self.priorityWaiting += 1
+                try:
+                    while self.owner is not None:
+                        self.condition.wait()
+                finally:
+                    self.priorityWaiting -= 1
+            else:
+                while self.owner is not None or self.priorityWaiting:
+                    self.condition.wait()
+            self.owner = threadId
+            self.count = 1
+
+    def Release(self):
+        with self.condition:
+            if self.owner != threading.get_ident():
+                raise RuntimeError('CpscPriorityLock released by a thread that does not hold it')
+            self.count -= 1
+            if self.count == 0:
+                self.owner = None
+                self.condition.notify_all()
+
+    @contextmanager
+    def Hold(self, priority=False):
+        self.Acquire(priority)
+        try:
+            yield self
+        finally:
+            self.Release()
+
+    def PriorityWaiting(self):
+        return self.priorityWaiting > 0
+
+    def Yield(self):
+        # Let waiting priority threads go first, then take the lock back (same depth)
+        with self.condition:
+            if not self.priorityWaiting or self.owner != threading.get_ident():
+                return
+            count = self.count
+            self.owner = None
+            self.count = 0
+            self.condition.notify_all()
+            while self.owner is not None or self.priorityWaiting:
+                self.condition.wait()
+            self.owner = threading.get_ident()
+            self.count = count
@@ -0,0 +1,223 @@
+###############################################################################
+# File name:      CpscPublisher.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Publish/subscribe layer on top of CpscScheduler: consumers (GUI read out,
+# sequence run, live plot, logger, ...) subscribe to a reading (e.g.
+# 'PGVA 1 CLA2601 CLA2601 CLA2601', 'CGVA 1', 'FBST') at the rate they
+# need, and all subscriptions to the same command share one poll stream.
+# N consumers cost one poll on the wire, not N.
+#
+# - A stream polls at the fastest rate of its enabled subscriptions; with
+#   none enabled it does not poll at all. Subscriptions with an adaptive
+#   rate (CpscAdaptiveRate) are updated from every response and boosted by
+#   motion commands like a poll job.
+# - Every subscription gets the samples at its own rate: a subscription at
+#   0.1 s on a 0.05 s stream gets every second sample, on the tick grid.
+# - The callback gets the response or, with timestamps=True, the CpscSample.
+#   Without callback the samples are queued and read with Get(), e.g. in a
+#   sequence loop: sample = subscription.Get(retries=3).
+# - txMessage may be a function returning the command (built from GUI
+#   settings); the subscription moves to another stream when it changes.
+###############################################################################
+
+# 3rd party imports
+import queue
+import threading
+
+# JPE imports
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+
+class CpscSubscription:
+
+    def __init__(self, publisher, txMessage, interval, callback, enabled, errorCallback, timestamps, adaptive):
+        self.publisher = publisher
+        self.txMessage = txMessage
+        self.interval = interval
+        self.callback = callback
+        self.enabled = enabled
+        self.errorCallback = errorCallback
+        self.timestamps = timestamps
+        self.adaptive = adaptive
+        self.stream = None
+        self.dueTime = None      # Send time from which the next sample is delivered
+        self.samples = queue.Queue() if callback is None else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Cancel()
+
+    def Cancel(self):
+        self.publisher.Unsubscribe(self)
+
+    def Command(self):
+        return self.txMessage() if callable(self.txMessage) else self.txMessage
+
+    def Interval(self):
+        return self.interval if self.adaptive is None else self.adaptive.interval
+
+    def IsEnabled(self):
+        return self.enabled is None or self.enabled()
+
+    def IsDue(self, sample, streamInterval):
+        # Deliver on the subscription's own grid, allowing half a stream tick of jitter
+        if self.dueTime is None or sample.sendTime + streamInterval / 2 >= self.dueTime:
+            if self.dueTime is None or self.dueTime + self.Interval() <= sample.sendTime:
+                self.dueTime = sample.sendTime # First sample or ticks missed: restart the grid
+            self.dueTime += self.Interval()
+            return True
+        return False
+
+    def Deliver(self, sample):
+        value = sample if self.timestamps else sample.response
+        if self.samples is not None:
+            self.samples.put(value)
+        else:
+            self.callback(value)
+
+    def Fail(self, ex):
+        if self.samples is not None:
+            self.samples.put(ex)
+        elif self.errorCallback is not None:
+            self.errorCallback(ex)
+
+    def Get(self, timeout=None, retries=0):
+        # Next sample of a subscription without callback; a late sample or a poll error is raised here
+        # after 'retries' more attempts (e.g. while the scheduler executes a long command of another handler)
+        if timeout is None:
+            timeout = max(1.0, 10 * self.Interval())
+        for attempt in range(retries + 1):
+            try:
+                value = self.samples.get(timeout=timeout)
+            except queue.Empty:
+                value = CpscTimeoutError('No sample received for ' + str(self.Command()))
+            if not isinstance(value, Exception):
+                return value
+        raise value
+
+    def Clear(self):
+        # Drop samples queued so far
+        while self.samples is not None and not self.samples.empty():
+            self.samples.get_nowait()
+
+class CpscStream:
+
+    # One poll job shared by all subscriptions to the same command. The stream
+    # is the adaptive rate of its poll job: the interval is the fastest of the
+    # enabled subscriptions.
+
+    def __init__(self, publisher, txMessage):
+        self.publisher = publisher
+        self.txMessage = txMessage
+        self.subscriptions = []
+        self.interval = None
+        self.job = None
+
+    def Interval(self):
+        intervals = [subscription.Interval() for subscription in self.subscriptions if subscription.IsEnabled()]
+        if not intervals:
+            intervals = [subscription.Interval() for subscription in self.subscriptions]
+        return min(intervals) if intervals else self.interval # No subscriptions left: the poll job is being removed
+
+    def IsEnabled(self):
+        return any(subscription.IsEnabled() for subscription in list(self.subscriptions))
+
+    def Start(self, scheduler):
+        self.interval = self.Interval()
+        self.job = scheduler.AddPoll(self.txMessage, self.interval, self.Publish, enabled=self.IsEnabled, errorCallback=self.PublishError,
+                                     timestamps=True, adaptive=self)
+
+    def Changed(self):
+        # Subscriptions were added or removed
+        self.interval = self.Interval()
+        self.job.SetInterval(self.interval)
+
+    # Adaptive rate interface of CpscScheduler
+    def Boost(self):
+        for subscription in list(self.subscriptions):
+            if subscription.adaptive is not None:
+                subscription.adaptive.Boost()
+        self.interval = self.Interval()
+        return self.interval
+
+    def Update(self, response, now=None):
+        for subscription in list(self.subscriptions):
+            if subscription.adaptive is not None:
+                subscription.adaptive.Update(response, now)
+        self.interval = self.Interval()
+        return self.interval
+
+    # Poll job callbacks
+    def Publish(self, sample):
+        self.publisher.Refresh()
+        for subscription in list(self.subscriptions):
+            if subscription.IsEnabled() and subscription.IsDue(sample, self.job.interval):
+                try:
+                    subscription.Deliver(sample)
+                except Exception:
+                    self.publisher.scheduler.CountFailed() # E.g. an unexpected response, the other subscribers still get it
+
+    def PublishError(self, ex):
+        for subscription in list(self.subscriptions):
+            if subscription.IsEnabled():
+                subscription.Fail(ex)
+
+class CpscPublisher:
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.lock = threading.RLock()
+        self.streams = {}        # Command: CpscStream
+        self.subscriptions = []
+
+    def Subscribe(self, txMessage, interval, callback=None, enabled=None, errorCallback=None, timestamps=False, adaptive=None):
+        subscription = CpscSubscription(self, txMessage, interval, callback, enabled, errorCallback, timestamps, adaptive)
+        with self.lock:
+            self.subscriptions.append(subscription)
+            self.Attach(subscription, subscription.Command())
+        return subscription
+
+    def Unsubscribe(self, subscription):
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+                self.Detach(subscription)
+
+    def Attach(self, subscription, command):
+        stream = self.streams.get(command)
+        subscription.stream = stream
+        if stream is None:
+            stream = subscription.stream = self.streams[command] = CpscStream(self, command)
+            stream.subscriptions.append(subscription)
+            stream.Start(self.scheduler)
+        else:
+            stream.subscriptions.append(subscription)
+            stream.Changed()
+
+    def Detach(self, subscription):
+        stream = subscription.stream
+        subscription.stream = None
+        stream.subscriptions.remove(subscription)
+        if stream.subscriptions:
+            stream.Changed()
+        else:
+            del self.streams[stream.txMessage]
+            stream.job.Cancel()
+
+    def Refresh(self):
+        # Move subscriptions whose command changed (e.g. another RSM address selected)
+        with self.lock:
+            for subscription in self.subscriptions:
+                command = subscription.Command()
+                if command != subscription.stream.txMessage:
+                    self.Detach(subscription)
+                    self.Attach(subscription, command)
+
+    def Streams(self):
+        # Command: (poll interval, number of subscriptions) of the active streams
+        with self.lock:
+            return {command: (stream.job.interval, len(stream.subscriptions)) for command, stream in self.streams.items()}
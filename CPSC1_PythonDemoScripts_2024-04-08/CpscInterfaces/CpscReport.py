@@ -0,0 +1,150 @@
+###############################################################################
+# File name:      CpscReport.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Report plots (300 dpi PNG) of sequence runs and COE checks, rendered in
+# worker processes with the Agg backend instead of in the handler thread:
+# - RenderSequence(dataPath, pngPath, title): the RLS positions of a binary run log
+#   (CpscRunLog), moves to Pos B and to Pos A, with the run settings of the
+#   log header and the speeds and overshoot (CpscAnalysis) as default title
+# - RenderCoe(csvPath, pngPath, title, ...): COE POS and COE RAW value of the
+#   CSV log of a COE check
+#
+# CpscReportPool.Submit('sequence', dataPath=..., pngPath=...) returns at
+# once (a concurrent.futures.Future); up to 'workers' reports (default: one
+# per CPU core) are rendered in parallel, each in its own Python process
+# (python -m CpscInterfaces.CpscReport <kind> <JSON arguments>). The GUI
+# scripts have no __main__ guard, so multiprocessing workers (spawn on
+# Windows) would start the GUI again; a new interpreter does not. A failed
+# report raises CpscReportError from future.result().
+###############################################################################
+
+# 3rd party imports
+import os
+import sys
+import json
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# JPE imports
+from CpscInterfaces import CpscErrors
+
+packageRoot = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # Directory with CpscInterfaces
+
+# numpy and matplotlib are only imported by the worker processes (the GUIs import this module at startup)
+def NewFigure():
+    # Figure drawn with Agg (no GUI backend, no pyplot)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    return figure
+
+def RenderSequence(dataPath, pngPath, title=None, script=None, dpi=300):
+    # title None: built from the log header (the settings stored by the GUI) and the analysis
+    import numpy as np
+    from CpscInterfaces import CpscRunLog
+    runLog = CpscRunLog.CpscRunLog(dataPath)
+    if title is None:
+        from CpscInterfaces import CpscAnalysis
+        settings = {name: str(value) for name, value in runLog.metadata.items()}
+        legs = CpscAnalysis.AnalyseLegs(runLog['time'], runLog['position'], runLog['run'], runLog['dir'],
+                                        float(settings['POSA']), float(settings['POSB']))
+        statistics = CpscAnalysis.RunStatistics(legs)
+        title = ('Sequence #' + settings.get('sequence', '') + ' of ' + settings.get('stage', '') + ' #' + settings.get('serial', '') +
+                 '\nTest Params: [FREQ]:' + settings.get('FREQ', '') + ' [RSS]:' + settings.get('RSS', '') + ' [TEMP]:' + settings.get('TEMP', '') +
+                 ' [DF]:' + settings.get('DF', '') + ' [#Runs]:' + settings.get('runs', '') +
+                 '\n[MIR]:' + settings.get('MIR', '') + ' [MAR]:' + settings.get('MAR', '') +
+                 ' [POSA]:' + settings['POSA'] + ' [POSB]:' + settings['POSB'] +
+                 '\n[AVRG Speed B->A]: ' + str(round(1000 * CpscAnalysis.Mean(statistics, 0, 'steadySpeed'), 2)) + '[mm/s]' +
+                 ' [AVRG Speed A->B]: ' + str(round(1000 * CpscAnalysis.Mean(statistics, 1, 'steadySpeed'), 2)) + '[mm/s]' +
+                 '\n[AVRG Overshoot A]: ' + str(round(1e6 * CpscAnalysis.Mean(statistics, 0, 'overshoot'), 3)) + '[um]' +
+                 ' [AVRG Overshoot B]: ' + str(round(1e6 * CpscAnalysis.Mean(statistics, 1, 'overshoot'), 3)) + '[um]')
+    fig = NewFigure()
+    ax1, ax2 = fig.subplots(2)
+    fig.suptitle(title, fontsize=7)
+    direction = np.asarray(runLog['dir'])
+    for axes, legDirection, color in ((ax1, 1, 'b'), (ax2, 0, 'g')): # Moves to Pos B on top, to Pos A below
+        selected = direction == legDirection
+        axes.set_xlabel('Time [s]')
+        axes.set_ylabel('RLS Position [m]', color=color)
+        axes.plot(runLog['time'][selected], runLog['position'][selected], color=color, linestyle='None', marker='.', markersize=3)
+        axes.tick_params(axis='y', labelcolor=color)
+        axes.grid(which='major', linestyle='--', linewidth=0.2)
+        axes.grid(which='minor', linestyle='-', linewidth=0.1)
+        axes.minorticks_on()
+    if script:
+        fig.text(0.01, 0.01, script, fontsize=5)
+    fig.tight_layout()
+    fig.savefig(pngPath, dpi=dpi)
+
+def RenderCoe(csvPath, pngPath, title, upperThreshold=None, lowerThreshold=None, dpi=300):
+    # CSV columns (CpscLogWriter, ';'): Time [s], COE POS [counts], COE RAW value
+    import numpy as np
+    data = np.loadtxt(csvPath, delimiter=';', skiprows=1, ndmin=2)
+    fig = NewFigure()
+    ax1 = fig.subplots(1)
+    fig.suptitle(title, fontsize=8)
+    ax1.set_xlabel('Time [s]')
+    ax1.set_ylabel('COE POS [counts]', color='r')
+    ax1.plot(data[:, 0], data[:, 1], color='r', linewidth=0.5)
+    ax1.tick_params(axis='y', labelcolor='r')
+    ax1.grid(linestyle = '--', linewidth = 0.2)
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('COE RAW value', color='b')
+    ax2.plot(data[:, 0], data[:, 2], color='b', linewidth=0.5)
+    ax2.tick_params(axis='y', labelcolor='b')
+    for threshold in (upperThreshold, lowerThreshold):
+        if threshold is not None:
+            ax2.axhline(y = int(threshold), color = 'tab:gray', linestyle = 'dashed')
+    fig.tight_layout()
+    fig.savefig(pngPath, dpi=dpi)
+
+renderers = {'sequence': RenderSequence, 'coe': RenderCoe}
+
+class CpscReportPool:
+
+    def __init__(self, workers=None, timeout=600.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout             # [s] per report
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='CpscReport')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def Submit(self, kind, callback=None, **arguments):
+        # Queue a report; callback(future) is called when it is done (in a pool thread)
+        if kind not in renderers:
+            raise ValueError(f'Unknown report {kind}, use one of {list(renderers)}')
+        arguments = {name: os.path.abspath(value) if name.endswith('Path') and value else value for name, value in arguments.items()}
+        future = self.executor.submit(self.Render, kind, arguments)
+        if callback is not None:
+            future.add_done_callback(callback)
+        return future
+
+    def Render(self, kind, arguments):
+        # Render a report in a new process; returns the rendering time [s]
+        startTime = time.monotonic()
+        try:
+            result = subprocess.run([sys.executable, '-m', 'CpscInterfaces.CpscReport', kind, json.dumps(arguments)], cwd=packageRoot,
+                                    capture_output=True, text=True, timeout=self.timeout,
+                                    creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)) # No console window on Windows
+        except subprocess.TimeoutExpired:
+            raise CpscErrors.CpscReportError(f'Report {kind} not finished after {self.timeout} [s]')
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            raise CpscErrors.CpscReportError(f'Report {kind} failed: ' + (lines[-1] if lines else f'exit code {result.returncode}'))
+        return time.monotonic() - startTime
+
+    def Close(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+if __name__ == '__main__':
+    # Worker process: python -m CpscInterfaces.CpscReport <kind> <JSON arguments>
+    renderers[sys.argv[1]](**json.loads(sys.argv[2]))
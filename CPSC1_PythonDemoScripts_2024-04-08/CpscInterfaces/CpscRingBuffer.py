@@ -0,0 +1,103 @@
+###############################################################################
+# File name:      CpscRingBuffer.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Fixed size store of (time, channel, value) samples, e.g. RLS positions
+# polled with PGVA, for plotting and analysis. Memory is allocated once
+# (capacity samples), so it stays constant during multi-day endurance runs;
+# when the buffer is full the oldest samples are overwritten.
+#
+# - Append() and AppendSample() (one sample per value of a CpscSample
+#   response, channel 1, 2, 3, ...) take O(1) time.
+# - Last(count), Since(time) and Window(start, end) return the samples as
+#   numpy arrays (times, channels, values) that are views on the buffer, not
+#   copies: every sample is stored twice (at index i and i + capacity), so
+#   any window of up to capacity samples is contiguous. A view shows the
+#   stored samples until capacity more samples are appended; use Copy() to
+#   keep them longer.
+# - Samples are counted from the start (Count()), so Window(start, end) can
+#   select e.g. the samples of one sequence run.
+#
+# Times are time.monotonic() values and must be appended in ascending order.
+###############################################################################
+
+# 3rd party imports
+import threading
+import numpy as np
+
+class CpscRingBuffer:
+
+    def __init__(self, capacity=100000):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.times = np.zeros(2 * capacity, dtype=np.float64)
+        self.channels = np.zeros(2 * capacity, dtype=np.int16)
+        self.values = np.zeros(2 * capacity, dtype=np.float64)
+        self.count = 0 # Samples appended since the start
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def Clear(self):
+        with self.lock:
+            self.count = 0
+
+    def Count(self):
+        return self.count
+
+    def Dropped(self):
+        # Number of samples overwritten so far
+        return max(0, self.count - self.capacity)
+
+    def Append(self, time, channel, value):
+        with self.lock:
+            index = self.count % self.capacity
+            self.times[index] = self.times[index + self.capacity] = time
+            self.channels[index] = self.channels[index + self.capacity] = channel
+            self.values[index] = self.values[index + self.capacity] = value
+            self.count += 1
+
+    def AppendSample(self, sample, channels=None):
+        # Store the values of a CpscSample response ("v1,v2,v3") at the sample time
+        time = sample.Time()
+        values = sample.response.split(',')
+        for channel, value in zip(channels or range(1, len(values) + 1), values):
+            self.Append(time, channel, float(value))
+
+    def Window(self, start, end=None):
+        # Views on the samples start..end-1 (numbers from Count()), limited to the samples still stored
+        with self.lock:
+            end = self.count if end is None else min(end, self.count)
+            start = max(start, end - self.capacity, self.count - self.capacity, 0)
+            if start >= end:
+                return self.times[:0], self.channels[:0], self.values[:0]
+            first = start % self.capacity
+            last = first + (end - start)
+            return self.times[first:last], self.channels[first:last], self.values[first:last]
+
+    def Last(self, count=None):
+        return self.Window(self.count - (self.capacity if count is None else count))
+
+    def Since(self, time):
+        times, channels, values = self.Last()
+        first = int(np.searchsorted(times, time, side='left'))
+        return times[first:], channels[first:], values[first:]
+
+    def Copy(self, start=0, end=None):
+        return tuple(column.copy() for column in self.Window(start, end))
+
+def Channel(window, channel):
+    # Times and values of one channel of a window (copies)
+    times, channels, values = window
+    selected = channels == channel
+    return times[selected], values[selected]
+
+def Relative(times, startTimes):
+    # Time since the last start time before each sample, e.g. since the start of its sequence run
+    startTimes = np.asarray(startTimes, dtype=np.float64)
+    if len(startTimes) == 0:
+        return times.copy()
+    runs = np.maximum(np.searchsorted(startTimes, times, side='right') - 1, 0)
+    return times - startTimes[runs]
@@ -0,0 +1,155 @@
+###############################################################################
+# File name:      CpscRunLog.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Compact binary log for long (endurance) runs with millions of samples.
+# A run log is a directory (e.g. CLA2601_1234-1.cpscrun) with:
+# - header.json: the column names and types and the run settings (stage
+#   type, FREQ, RSS, TEMP, DF, MIR, MAR, ...)
+# - one file per column (<name>.bin) with fixed width little endian values
+#   (float64 'f8' or int32 'i4'), so a column can be read without parsing
+#
+# CpscRunLogWriter collects the rows in numpy chunks and appends a chunk to
+# the column files when it is full or flushInterval seconds have passed
+# (fsync every syncInterval seconds), so a crash loses at most the last
+# seconds. CpscRunLog opens a log with numpy.memmap: columns are available
+# at once, also for logs larger than memory, and can be indexed, sliced
+# and analysed directly. A log can be read while it is being written.
+#
+# ExportCsv() writes a log as ';' separated CSV when needed, e.g. for Excel.
+###############################################################################
+
+# 3rd party imports
+import os
+import json
+import time
+import threading
+import numpy as np
+
+headerFile = 'header.json'
+columnTypes = ('f8', 'i4')
+formatName = 'CpscRunLog'
+formatVersion = 1
+
+def ColumnFile(path, name):
+    return os.path.join(path, name + '.bin')
+
+class CpscRunLogWriter:
+
+    def __init__(self, path, columns, metadata=None, chunkSize=4096, flushInterval=1.0, syncInterval=10.0):
+        # columns: [(name, type), ...] with type 'f8' or 'i4'
+        for name, dtype in columns:
+            if dtype not in columnTypes:
+                raise ValueError(f'Column {name}: type {dtype} not supported, use one of {columnTypes}')
+        self.path = path
+        self.columns = [(name, np.dtype('<' + dtype)) for name, dtype in columns]
+        self.metadata = dict(metadata or {})
+        self.chunkSize = chunkSize
+        self.flushInterval = flushInterval # [s]
+        self.syncInterval = syncInterval   # [s]
+        self.lock = threading.RLock()
+        self.chunk = [np.zeros(chunkSize, dtype=dtype) for name, dtype in self.columns]
+        self.chunkCount = 0                # Rows in the chunk
+        self.rowCount = 0                  # Rows written to the column files
+        os.makedirs(path, exist_ok=True)
+        self.files = [open(ColumnFile(path, name), 'wb') for name, dtype in self.columns]
+        self.WriteHeader()
+        self.flushTime = self.syncTime = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        self.Close()
+
+    def WriteHeader(self):
+        header = {'format': formatName,
+                  'version': formatVersion,
+                  'columns': [[name, dtype.str[1:]] for name, dtype in self.columns],
+                  'metadata': self.metadata}
+        temporary = os.path.join(self.path, headerFile + '.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(header, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, os.path.join(self.path, headerFile)) # The header is complete or not changed at all
+
+    def SetMetadata(self, **metadata):
+        # Add run settings known after the start (e.g. MIR and MAR)
+        with self.lock:
+            self.metadata.update(metadata)
+            self.WriteHeader()
+
+    def Append(self, *row):
+        with self.lock:
+            for column, value in zip(self.chunk, row):
+                column[self.chunkCount] = value
+            self.chunkCount += 1
+            if self.chunkCount == self.chunkSize:
+                self.Flush()
+            elif time.monotonic() - self.flushTime >= self.flushInterval:
+                self.Flush()
+
+    def Flush(self, sync=False):
+        # Append the rows of the chunk to the column files
+        with self.lock:
+            if self.chunkCount:
+                for file, column in zip(self.files, self.chunk):
+                    file.write(column[:self.chunkCount].tobytes())
+                self.rowCount += self.chunkCount
+                self.chunkCount = 0
+            now = self.flushTime = time.monotonic()
+            sync = sync or now - self.syncTime >= self.syncInterval
+            for file in self.files:
+                file.flush()
+                if sync:
+                    os.fsync(file.fileno())
+            if sync:
+                self.syncTime = now
+
+    def Close(self):
+        with self.lock:
+            if self.files:
+                self.Flush(True)
+                for file in self.files:
+                    file.close()
+                self.files = []
+
+class CpscRunLog:
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, headerFile)) as file:
+            header = json.load(file)
+        if header.get('format') != formatName:
+            raise ValueError(f'{path} is not a {formatName}')
+        self.metadata = header['metadata']
+        self.names = [name for name, dtype in header['columns']]
+        sizes = [os.path.getsize(ColumnFile(path, name)) // np.dtype(dtype).itemsize for name, dtype in header['columns']]
+        self.rowCount = min(sizes) if sizes else 0 # Complete rows (a column may be ahead while writing)
+        self.columns = {}
+        for name, dtype in header['columns']:
+            if self.rowCount:
+                self.columns[name] = np.memmap(ColumnFile(path, name), dtype='<' + dtype, mode='r', shape=(self.rowCount,))
+            else:
+                self.columns[name] = np.zeros(0, dtype='<' + dtype)
+
+    def __len__(self):
+        return self.rowCount
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+def ExportCsv(path, csvPath=None, delimiter=';', blockSize=100000):
+    # Write the run log as CSV (header row with the column names); returns the CSV path
+    runLog = CpscRunLog(path)
+    csvPath = csvPath or os.path.splitext(path.rstrip('/\\'))[0] + '.csv'
+    formats = ['%d' if runLog[name].dtype.kind == 'i' else '%.9g' for name in runLog.names]
+    with open(csvPath, 'w', newline="") as file:
+        file.write(delimiter.join(runLog.names) + '\r\n')
+        for start in range(0, len(runLog), blockSize):
+            block = np.column_stack([runLog[name][start:start + blockSize] for name in runLog.names])
+            np.savetxt(file, block, fmt=formats, delimiter=delimiter, newline='\r\n')
+    return csvPath
@@ -0,0 +1,363 @@
+###############################################################################
+# File name:      CpscScheduler.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscScheduler owns the link to a CPSC and executes all commands of an
+# application from one worker thread: one-shot commands from button
+# handlers and recurring poll jobs (PGVA, FBST, CGVA, ...). This replaces a
+# separate poll thread per GUI that competes with the button threads.
+#
+# - Submit(txMessage) queues a one-shot command and returns a Future.
+#   WriteRead() and WriteReadMany() queue and wait for the result (at most
+#   'timeout' seconds, then CpscTimeoutError), so a scheduler can be used in
+#   place of a CpscSession in existing code. WriteReadMany() queues one job
+#   per command, so a STP waits for at most one command of the batch.
+# - AddPoll(txMessage, interval, callback) adds a poll job. txMessage may
+#   be a function returning the command (e.g. built from GUI settings),
+#   'enabled' a function telling whether the job should run now. With
+#   timestamps=True the callback gets a CpscSample (tick, send and receive
+#   time) instead of the response. An enabled() that raises counts as
+#   disabled (and as failed), so the worker thread keeps running.
+#
+# Polls run at a fixed rate on a grid of time.monotonic() deadlines (see
+# CpscPoller.py): the next poll is due one interval after the previous due
+# time, not one interval after the previous poll finished. Ticks missed by a
+# full interval (e.g. during a long command) are skipped, not caught up.
+# With AddPoll(..., adaptive=CpscAdaptiveRate(...)) the interval follows
+# the motion of the positioners: fast after a motion command (MOV, FBCS,
+# FBEN) sent through the scheduler and while the polled values change, slow
+# when they are settled (see CpscAdaptiveRate.py).
+#
+# The next job is chosen by priority: STOP (STP commands), COMMAND
+# (one-shot commands) and POLL. A poll that is overdue by one interval
+# competes at COMMAND level, so polls keep running (at a lower rate) while
+# commands are sent back to back. Jobs of equal priority run earliest
+# deadline first, commands without deadline in order of arrival. A
+# one-shot command that has not started before its deadline fails with
+# CpscTimeoutError; a poll tick that is skipped is counted.
+#
+# The link may be a CpscSession/CpscInterface or a function returning one,
+# e.g. lambda: CpscSession.GetSession(port, baudrate), so the GUI can
+# change the COM port while polling.
+#
+# Stats() returns the queue depth, wait times per priority, the number of
+# executed, failed and expired jobs and of skipped poll ticks.
+###############################################################################
+
+# 3rd party imports
+import time
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# JPE imports
+from CpscInterfaces.CpscAdaptiveRate import IsMotion
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+from CpscInterfaces.CpscMetrics import CpscLatencyHistogram
+from CpscInterfaces.CpscPoller import CpscSample, NextTick
+from CpscInterfaces.CpscPriorityLock import IsPriority
+
+PRIORITY_STOP = 0
+PRIORITY_COMMAND = 1
+PRIORITY_POLL = 2
+priorityNames = {PRIORITY_STOP: 'stop', PRIORITY_COMMAND: 'command', PRIORITY_POLL: 'poll'}
+
+class CpscJob:
+
+    def __init__(self, run, priority, readyTime, deadline=None):
+        self.run = run             # Function executed with the link as argument
+        self.priority = priority
+        self.readyTime = readyTime # Time the job could start (time.monotonic())
+        self.deadline = deadline
+        self.future = Future()
+
+    def Deadline(self):
+        return self.deadline if self.deadline is not None else float('inf') # No deadline: first in, first out
+
+class CpscPollJob:
+
+    def __init__(self, scheduler, txMessage, interval, callback, priority, enabled, errorCallback, txTermination, timestamps, adaptive):
+        self.scheduler = scheduler
+        self.txMessage = txMessage
+        self.interval = interval if adaptive is None else adaptive.interval
+        self.callback = callback
+        self.priority = priority
+        self.enabled = enabled
+        self.errorCallback = errorCallback
+        self.txTermination = txTermination
+        self.timestamps = timestamps      # Pass CpscSample instead of the response to the callback
+        self.adaptive = adaptive          # CpscAdaptiveRate or None (fixed interval)
+        self.readyTime = time.monotonic() # Next time the poll is due (tick grid)
+        self.active = True
+        self.tick = 0
+        self.skipped = 0
+        self.sample = None                # Last CpscSample, None after a failed poll
+
+    def Cancel(self):
+        self.scheduler.RemovePoll(self)
+
+    def SetInterval(self, interval):
+        with self.scheduler.condition:
+            self.interval = interval
+            self.readyTime = min(self.readyTime, time.monotonic() + interval)
+            self.scheduler.condition.notify()
+
+    def Deadline(self):
+        return self.readyTime + self.interval # The next poll is due then
+
+    def IsEnabled(self):
+        # A failing enabled() (e.g. a TclError of a Tk variable at shutdown) counts as disabled
+        if self.enabled is None:
+            return True
+        try:
+            return bool(self.enabled())
+        except Exception:
+            self.scheduler.failed += 1 # Called with the scheduler condition held
+            return False
+
+    def IsDue(self, now):
+        return self.active and self.readyTime <= now and self.IsEnabled()
+
+    def Skip(self, now):
+        # Move to the tick to poll now, returns the number of skipped ticks
+        self.readyTime, skipped = NextTick(self.readyTime, self.interval, now)
+        self.tick += skipped
+        self.skipped += skipped
+        return skipped
+
+    def run(self, link):
+        self.sample = None
+        txMessage = self.txMessage() if callable(self.txMessage) else self.txMessage
+        sendTime = time.monotonic()
+        response = link.WriteRead(txMessage, self.txTermination)
+        self.sample = CpscSample(self.tick, sendTime, time.monotonic(), response)
+        return self.sample
+
+class CpscScheduler:
+
+    def __init__(self, link, timeout=60.0):
+        self.link = link
+        self.timeout = timeout # [s] WriteRead()/WriteReadMany() wait at most this long for the result
+        self.condition = threading.Condition()
+        self.jobs = []    # One-shot jobs waiting to run
+        self.polls = []   # Poll jobs
+        self.running = False
+        self.worker = None
+        self.ClearStats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        pass # Scheduler keeps running, see Close()
+
+    def ClearStats(self):
+        with self.condition:
+            self.waitTimes = {name: CpscLatencyHistogram() for name in priorityNames.values()}
+            self.runTimes = CpscLatencyHistogram()
+            self.maxDepth = 0
+            self.executed = 0
+            self.failed = 0
+            self.expired = 0  # One-shot jobs that missed their deadline
+            self.skipped = 0  # Poll ticks skipped because the link was busy
+
+    def Link(self):
+        return self.link() if callable(self.link) else self.link
+
+    def Start(self):
+        with self.condition:
+            if not self.running:
+                self.running = True
+                self.worker = threading.Thread(target=self.WorkLoop, daemon=True)
+                self.worker.start()
+
+    def Close(self):
+        with self.condition:
+            self.running = False
+            jobs, self.jobs = self.jobs, []
+            self.polls = []
+            self.condition.notify()
+        for job in jobs:
+            if not job.future.cancelled():
+                job.future.set_exception(IOError('CpscScheduler is closed'))
+        if self.worker is not None and self.worker is not threading.current_thread():
+            self.worker.join()
+
+    # One-shot commands
+    def SubmitCall(self, run, priority=PRIORITY_COMMAND, deadline=None):
+        # Queue run(link), deadline in seconds from now; returns a Future
+        now = time.monotonic()
+        job = CpscJob(run, priority, now, now + deadline if deadline is not None else None)
+        self.Start()
+        with self.condition:
+            self.jobs.append(job)
+            self.maxDepth = max(self.maxDepth, len(self.jobs))
+            self.condition.notify()
+        return job.future
+
+    def Submit(self, txMessage, txTermination=0, priority=None, deadline=None):
+        if priority is None:
+            priority = PRIORITY_STOP if IsPriority(txMessage) else PRIORITY_COMMAND
+        if IsMotion(txMessage):
+            self.Boost()
+        return self.SubmitCall(lambda link: link.WriteRead(txMessage, txTermination), priority, deadline)
+
+    def WriteRead(self, txMessage, txTermination=0):
+        if threading.current_thread() is self.worker:
+            return self.Link().WriteRead(txMessage, txTermination) # Called from a poll callback
+        return self.Result(self.Submit(txMessage, txTermination))
+
+    def WriteReadMany(self, txMessages, txTermination=0, window=8):
+        # 'window' is only used when called from a poll callback
+        if threading.current_thread() is self.worker:
+            return self.Link().WriteReadMany(txMessages, txTermination, window)
+        if any(IsMotion(txMessage) for txMessage in txMessages):
+            self.Boost()
+        failed = threading.Event() # After a failed command the rest of the batch is not sent
+        def Job(txMessage):
+            def run(link):
+                if failed.is_set():
+                    raise IOError('Not sent, an earlier command of the batch failed')
+                try:
+                    return link.WriteRead(txMessage, txTermination)
+                except Exception:
+                    failed.set()
+                    raise
+            return run
+        futures = [self.SubmitCall(Job(txMessage), PRIORITY_STOP if IsPriority(txMessage) else PRIORITY_COMMAND) for txMessage in txMessages]
+        try:
+            return [self.Result(future) for future in futures]
+        finally:
+            for future in futures:
+                future.cancel() # E.g. after a Result() timeout
+
+    def Result(self, future):
+        # Wait for a queued command; a command that has not started yet is cancelled on timeout
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise CpscTimeoutError(f'No response from the scheduler within {self.timeout} [s]')
+
+    # Poll jobs
+    def AddPoll(self, txMessage, interval, callback, priority=PRIORITY_POLL, enabled=None, errorCallback=None, txTermination=1, timestamps=False, adaptive=None):
+        poll = CpscPollJob(self, txMessage, interval, callback, priority, enabled, errorCallback, txTermination, timestamps, adaptive)
+        self.Start()
+        with self.condition:
+            self.polls.append(poll)
+            self.condition.notify()
+        return poll
+
+    def RemovePoll(self, poll):
+        with self.condition:
+            poll.active = False
+            if poll in self.polls:
+                self.polls.remove(poll)
+
+    def Boost(self):
+        # A motion command is sent: adaptive polls switch to their fast interval
+        with self.condition:
+            for poll in self.polls:
+                if poll.adaptive is not None:
+                    poll.SetInterval(poll.adaptive.Boost())
+
+    # Worker
+    def Pick(self, now):
+        # Return the most urgent job (removed from the queue) or None
+        for job in [job for job in self.jobs if job.deadline is not None and job.deadline < now]:
+            self.jobs.remove(job)
+            self.expired += 1
+            if not job.future.cancelled():
+                job.future.set_exception(CpscTimeoutError('Command not started before its deadline'))
+        for job in [job for job in self.jobs if job.future.cancelled()]: # Caller stopped waiting (Result() timeout)
+            self.jobs.remove(job)
+        for poll in self.polls:
+            if poll.active and poll.readyTime <= now and not poll.IsEnabled():
+                poll.readyTime = now # Disabled: start a new tick grid when enabled again
+        candidates = self.jobs + [poll for poll in self.polls if poll.IsDue(now)]
+        if not candidates:
+            return None
+        def urgency(job):
+            priority = job.priority
+            if priority == PRIORITY_POLL and now >= job.Deadline():
+                priority = PRIORITY_COMMAND # Overdue poll
+            return (priority, job.Deadline())
+        job = min(candidates, key=urgency)
+        if isinstance(job, CpscJob):
+            self.jobs.remove(job)
+        return job
+
+    def NextDue(self, now):
+        # Polls that are due but not enabled are checked again after one interval
+        dueTimes = [poll.readyTime if poll.readyTime > now else now + poll.interval for poll in self.polls if poll.active]
+        return min(dueTimes) if dueTimes else None
+
+    def WorkLoop(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    return
+                now = time.monotonic()
+                try:
+                    job = self.Pick(now)
+                except Exception: # The worker must survive, otherwise every WriteRead() waits in vain
+                    self.failed += 1
+                    job = None
+                if job is None:
+                    nextDue = self.NextDue(now)
+                    self.condition.wait(None if nextDue is None else nextDue - now)
+                    continue
+                if isinstance(job, CpscPollJob):
+                    self.skipped += job.Skip(now)
+                self.waitTimes[priorityNames[job.priority]].Add(now - job.readyTime)
+            self.Execute(job, now)
+
+    def Execute(self, job, startTime):
+        if isinstance(job, CpscJob) and not job.future.set_running_or_notify_cancel():
+            return # Cancelled while waiting
+        try:
+            result = job.run(self.Link())
+        except Exception as ex:
+            self.CountFailed()
+            if isinstance(job, CpscJob):
+                job.future.set_exception(ex)
+            elif job.errorCallback is not None:
+                self.Callback(job.errorCallback, ex)
+        else:
+            if isinstance(job, CpscJob):
+                job.future.set_result(result)
+            else:
+                self.Callback(job.callback, result if job.timestamps else result.response)
+        finishTime = time.monotonic()
+        with self.condition:
+            self.executed += 1
+            self.runTimes.Add(finishTime - startTime)
+            if isinstance(job, CpscPollJob):
+                if job.adaptive is not None and job.sample is not None:
+                    job.interval = job.adaptive.Update(job.sample.response, finishTime)
+                job.readyTime += job.interval # Next tick, independent of the run time
+                job.tick += 1
+
+    def Callback(self, callback, value):
+        try:
+            callback(value)
+        except Exception:
+            self.CountFailed() # E.g. an unexpected response, the poll continues
+
+    def CountFailed(self):
+        with self.condition:
+            self.failed += 1
+
+    def Stats(self):
+        with self.condition:
+            now = time.monotonic()
+            return {'depth': len(self.jobs) + len([poll for poll in self.polls if poll.active and poll.readyTime <= now]),
+                    'maxDepth': self.maxDepth,
+                    'polls': len(self.polls),
+                    'executed': self.executed,
+                    'failed': self.failed,
+                    'expired': self.expired,
+                    'skipped': self.skipped,
+                    'wait': {name: histogram.Summary() for name, histogram in self.waitTimes.items()},
+                    'run': self.runTimes.Summary()}
@@ -1,7 +1,7 @@
 ###############################################################################
 # File name:      CpscSerialInterface.py
 # Creation:       2021-12-10 16:53:09
-# Updated:        2022-11-01
+# Updated:        2026-10-18
 # Author:         JPE, Robin Drossaert
 # Python version: 3.9
 #
@@ -17,10 +17,16 @@
 #
 # Since the CPSC always send a response following a command, only the
 # WriteRead() function should be used for normal communication.
+# WriteRead() is shared with CpscEthernetInterface, see CpscInterface.
 #
 # Added functionality: option to automatically add \r\n to a txMessage and
 # to remove \r\n from an rxMessage (txTermination argument)
 #
+# Received bytes are collected in a CpscFrameBuffer, so further responses
+# that arrive in the same read are kept for the next Read().
+# A port that is lost while sending or receiving (e.g. USB cable unplugged)
+# raises CpscConnectionLostError, like a closed Ethernet connection.
+#
 # Use the CpscSerialInterface in a 'with' 'as' construction to ensure
 # the port is always closed after running the program.
 ###############################################################################
@@ -28,9 +34,15 @@
 # 3rd party imports
 import serial
 
-class CpscSerialInterface:
+# JPE imports
+from CpscInterfaces.CpscErrors import CpscConnectionLostError
+from CpscInterfaces.CpscFraming import CpscFrameBuffer
+from CpscInterfaces.CpscInterface import CpscInterface
+
+class CpscSerialInterface(CpscInterface):
 
     def __init__(self,comPort,baudrate):
+        super().__init__()
         self.com = serial.Serial(port = comPort,
                                  baudrate = baudrate,
                                  bytesize = 8,
@@ -38,31 +50,34 @@ class CpscSerialInterface:
                                  stopbits = serial.STOPBITS_ONE,
                                  timeout = 10,
                                  xonxoff = False)
-        self.com.flushInput()
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self,exType,exValue,trcbck):
-        self.Close()
+        self.rxFrames = CpscFrameBuffer()
+        self.FlushInput()
+        self.Opened()
 
     def Close(self):
         self.com.close()
 
-    def Write(self,txMessage):
-        self.com.write(txMessage.encode('ascii')) # Sent message as ASCII string
+    def WriteMessage(self,txMessage):
+        try:
+            self.com.write(txMessage.encode('ascii')) # Sent message as ASCII string
+        except serial.SerialException as ex: # E.g. USB cable unplugged
+            raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
 
-    def Read(self):
-        rxMessage =  self.com.read_until(b'\r\n') # Read until termination characters
-        return rxMessage.decode() # Convert message to Python3 string
+    def FlushInput(self):
+        # Drop responses that have been received but not read
+        self.com.reset_input_buffer()
+        self.rxFrames.Clear()
 
-    def WriteRead(self, txMessage, txTermination):
-        if txTermination == 0:
-            self.Write(txMessage)
-            rxMessage = self.Read()
-            return rxMessage
-        else:
-            self.Write(txMessage + '\r\n')
-            rxMessage = self.Read()
-            rxMessageClean = rxMessage.replace('\r\n', '')
-            return rxMessageClean
+    def ReadMessage(self):
+        # Read until termination characters or nothing received within the timeout
+        while True:
+            rxMessage = self.rxFrames.NextFrame()
+            if rxMessage is not None:
+                return rxMessage
+            try:
+                received = self.com.readinto(self.rxFrames.WriteView(max(1, self.com.in_waiting)))
+            except serial.SerialException as ex:
+                raise CpscConnectionLostError(f'Connection to CPSC lost: {ex}') from ex
+            if not received:
+                return self.rxFrames.Flush() # Timeout, return the incomplete message
+            self.rxFrames.Commit(received)
@@ -0,0 +1,201 @@
+###############################################################################
+# File name:      CpscSession.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscSession keeps one CPSC interface open for the lifetime of an
+# application instead of opening and closing the COM port for every command.
+#
+# Use GetSession() to obtain the shared session for a port. All handlers and
+# poll threads calling GetSession() with the same port name get the same
+# session object, so the port is only opened once. The port may be a COM
+# port number, a device name (/dev/ttyUSB0) or a URL (tcp://10.0.0.5), see
+# CpscFactory.PortUrl().
+#
+# The session is opened on first use; if opening the port fails it is tried
+# once more. If the connection is lost (CpscConnectionLostError) while a
+# query (IsQuery(), e.g. /VER, PGVA, MIR) is sent, the port is opened again
+# and the query is sent once more. Other commands (MOV, CSZ, MSS, ...) are
+# never sent twice, and timeouts (CpscTimeoutError) are not retried: the
+# command may have been executed, only its response is late. These errors
+# are raised to the caller. The session counts the responses of timed out
+# commands (also those in flight in WriteReadMany()) and drops them when
+# they arrive, so the next command still gets its own response.
+#
+# WriteReadMany() sends a list of commands with up to 'window' commands
+# outstanding and returns the responses in the same order, so a sweep like
+# 'FIV 1' .. 'FIV 6' takes little more than one round trip.
+#
+# STP commands take the priority lane of the session lock: they are written
+# as soon as the command in flight has been answered, ahead of any waiting
+# poll commands. A running WriteReadMany() stops sending and lets the STP
+# go first once its outstanding responses are in. See CpscPriorityLock for
+# the stop-latency bound.
+#
+# A session can be used in a 'with' 'as' construction just like the
+# interfaces, but leaving the 'with' block does NOT close the port. Call
+# Close() or CloseAll() when the application exits.
+###############################################################################
+
+# 3rd party imports
+import threading
+
+# JPE imports
+from CpscInterfaces import CpscFactory
+from CpscInterfaces import CpscMetrics
+from CpscInterfaces.CpscErrors import CpscTimeoutError, CpscConnectionLostError
+from CpscInterfaces.CpscPriorityLock import CpscPriorityLock, IsPriority
+
+# Commands that only read values: sending them twice has no effect on the CPSC
+queryCommands = ('/VER', '/GBR', '/IPR', '/STAGES', 'FIV', 'GFS', 'PGVA', 'CGVA', 'FBST', 'MIR', 'MAR', 'MLS', 'DGV', 'CGV')
+
+def IsQuery(txMessage):
+    return CpscMetrics.Mnemonic(txMessage) in queryCommands
+
+class CpscSession:
+
+    def __init__(self,url):
+        self.url = url
+        self.interface = None
+        self.late = 0 # Responses of timed out commands that are still to come
+        self.lock = CpscPriorityLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,exType,exValue,trcbck):
+        pass # Session stays open, see Close()
+
+    def Open(self):
+        with self.lock:
+            if self.interface is None:
+                self.interface = CpscFactory.OpenCpsc(self.url)
+                self.late = 0
+
+    def Close(self):
+        with self.lock:
+            if self.interface is not None:
+                try:
+                    self.interface.Close()
+                except IOError:
+                    pass
+                self.interface = None
+
+    def Reconnect(self):
+        with self.lock:
+            if CpscMetrics.metrics is not None:
+                CpscMetrics.metrics.Reconnected()
+            self.Close()
+            self.Open()
+
+    def Write(self,txMessage):
+        with self.lock:
+            self.Open()
+            self.interface.Write(txMessage)
+
+    def Read(self):
+        # Read the next response, after dropping the late responses of timed out commands
+        with self.lock:
+            self.Open()
+            while True:
+                try:
+                    rxMessage = self.interface.Read()
+                except CpscTimeoutError:
+                    self.late += 1 # The response may still come
+                    raise
+                if not rxMessage.endswith('\r\n'):
+                    self.late += 1 # Serial timeout: the rest of the response may still come
+                    return rxMessage
+                if self.late == 0:
+                    return rxMessage
+                self.late -= 1
+
+    def WriteRead(self, txMessage, txTermination, priority=None):
+        if priority is None:
+            priority = IsPriority(txMessage)
+        with self.lock.Hold(priority):
+            self.OpenRetry()
+            try:
+                return self._WriteRead(txMessage, txTermination)
+            except CpscConnectionLostError:
+                if not IsQuery(txMessage):
+                    self.Close() # Opened again by the next command
+                    raise
+                self.Reconnect() # Raises IOError if the port cannot be opened again
+                return self._WriteRead(txMessage, txTermination)
+
+    def OpenRetry(self):
+        # Nothing has been sent yet, so opening the port may be tried once more
+        try:
+            self.Open()
+        except IOError:
+            self.Reconnect() # Raises IOError if the port cannot be opened again
+
+    def _WriteRead(self, txMessage, txTermination):
+        self.Open()
+        if txTermination == 0:
+            self.Write(txMessage)
+            return self.Read()
+        else:
+            self.Write(txMessage + '\r\n')
+            return self.Read().replace('\r\n', '')
+
+    def WriteReadMany(self, txMessages, txTermination, window=8):
+        with self.lock:
+            self.OpenRetry()
+            try:
+                return self._WriteReadMany(txMessages, txTermination, window)
+            except CpscConnectionLostError:
+                if not all(IsQuery(txMessage) for txMessage in txMessages):
+                    self.Close() # Opened again by the next command
+                    raise
+                self.Reconnect() # Raises IOError if the port cannot be opened again
+                return self._WriteReadMany(txMessages, txTermination, window)
+
+    def _WriteReadMany(self, txMessages, txTermination, window):
+        self.Open()
+        rxMessages = []
+        sent = 0
+        while len(rxMessages) < len(txMessages):
+            if sent == len(rxMessages) and self.lock.PriorityWaiting():
+                self.lock.Yield() # Nothing in flight, let a waiting STP go first
+            # Keep up to 'window' commands outstanding, responses come back in order
+            while sent < len(txMessages) and sent - len(rxMessages) < window and not self.lock.PriorityWaiting():
+                self.Write(txMessages[sent] + ('\r\n' if txTermination else ''))
+                sent += 1
+            if sent == len(rxMessages):
+                continue # Sending stopped for a waiting STP
+            try:
+                rxMessage = self.Read()
+            except CpscTimeoutError:
+                self.late += sent - len(rxMessages) - 1 # The responses of the other commands in flight are late too
+                raise
+            if not rxMessage.endswith('\r\n'):
+                self.late += sent - len(rxMessages) - 1
+                raise CpscTimeoutError('No response from CPSC to: ' + txMessages[len(rxMessages)])
+            rxMessages.append(rxMessage.replace('\r\n', '') if txTermination else rxMessage)
+        return rxMessages
+
+# Shared sessions, one per port (URL without options)
+sessions = {}
+sessionsLock = threading.Lock()
+
+def GetSession(port, baudrate=CpscFactory.defaultBaudrate):
+    url = CpscFactory.PortUrl(port, baudrate)
+    portKey = url.split('?')[0]
+    with sessionsLock:
+        session = sessions.get(portKey)
+        if session is not None and session.url != url:
+            session.Close() # Baudrate changed in the GUI, start a new session
+            session = None
+        if session is None:
+            session = CpscSession(url)
+            sessions[portKey] = session
+        return session
+
+def CloseAll():
+    with sessionsLock:
+        for session in sessions.values():
+            session.Close()
+        sessions.clear()
@@ -0,0 +1,372 @@
+###############################################################################
+# File name:      CpscSimulator.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# CpscSimulator emulates a CPSC1 with drive (CADM2), position feedback
+# (RSM with RLS sensors, OEM2 with COE encoders) and servo drive support,
+# so the demo scripts and benchmarks can run without hardware.
+#
+# Supported commands (the ones used by the demo scripts):
+# - /VER, FIV, /STAGES, GFS, SCM, /GBR, /SBR, /IPR, /IPS
+# - MOV, STP
+# - PGVA, MIR, MAR, MIS, MAS, MMR, RSS      (RSM)
+# - CGVA, CGV, DGV, CSZ, MLS, DSG, DSL, DSH, MSS (OEM2/COE)
+# - FBEN, FBCS, FBST, FBXT, FBES            (servo drive)
+#
+# Motion: every CADM address (1..6) drives one simulated stage. A MOV
+# starts moving at frequency * step size * RSS [%] * drive factor, where
+# the step size depends on the stage type and decreases with temperature.
+# With STEPS=0 the stage moves until STP or the end of its stroke. Feedback
+# channel N (PGVA/CGVA/FBST) measures the stage on CADM address N.
+# Positions are integrated when they are queried, using time.monotonic().
+#
+# Serving: ServeTcp() listens on TCP port 2000 like the CPSC1 Ethernet
+# interface, ServePty() creates a pseudo terminal (Linux/macOS) that can be
+# opened as a serial port. Every response is delayed by 'latency' seconds
+# plus a random 0..'jitter' seconds; ServePty() can also add the transfer
+# time of the bytes at a given baudrate.
+###############################################################################
+
+# 3rd party imports
+import os
+import math
+import time
+import random
+import socket
+import threading
+import socketserver
+
+# Stage types: (min position [m], max position [m], step size at 293 K [m])
+stageTypes = {
+    'CLA2201':     (-0.0025, 0.0025, 500e-9),
+    'CLA2201-COE': (-0.0025, 0.0025, 500e-9),
+    'CS021-RLS.X': (-0.003, 0.003, 500e-9),
+    'CS021-RLS.Y': (-0.003, 0.003, 500e-9),
+    'CS021-RLS.Z': (-0.003, 0.003, 300e-9),
+    'CBS5-RLS':    (-0.0025, 0.0025, 400e-9),
+}
+defaultStage = 'CS021-RLS.X'
+defaultModules = ['CADM2', 'CADM2', 'CADM2', 'RSM', 'OEM2', '-'] # Slot 1..6
+coeCountSize = 1e-6   # [m] COE encoder count
+servoTolerance = 50e-9 # [m] servo drive finished when all errors are smaller
+
+class CpscSimulatedStage:
+
+    def __init__(self, stageType=defaultStage):
+        self.SetType(stageType)
+        self.position = 0.0
+        self.velocity = 0.0
+        self.stopTime = None     # End of a MOV with a number of steps
+        self.setpoint = None     # Servo drive setpoint
+        self.servoSpeed = 0.0
+        self.lastTime = time.monotonic()
+        self.mir = self.minPos   # Stored RLS limits
+        self.mar = self.maxPos
+        self.coeZero = 0.0       # Position of COE count 0 (CSZ)
+
+    def SetType(self, stageType):
+        if stageType in stageTypes:
+            self.stageType = stageType
+            self.minPos, self.maxPos, self.stepSize = stageTypes[stageType]
+
+    def StepSize(self, temperature):
+        # Piezo steps get smaller when cooling down (10% of the 293 K step at 0 K)
+        return self.stepSize * (0.1 + 0.9 * min(max(temperature, 0.0), 293.0) / 293.0)
+
+    def Update(self, now):
+        dt = now - self.lastTime
+        self.lastTime = now
+        if self.setpoint is not None:
+            error = self.setpoint - self.position
+            self.position += math.copysign(min(abs(error), self.servoSpeed * dt), error)
+        elif self.velocity != 0.0:
+            if self.stopTime is not None and now >= self.stopTime:
+                dt -= now - self.stopTime
+                self.position += self.velocity * max(dt, 0.0)
+                self.velocity = 0.0
+            else:
+                self.position += self.velocity * dt
+        if not self.minPos <= self.position <= self.maxPos:
+            self.position = min(max(self.position, self.minPos), self.maxPos) # End stop
+            self.velocity = 0.0
+
+    def Move(self, now, velocity, duration=None):
+        self.Update(now)
+        self.velocity = velocity
+        self.stopTime = now + duration if duration is not None else None
+
+    def Stop(self, now):
+        self.Update(now)
+        self.velocity = 0.0
+        self.stopTime = None
+
+class CpscSimulator:
+
+    def __init__(self, latency=0.0, jitter=0.0, modules=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.modules = modules or list(defaultModules)
+        self.lock = threading.Lock()
+        self.stages = {address: CpscSimulatedStage() for address in range(1, 7)}
+        self.oemCalibration = {channel: [10, 3000, 1000] for channel in range(1, 4)} # Gain, upper, lower threshold
+        self.servoEnabled = False
+        self.servoInvalid = [0, 0, 0]
+        self.baudrates = {'USB': '115200', 'RS422': '115200'}
+        self.ipSettings = ['dhcp', '192.168.1.100', '255.255.255.0', '192.168.1.1', '00:50:C2:00:00:01']
+        self.commandCount = 0
+        self.commands = {
+            '/VER': self.CmdVer, 'FIV': self.CmdFiv, '/STAGES': self.CmdStages,
+            'GFS': self.CmdGfs, 'SCM': self.CmdScm, '/GBR': self.CmdGbr,
+            '/SBR': self.CmdSbr, '/IPR': self.CmdIpr, '/IPS': self.CmdIps,
+            'MOV': self.CmdMov, 'STP': self.CmdStp,
+            'PGVA': self.CmdPgva, 'MIR': self.CmdMir, 'MAR': self.CmdMar,
+            'MIS': self.CmdMis, 'MAS': self.CmdMas, 'MMR': self.CmdMmr, 'RSS': self.CmdOk,
+            'CGVA': self.CmdCgva, 'CGV': self.CmdCgv, 'DGV': self.CmdDgv, 'CSZ': self.CmdCsz,
+            'MLS': self.CmdMls, 'DSG': self.CmdDsg, 'DSL': self.CmdDsl, 'DSH': self.CmdDsh, 'MSS': self.CmdOk,
+            'FBEN': self.CmdFben, 'FBCS': self.CmdFbcs, 'FBST': self.CmdFbst,
+            'FBXT': self.CmdFbxt, 'FBES': self.CmdFbes,
+        }
+
+    def Execute(self, command):
+        # Execute one command (without \r\n) and return the response (without \r\n)
+        args = command.split()
+        if not args:
+            return 'Error: empty command'
+        handler = self.commands.get(args[0].upper())
+        if handler is None:
+            return 'Error: unknown command ' + args[0]
+        with self.lock:
+            self.commandCount += 1
+            now = time.monotonic()
+            for stage in self.stages.values():
+                stage.Update(now)
+            try:
+                return handler(now, args[1:])
+            except (IndexError, KeyError, ValueError):
+                return 'Error: invalid parameter(s) for ' + args[0]
+
+    def Delay(self):
+        # Response time of the simulated controller
+        delay = self.latency + (random.uniform(0.0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def Stage(self, address):
+        return self.stages[int(address)]
+
+    def Position(self, channel):
+        return f'{self.stages[int(channel)].position:.9f}'
+
+    # General commands
+    def CmdVer(self, now, args):
+        return 'CPSC1 simulator v0.1'
+
+    def CmdFiv(self, now, args):
+        module = self.modules[int(args[0]) - 1]
+        return module + ' v1.0.0 (simulated)' if module != '-' else 'No module'
+
+    def CmdStages(self, now, args):
+        return ','.join(stageTypes)
+
+    def CmdOk(self, now, args):
+        return 'OK'
+
+    def CmdGfs(self, now, args):
+        return '0'
+
+    def CmdScm(self, now, args):
+        return 'Piezo OK' if self.modules[int(args[0]) - 1] == 'CADM2' else 'No CADM2 module'
+
+    def CmdGbr(self, now, args):
+        return self.baudrates[args[0].upper()]
+
+    def CmdSbr(self, now, args):
+        self.baudrates[args[0].upper()] = str(int(args[1]))
+        return 'OK'
+
+    def CmdIpr(self, now, args):
+        return ','.join(self.ipSettings)
+
+    def CmdIps(self, now, args):
+        self.ipSettings[:4] = [args[0].lower()] + args[1:4]
+        return 'OK'
+
+    # Drive commands (CADM2)
+    def CmdMov(self, now, args):
+        # MOV ADDR DIR FREQ RSS STEPS TEMP STAGE DF
+        address, direction, frequency, rss, steps, temperature = int(args[0]), int(args[1]), float(args[2]), float(args[3]), int(args[4]), float(args[5])
+        driveFactor = float(args[7]) if len(args) > 7 else 1.0
+        stage = self.Stage(address)
+        if stage.setpoint is not None:
+            return 'Error: servo drive active'
+        stage.SetType(args[6])
+        speed = frequency * stage.StepSize(temperature) * rss / 100 * driveFactor
+        stage.Move(now, speed if direction == 1 else -speed, steps / frequency if steps > 0 else None)
+        return 'OK'
+
+    def CmdStp(self, now, args):
+        self.Stage(args[0]).Stop(now)
+        return 'OK'
+
+    # RSM commands (RLS position feedback)
+    def CmdPgva(self, now, args):
+        return ','.join(self.Position(channel) for channel in (1, 2, 3))
+
+    def CmdMir(self, now, args):
+        return f'{self.Stage(args[1]).mir:.9f}'
+
+    def CmdMar(self, now, args):
+        return f'{self.Stage(args[1]).mar:.9f}'
+
+    def CmdMis(self, now, args):
+        stage = self.Stage(args[1])
+        stage.mir = stage.position
+        return 'OK'
+
+    def CmdMas(self, now, args):
+        stage = self.Stage(args[1])
+        stage.mar = stage.position
+        return 'OK'
+
+    def CmdMmr(self, now, args):
+        stage = self.Stage(args[1])
+        stage.mir, stage.mar = stage.minPos, stage.maxPos
+        return 'OK'
+
+    # OEM2 commands (COE position feedback)
+    def Counts(self, channel):
+        stage = self.stages[int(channel)]
+        return math.floor((stage.position - stage.coeZero) / coeCountSize)
+
+    def CmdCgva(self, now, args):
+        return ','.join(str(self.Counts(channel)) for channel in (1, 2, 3))
+
+    def CmdCgv(self, now, args):
+        return str(self.Counts(args[1]))
+
+    def CmdDgv(self, now, args):
+        # Raw detector value, one period per count
+        stage = self.Stage(args[1])
+        gain, upper, lower = self.oemCalibration[int(args[1])]
+        return str(int((upper + lower) / 2 + 0.6 * (upper - lower) * math.cos(2 * math.pi * stage.position / coeCountSize)))
+
+    def CmdCsz(self, now, args):
+        stage = self.Stage(args[1])
+        stage.coeZero = stage.position
+        return 'OK'
+
+    def CmdMls(self, now, args):
+        return ','.join(str(value) for value in self.oemCalibration[int(args[1])])
+
+    def CmdDsg(self, now, args):
+        self.oemCalibration[int(args[1])][0] = int(args[2])
+        return 'OK'
+
+    def CmdDsh(self, now, args):
+        self.oemCalibration[int(args[1])][1] = int(args[2])
+        return 'OK'
+
+    def CmdDsl(self, now, args):
+        self.oemCalibration[int(args[1])][2] = int(args[2])
+        return 'OK'
+
+    # Servo drive commands
+    def CmdFben(self, now, args):
+        # FBEN STAGE1 FREQ1 STAGE2 FREQ2 STAGE3 FREQ3 DF TEMP
+        driveFactor, temperature = float(args[6]), float(args[7])
+        for channel in (1, 2, 3):
+            stage = self.stages[channel]
+            stageType, frequency = args[2 * channel - 2], float(args[2 * channel - 1])
+            stage.SetType(stageType)
+            stage.Stop(now)
+            stage.setpoint = stage.position # Hold the current position
+            stage.servoSpeed = frequency * stage.StepSize(temperature) * driveFactor
+        self.servoEnabled = True
+        self.servoInvalid = [0, 0, 0]
+        return 'OK'
+
+    def CmdFbcs(self, now, args):
+        # FBCS SP1 ABS1 SP2 ABS2 SP3 ABS3
+        if not self.servoEnabled:
+            return 'Error: servo drive not enabled'
+        for channel in (1, 2, 3):
+            stage = self.stages[channel]
+            setpoint = float(args[2 * channel - 2])
+            if args[2 * channel - 1] not in ('1', 'True', 'true'):
+                setpoint += stage.position # Relative setpoint
+            valid = stage.minPos <= setpoint <= stage.maxPos
+            self.servoInvalid[channel - 1] = 0 if valid else 1
+            if valid:
+                stage.setpoint = setpoint
+        return 'OK'
+
+    def CmdFbst(self, now, args):
+        # ENABLED,FINISHED,INVALID1..3,ERROR1..3
+        if not self.servoEnabled:
+            return '0,0,0,0,0,0.000000000,0.000000000,0.000000000'
+        errors = [self.stages[channel].setpoint - self.stages[channel].position for channel in (1, 2, 3)]
+        finished = all(abs(error) < servoTolerance for error in errors)
+        return ','.join(['1', '1' if finished else '0'] + [str(flag) for flag in self.servoInvalid] + [f'{error:.9f}' for error in errors])
+
+    def CmdFbxt(self, now, args):
+        for channel in (1, 2, 3):
+            self.stages[channel].setpoint = None
+        self.servoEnabled = False
+        return 'OK'
+
+    def CmdFbes(self, now, args):
+        self.CmdFbxt(now, args)
+        for stage in self.stages.values():
+            stage.Stop(now)
+        return 'OK'
+
+def ServeStream(simulator, readData, writeData):
+    # Answer \r\n terminated commands read with readData() until it returns b''
+    pending = b''
+    while True:
+        data = readData()
+        if not data:
+            return
+        pending += data
+        while b'\r\n' in pending:
+            line, pending = pending.split(b'\r\n', 1)
+            response = simulator.Execute(line.decode('ascii', 'replace'))
+            simulator.Delay()
+            writeData((response + '\r\n').encode('ascii'))
+
+class CpscTcpHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            ServeStream(self.server.simulator, lambda: self.request.recv(4096), self.request.sendall)
+        except OSError:
+            pass # Client disconnected
+
+def ServeTcp(simulator, host='127.0.0.1', tcpPort=2000):
+    # Serve the simulator on a TCP port in a background thread, returns the server
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    server = socketserver.ThreadingTCPServer((host, tcpPort), CpscTcpHandler)
+    server.daemon_threads = True
+    server.simulator = simulator
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def ServePty(simulator, baudrate=None):
+    # Serve the simulator on a pseudo terminal, returns the device name to open (e.g. /dev/pts/3)
+    import tty # Not available on Windows
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    def writeData(data):
+        if baudrate:
+            time.sleep(len(data) * 10 / baudrate) # 8N1: 10 bits per byte
+        os.write(master, data)
+    def readData():
+        try:
+            return os.read(master, 4096)
+        except OSError:
+            return b'' # Pseudo terminal closed
+    threading.Thread(target=ServeStream, args=(simulator, readData, writeData), daemon=True).start()
+    return os.ttyname(slave)
@@ -0,0 +1,129 @@
+###############################################################################
+# File name:      CpscStartup.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Fast startup of the GUIs: the window is shown and usable before the heavy
+# modules are loaded and before the hardware is contacted.
+# - LazyImport('CpscInterfaces.CpscRunLog') returns a module proxy; the
+#   module (and numpy, matplotlib, sqlite3, csv, ... that it imports) is
+#   loaded on the first attribute access, e.g. CpscRunLog.CpscRunLog(...) at
+#   the end of a sequence run. Thread safe; load times are kept in loadTimes.
+# - CpscStartupTimer marks the startup phases: 'imports', 'widgets' (all
+#   widgets created), 'mapped' (window shown) and 'interactive' (the main
+#   loop is idle with the window shown, i.e. it handles input). Afterwards
+#   the deferred startup tasks run, one per main loop iteration so input is
+#   handled in between: Defer(name, function) in the main loop (e.g. create
+#   the live plot), DeferThread(name, function) in a background thread (e.g.
+#   probe the hardware). Each task gets a mark when it is done.
+#
+# Times are in seconds since the timer was created, or since the launch of
+# the process when the environment variable CPSC_STARTUP_BENCHMARK holds the
+# launch time (time.time()). In that case the marks are printed as one JSON
+# line ('CPSC_STARTUP {...}') and the window is closed when the deferred
+# main loop tasks are done, see CPSC1_Startup-Benchmark.
+###############################################################################
+
+# 3rd party imports
+import os
+import sys
+import json
+import time
+import threading
+import importlib
+import collections
+
+loadTimes = {} # Module name: time [s] to load a lazy module
+
+class CpscLazyModule:
+
+    def __init__(self, moduleName):
+        self.moduleName = moduleName
+        self.module = None
+        self.lock = threading.Lock()
+
+    def __getattr__(self, attribute):
+        # Only called for attributes of the module (not of the proxy)
+        if self.module is None:
+            with self.lock:
+                if self.module is None:
+                    startTime = time.perf_counter()
+                    module = importlib.import_module(self.moduleName)
+                    loadTimes[self.moduleName] = time.perf_counter() - startTime
+                    self.module = module
+        return getattr(self.module, attribute)
+
+    def __repr__(self):
+        return f'<lazy module {self.moduleName} ({"loaded" if self.module is not None else "not loaded"})>'
+
+def LazyImport(moduleName):
+    # The module itself if it is loaded already
+    if moduleName in sys.modules:
+        return sys.modules[moduleName]
+    return CpscLazyModule(moduleName)
+
+class CpscStartupTimer:
+
+    def __init__(self):
+        launchTime = os.environ.get('CPSC_STARTUP_BENCHMARK')
+        self.benchmark = bool(launchTime)
+        self.origin = float(launchTime) if launchTime else time.time()
+        self.marks = {}                  # Phase or task: time [s] since origin
+        self.tasks = collections.deque() # (name, function, inThread)
+        self.window = None
+        self.mapped = False
+
+    def Mark(self, phase):
+        self.marks[phase] = time.time() - self.origin
+
+    def Defer(self, name, function):
+        self.tasks.append((name, function, False))
+
+    def DeferThread(self, name, function):
+        self.tasks.append((name, function, True))
+
+    def Start(self, window):
+        # Call when all widgets are created, just before window.mainloop()
+        self.window = window
+        self.Mark('widgets')
+        window.bind('<Map>', self.OnMap, add='+')
+
+    def OnMap(self, event):
+        if event.widget is self.window and not self.mapped:
+            self.mapped = True
+            self.Mark('mapped')
+            self.window.after_idle(self.OnInteractive) # After the pending redraws of the widgets
+
+    def OnInteractive(self):
+        self.Mark('interactive')
+        self.window.after(1, self.RunNext)
+
+    def RunNext(self):
+        if not self.tasks:
+            self.Finish()
+            return
+        name, function, inThread = self.tasks.popleft()
+        if inThread:
+            threading.Thread(target=self.RunTask, args=(name, function), daemon=True).start()
+        else:
+            self.RunTask(name, function)
+        self.window.after(1, self.RunNext)
+
+    def RunTask(self, name, function):
+        try:
+            function()
+        finally:
+            self.Mark(name)
+
+    def Finish(self):
+        self.Mark('deferred')
+        if self.benchmark:
+            print('CPSC_STARTUP ' + json.dumps(self.Report()), flush=True)
+            self.window.destroy()
+
+    def Report(self):
+        return {'marks': dict(self.marks), 'loads': dict(loadTimes)}
+
+    def Text(self):
+        return ' | '.join(f'{phase} {1000 * elapsed:.0f}' for phase, elapsed in self.marks.items()) + ' [ms]'
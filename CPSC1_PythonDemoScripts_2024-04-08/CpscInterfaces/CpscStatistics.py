@@ -0,0 +1,174 @@
+###############################################################################
+# File name:      CpscStatistics.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Running statistics, updated per value in constant time and memory, so the
+# state of a sequence run is known while it executes (and not only from the
+# summary at the end of a run of hours):
+# - CpscRunningStats: count, mean and variance (Welford's algorithm, no loss
+#   of precision for long runs), min, max and streaming percentiles
+# - CpscP2Quantile: streaming estimate of one percentile with the P2
+#   algorithm (Jain & Chlamtac), 5 markers instead of all values
+# - CpscSequenceStats: per direction (DIR=1 towards Pos B, DIR=0 towards
+#   Pos A) the leg time, the leg speed and the positions of a sequence run;
+#   the speed of a leg is the distance / time between its first and last
+#   RLS sample (as meanSpeed in CpscAnalysis)
+###############################################################################
+
+# Standard library imports
+import math
+
+class CpscP2Quantile:
+
+    def __init__(self, p):
+        self.p = p                   # Percentile as fraction, e.g. 0.95
+        self.heights = []            # Marker heights (the first 5 values until there are 5)
+        self.positions = [0, 1, 2, 3, 4]
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def Add(self, value):
+        heights = self.heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            k = 3
+        else:
+            k = 0
+            while value >= heights[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        # Move the middle markers towards their desired positions
+        positions = self.positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = heights[i] + d / (positions[i + 1] - positions[i - 1]) * (
+                         (positions[i] - positions[i - 1] + d) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i]) +
+                         (positions[i + 1] - positions[i] - d) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+                if not heights[i - 1] < height < heights[i + 1]: # Parabolic estimate out of order: linear
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def Value(self):
+        heights = self.heights
+        if not heights:
+            return math.nan
+        if self.positions[4] == 4: # At most 5 values: exact (linear interpolation)
+            index = self.p * (len(heights) - 1)
+            low = int(index)
+            high = min(low + 1, len(heights) - 1)
+            return heights[low] + (index - low) * (heights[high] - heights[low])
+        return heights[2]
+
+class CpscRunningStats:
+
+    def __init__(self, percentiles=(0.05, 0.5, 0.95)):
+        self.percentiles = percentiles
+        self.Clear()
+
+    def Clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0                # Sum of squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+        self.quantiles = [CpscP2Quantile(p) for p in self.percentiles]
+
+    def Add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        for quantile in self.quantiles:
+            quantile.Add(value)
+
+    def Mean(self):
+        return self.mean if self.count else math.nan
+
+    def Variance(self):
+        # Sample variance
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    def Std(self):
+        return math.sqrt(self.Variance())
+
+    def Percentile(self, p):
+        for quantile in self.quantiles:
+            if quantile.p == p:
+                return quantile.Value()
+        raise ValueError(f'Percentile {p} not tracked, use one of {self.percentiles}')
+
+    def Summary(self):
+        summary = {'count': self.count, 'mean': self.Mean(), 'std': self.Std(),
+                   'min': self.min if self.count else math.nan, 'max': self.max if self.count else math.nan}
+        for quantile in self.quantiles:
+            summary[f'p{100 * quantile.p:g}'] = quantile.Value()
+        return summary
+
+class CpscSequenceStats:
+
+    def __init__(self, minLegs=3):
+        self.minLegs = minLegs       # Legs per direction before a deviation is computed
+        self.legTime = {0: CpscRunningStats(), 1: CpscRunningStats()}   # [s]
+        self.speed = {0: CpscRunningStats(), 1: CpscRunningStats()}     # [m/s]
+        self.position = {0: CpscRunningStats(()), 1: CpscRunningStats(())} # [m]
+        self.direction = None
+        self.first = None            # (time, position) of the first sample of the leg
+        self.last = None
+        self.deviation = math.nan    # Relative deviation of the last leg speed from the median of the earlier legs (NaN: unknown)
+
+    def StartLeg(self, direction):
+        self.direction = direction
+        self.first = self.last = None
+
+    def AddSample(self, time, position):
+        if self.first is None:
+            self.first = (time, position)
+        self.last = (time, position)
+        self.position[self.direction].Add(position)
+
+    def EndLeg(self, legTime):
+        # Add the leg to the statistics; returns the leg speed (NaN without 2 samples)
+        speed = math.nan
+        if self.first is not None and self.last[0] > self.first[0]:
+            speed = abs(self.last[1] - self.first[1]) / (self.last[0] - self.first[0])
+        speeds = self.speed[self.direction]
+        self.deviation = math.nan
+        if speeds.count >= self.minLegs:
+            median = speeds.Percentile(0.5)
+            if median > 0 and not math.isnan(speed):
+                self.deviation = abs(speed - median) / median # NaN when the leg speed is unknown (less than 2 samples)
+        self.legTime[self.direction].Add(legTime)
+        if not math.isnan(speed):
+            speeds.Add(speed)
+        return speed
+
+    def Summary(self):
+        # JSON compatible summary, e.g. for the run log header
+        return {name: {str(direction): stats[direction].Summary() for direction in (0, 1)}
+                for name, stats in (('legTime', self.legTime), ('speed', self.speed), ('position', self.position))}
+
+    def Text(self, direction):
+        legTime = self.legTime[direction]
+        speed = self.speed[direction]
+        position = self.position[direction].Summary()
+        return (f'{"A->B" if direction else "B->A"} [{legTime.count} legs] time {legTime.Mean():.2f}+-{legTime.Std():.2f}[s] '
+                f'speed {1000 * speed.Mean():.3f}+-{1000 * speed.Std():.3f} median {1000 * speed.Percentile(0.5):.3f} '
+                f'p5..p95 {1000 * speed.Percentile(0.05):.3f}..{1000 * speed.Percentile(0.95):.3f}[mm/s] '
+                f'position {position["min"]:.9f}..{position["max"]:.9f}[m]')
@@ -0,0 +1,128 @@
+###############################################################################
+# File name:      CpscUiDispatcher.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Thread safe, batched updates of Tk widgets. Tk may only be used from the
+# thread running mainloop(), but the handler threads, the scheduler and the
+# publisher callbacks update the command history and the position labels.
+#
+# - Post(function, *args, key=...) queues a call from any thread (a deque,
+#   no lock). Calls with the same key are coalesced: only the last one
+#   posted is executed (e.g. the text of a position label).
+# - The Tk main loop drains the queue every frameInterval seconds with
+#   after(); a frame stops after maxFrameTime seconds, the rest of the
+#   queue is executed in the next frame, so the GUI stays responsive.
+# - Proxy(widget) returns a wrapper with the same insert/see/delete/config
+#   methods, so existing code keeps calling txtResp.insert(...) or
+#   label.config(text=...): config of an option and see() are coalesced,
+#   insert/delete are executed in order. cget() returns the value last
+#   posted, also before it has been drawn, without calling Tk: the options
+#   are read once when the proxy is created (in the Tk thread).
+#
+# Stats() returns the frame times (histogram), the queue backlog and the
+# number of posted, executed and coalesced calls.
+###############################################################################
+
+# 3rd party imports
+import time
+import itertools
+import collections
+
+# JPE imports
+from CpscInterfaces import CpscMetrics
+
+class CpscUiDispatcher:
+
+    def __init__(self, window, frameInterval=0.02, maxFrameTime=0.01):
+        self.window = window
+        self.frameInterval = frameInterval # [s] time between frames (50 frames/s)
+        self.maxFrameTime = maxFrameTime   # [s] executing time per frame
+        self.queue = collections.deque()   # (key, number, function, args, kwargs); append/popleft are thread safe
+        self.latest = {}                   # key: number of the last call posted with this key
+        self.numbers = itertools.count()
+        self.frameTimes = CpscMetrics.CpscLatencyHistogram()
+        self.frames = 0
+        self.posted = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.backlog = 0                   # Calls queued at the start of the last frame
+        self.maxBacklog = 0
+        self.window.after(int(1000 * frameInterval), self.Drain)
+
+    def Post(self, function, *args, key=None, **kwargs):
+        number = next(self.numbers)
+        if key is not None:
+            self.latest[key] = number
+        self.queue.append((key, number, function, args, kwargs))
+        self.posted += 1
+
+    def Drain(self):
+        # Executed by the Tk main loop
+        startTime = time.perf_counter()
+        try:
+            self.backlog = len(self.queue)
+            self.maxBacklog = max(self.maxBacklog, self.backlog)
+            while self.queue and time.perf_counter() - startTime < self.maxFrameTime:
+                key, number, function, args, kwargs = self.queue.popleft()
+                if key is not None and self.latest.get(key) != number: # A later call with this key is queued
+                    self.coalesced += 1
+                    continue
+                try:
+                    function(*args, **kwargs)
+                except Exception: # E.g. TclError of a destroyed widget (window closed); the other updates continue
+                    self.failed += 1
+                self.executed += 1
+            self.frames += 1
+            self.frameTimes.Add(time.perf_counter() - startTime)
+        finally:
+            self.window.after(int(1000 * self.frameInterval), self.Drain)
+
+    def Proxy(self, widget):
+        return CpscUiProxy(self, widget)
+
+    def Stats(self):
+        return {'frames': self.frames,
+                'posted': self.posted,
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'failed': self.failed,
+                'backlog': self.backlog,
+                'maxBacklog': self.maxBacklog,
+                'queued': len(self.queue),
+                'frame': self.frameTimes.Summary()}
+
+class CpscUiProxy:
+
+    def __init__(self, dispatcher, widget):
+        self.dispatcher = dispatcher
+        self.widget = widget
+        # Option: value read at creation or last posted with config() (aliases like bd are skipped)
+        self.options = {option: values[-1] for option, values in widget.configure().items() if len(values) == 5}
+
+    def __getattr__(self, name):
+        # Everything else (grid, pack, tag_configure, ...) directly on the widget
+        return getattr(self.widget, name)
+
+    def insert(self, *args):
+        self.dispatcher.Post(self.widget.insert, *args)
+
+    def delete(self, *args):
+        self.dispatcher.Post(self.widget.delete, *args)
+
+    def see(self, index):
+        self.dispatcher.Post(self.widget.see, index, key=(id(self), 'see'))
+
+    def config(self, **options):
+        self.options.update(options)
+        self.dispatcher.Post(self.widget.config, key=(id(self), tuple(sorted(options))), **options)
+
+    configure = config
+
+    def cget(self, option):
+        # Value last posted or read at creation; Tk is not called, so any thread may use it
+        if option not in self.options:
+            raise ValueError(f'Unknown option {option} of {self.widget}')
+        return self.options[option]
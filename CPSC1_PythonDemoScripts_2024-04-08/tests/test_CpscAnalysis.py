@@ -0,0 +1,103 @@
+###############################################################################
+# File name:      test_CpscAnalysis.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of AnalyseLegs and RunStatistics on a synthetic sequence run: two
+# runs of a move from Pos A to Pos B at constant speed with an overshoot
+# past Pos B, and back at half the speed with an overshoot past Pos A. Run
+# from the demo script directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import unittest
+import numpy as np
+
+# JPE imports
+from CpscInterfaces import CpscAnalysis
+
+posA = 0.0         # [m]
+posB = 0.001       # [m]
+speedAB = 0.0005   # [m/s]
+speedBA = 0.00025  # [m/s]
+overshootB = 8e-6  # [m]
+overshootA = 3e-6  # [m]
+sampleTime = 0.01  # [s]
+
+def Leg(start, end, speed, overshoot):
+    # Positions of one leg: constant speed from start to end, one sample past the target, one at the target
+    direction = 1 if end > start else -1
+    steps = int(round(abs(end - start) / speed / sampleTime))
+    positions = np.linspace(start, end, steps + 1)
+    return np.concatenate((positions, [end + direction * overshoot, end]))
+
+def Trajectory(runs=2, noise=0.0):
+    # Columns time, position, run, dir of a run log
+    positions, run, direction = [], [], []
+    for runNumber in range(1, runs + 1):
+        for legDirection, leg in ((1, Leg(posA, posB, speedAB, overshootB)), (0, Leg(posB, posA, speedBA, overshootA))):
+            positions.append(leg)
+            run.append(np.full(len(leg), runNumber))
+            direction.append(np.full(len(leg), legDirection))
+    position = np.concatenate(positions)
+    if noise:
+        position = position + np.random.default_rng(1).normal(0.0, noise, len(position))
+    time = sampleTime * np.arange(len(position))
+    return time, position, np.concatenate(run), np.concatenate(direction)
+
+class AnalyseLegsTest(unittest.TestCase):
+
+    def testLegs(self):
+        legs = CpscAnalysis.AnalyseLegs(*Trajectory(), posA=posA, posB=posB)
+        np.testing.assert_array_equal(legs['run'], [1, 1, 2, 2])
+        np.testing.assert_array_equal(legs['dir'], [1, 0, 1, 0])
+        np.testing.assert_array_equal(legs['samples'], [203, 403, 203, 403])
+        np.testing.assert_allclose(legs['duration'], [2.02, 4.02, 2.02, 4.02])
+        np.testing.assert_allclose(legs['distance'], [posB, -posB, posB, -posB], rtol=1e-9)
+
+    def testSpeeds(self):
+        legs = CpscAnalysis.AnalyseLegs(*Trajectory(), posA=posA, posB=posB)
+        np.testing.assert_allclose(legs['steadySpeed'], [speedAB, speedBA, speedAB, speedBA], rtol=1e-9)
+        np.testing.assert_allclose(legs['meanSpeed'], [posB / 2.02, posB / 4.02, posB / 2.02, posB / 4.02], rtol=1e-9)
+        # Fastest interval: from the overshoot back to the target
+        np.testing.assert_allclose(legs['maxSpeed'], [overshootB / sampleTime, overshootA / sampleTime] * 2, rtol=1e-6)
+
+    def testOvershoot(self):
+        legs = CpscAnalysis.AnalyseLegs(*Trajectory(), posA=posA, posB=posB)
+        np.testing.assert_allclose(legs['overshoot'], [overshootB, overshootA, overshootB, overshootA], rtol=1e-6)
+
+    def testOvershootWithoutTargets(self):
+        legs = CpscAnalysis.AnalyseLegs(*Trajectory())
+        self.assertTrue(np.all(np.isnan(legs['overshoot'])))
+
+    def testSteadySpeedWithNoise(self):
+        # Position noise of 1 um (a fifth of the 5 um between samples to Pos B) does not bias the steady speed
+        legs = CpscAnalysis.AnalyseLegs(*Trajectory(noise=1e-6), posA=posA, posB=posB)
+        np.testing.assert_allclose(legs['steadySpeed'], [speedAB, speedBA, speedAB, speedBA], rtol=0.02)
+
+    def testVelocityBetweenLegs(self):
+        time, position, run, direction = Trajectory()
+        starts = CpscAnalysis.LegStarts(run, direction)
+        midTime, velocity = CpscAnalysis.Velocity(time, position, starts)
+        self.assertTrue(np.all(np.isnan(velocity[starts[1:] - 1])))
+        self.assertEqual(np.count_nonzero(np.isnan(velocity)), len(starts) - 1)
+
+    def testNoSamples(self):
+        legs = CpscAnalysis.AnalyseLegs([], [], [], [])
+        for name in CpscAnalysis.legQuantities:
+            self.assertEqual(len(legs[name]), 0)
+        self.assertEqual(CpscAnalysis.RunStatistics(legs), {})
+
+    def testRunStatistics(self):
+        statistics = CpscAnalysis.RunStatistics(CpscAnalysis.AnalyseLegs(*Trajectory(), posA=posA, posB=posB))
+        self.assertEqual(statistics[1]['steadySpeed']['count'], 2)
+        self.assertAlmostEqual(CpscAnalysis.Mean(statistics, 1, 'steadySpeed'), speedAB)
+        self.assertAlmostEqual(CpscAnalysis.Mean(statistics, 0, 'steadySpeed'), speedBA)
+        self.assertAlmostEqual(CpscAnalysis.Mean(statistics, 1, 'overshoot'), overshootB)
+        self.assertAlmostEqual(CpscAnalysis.Mean(statistics, 0, 'overshoot'), overshootA)
+        self.assertTrue(np.isnan(CpscAnalysis.Mean(statistics, 2, 'overshoot')))
+
+if __name__ == '__main__':
+    unittest.main()
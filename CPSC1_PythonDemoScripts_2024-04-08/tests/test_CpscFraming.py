@@ -0,0 +1,102 @@
+###############################################################################
+# File name:      test_CpscFraming.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscFrameBuffer: responses split over several reads, several
+# responses in one read, \r\n split between reads, buffer compaction and
+# growth. Run from the demo script directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import unittest
+
+# JPE imports
+from CpscInterfaces.CpscFraming import CpscFrameBuffer
+
+def Frames(frameBuffer):
+    # All complete responses in the buffer
+    frames = []
+    frame = frameBuffer.NextFrame()
+    while frame is not None:
+        frames.append(frame)
+        frame = frameBuffer.NextFrame()
+    return frames
+
+class CpscFrameBufferTest(unittest.TestCase):
+
+    def testOneResponse(self):
+        frameBuffer = CpscFrameBuffer()
+        frameBuffer.Feed(b'OK\r\n')
+        self.assertEqual(Frames(frameBuffer), ['OK\r\n'])
+        self.assertEqual(len(frameBuffer), 0)
+
+    def testSeveralResponsesInOneRead(self):
+        frameBuffer = CpscFrameBuffer()
+        frameBuffer.Feed(b'0.1,0.2,0.3\r\nOK\r\nPiezo')
+        self.assertEqual(Frames(frameBuffer), ['0.1,0.2,0.3\r\n', 'OK\r\n'])
+        self.assertEqual(len(frameBuffer), len('Piezo'))
+
+    def testResponseSplitOverReads(self):
+        frameBuffer = CpscFrameBuffer()
+        for data in (b'CPSC1 ', b'simu', b'lator v0.1'):
+            frameBuffer.Feed(data)
+            self.assertIsNone(frameBuffer.NextFrame())
+        frameBuffer.Feed(b'\r\n')
+        self.assertEqual(Frames(frameBuffer), ['CPSC1 simulator v0.1\r\n'])
+
+    def testTerminatorSplitOverReads(self):
+        frameBuffer = CpscFrameBuffer()
+        frameBuffer.Feed(b'abc\r')
+        self.assertIsNone(frameBuffer.NextFrame())
+        frameBuffer.Feed(b'\ndef\r\n')
+        self.assertEqual(Frames(frameBuffer), ['abc\r\n', 'def\r\n'])
+
+    def testBareCrOrLfIsNoTerminator(self):
+        frameBuffer = CpscFrameBuffer()
+        frameBuffer.Feed(b'a\rb\nc')
+        self.assertIsNone(frameBuffer.NextFrame())
+        frameBuffer.Feed(b'\r\n')
+        self.assertEqual(Frames(frameBuffer), ['a\rb\nc\r\n'])
+
+    def testWriteViewCommit(self):
+        frameBuffer = CpscFrameBuffer()
+        view = frameBuffer.WriteView()
+        view[:9] = b'OK\r\nFAIL\r'
+        frameBuffer.Commit(9)
+        self.assertEqual(Frames(frameBuffer), ['OK\r\n'])
+        view = frameBuffer.WriteView(1)
+        view[:] = b'\n'
+        frameBuffer.Commit(1)
+        self.assertEqual(Frames(frameBuffer), ['FAIL\r\n'])
+
+    def testCompact(self):
+        # The unread part moves to the front when the free space at the end is too small
+        frameBuffer = CpscFrameBuffer(size=16)
+        frameBuffer.Feed(b'abcdefghij\r\nkl')
+        self.assertEqual(Frames(frameBuffer), ['abcdefghij\r\n'])
+        frameBuffer.Feed(b'mnopqrst\r\n')
+        self.assertEqual(Frames(frameBuffer), ['klmnopqrst\r\n'])
+        self.assertEqual(len(frameBuffer.buffer), 16)
+
+    def testGrow(self):
+        # A response larger than the buffer
+        frameBuffer = CpscFrameBuffer(size=16)
+        response = b'x' * 40 + b'\r\n'
+        for index in range(0, len(response), 7):
+            frameBuffer.Feed(response[index:index + 7])
+        self.assertEqual(Frames(frameBuffer), [str(response, 'ascii')])
+
+    def testFlush(self):
+        frameBuffer = CpscFrameBuffer()
+        frameBuffer.Feed(b'OK\r\nincomplete')
+        self.assertEqual(frameBuffer.NextFrame(), 'OK\r\n')
+        self.assertEqual(frameBuffer.Flush(), 'incomplete')
+        self.assertEqual(len(frameBuffer), 0)
+        frameBuffer.Feed(b'next\r\n')
+        self.assertEqual(Frames(frameBuffer), ['next\r\n'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+###############################################################################
+# File name:      test_CpscHistory.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscHistory: tags of lines inserted in parts, and the visible
+# lines of Window() (per filter, while the ring drops lines and after
+# Clear()) against a filtered copy of all lines. Run from the demo script
+# directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import random
+import unittest
+
+# JPE imports
+from CpscInterfaces.CpscHistory import CpscHistory
+
+class CpscHistoryTest(unittest.TestCase):
+
+    def testTags(self):
+        history = CpscHistory()
+        history.Insert('==> x\n')
+        history.Insert('<== y\n', 'r')
+        history.Insert('abc', 's')
+        history.Insert('\nd\n', 'e')
+        history.Insert('p', 's')
+        self.assertEqual([(text, tag) for lineTime, text, tag in history.Lines()],
+                         [('==> x', None), ('<== y', 'r'), ('abc', 's'), ('d', 'e'), ('p', 's')])
+
+    def testWindow(self):
+        random.seed(2)
+        history = CpscHistory(50)
+        for number in range(800):
+            history.Insert('line ' + str(number) + ('\n' if random.random() < 0.8 else ''), random.choice(['s', 'r', 'e', None]))
+            if number == 300:
+                history.Clear()
+            for tags in (None, ('e',), ('s', 'r'), (None,)):
+                lines = history.Lines(tags)
+                for top in (None, 0, 5, 40):
+                    start = max(len(lines) - 7, 0) if top is None else min(top, max(len(lines) - 7, 0))
+                    self.assertEqual(history.Window(tags, top, 7), (len(lines), start, lines[start:start + 7]))
+
+if __name__ == '__main__':
+    unittest.main()
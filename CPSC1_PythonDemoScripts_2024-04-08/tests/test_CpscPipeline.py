@@ -0,0 +1,64 @@
+###############################################################################
+# File name:      test_CpscPipeline.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscPipeline on an Ethernet interface to a CpscSimulator served
+# on a local TCP port: responses in order, failing callbacks, and after a
+# timeout the late responses are dropped, not matched to the next
+# commands. Run from the demo script directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import unittest
+
+# JPE imports
+from CpscInterfaces import CpscFactory
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+from CpscInterfaces.CpscPipeline import CpscPipeline
+from CpscInterfaces.CpscSimulator import CpscSimulator, ServeTcp
+
+waitTimeout = 5.0 # [s] upper limit for a response in these tests
+
+class CpscPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = CpscSimulator()
+        self.server = ServeTcp(self.simulator, tcpPort=0)
+        self.interface = CpscFactory.OpenCpsc('tcp://127.0.0.1:' + str(self.server.server_address[1]))
+        self.pipeline = CpscPipeline(self.interface, window=4)
+
+    def tearDown(self):
+        self.pipeline.Close()
+        self.interface.Close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def testWriteReadMany(self):
+        txMessages = ['FIV ' + str(module) for module in range(1, 7)] + ['GFS', '/VER']
+        self.assertEqual(self.pipeline.WriteReadMany(txMessages),
+                         [self.simulator.Execute(txMessage) for txMessage in txMessages])
+
+    def testFailingCallback(self):
+        def callback(rxMessage):
+            raise ValueError(rxMessage)
+        self.pipeline.Submit('GFS', callback)
+        self.assertEqual(self.pipeline.Submit('/VER').result(waitTimeout), 'CPSC1 simulator v0.1')
+        self.assertEqual(self.pipeline.failed, 1)
+
+    def testResponsesAfterTimeout(self):
+        self.interface.timeout = 0.1
+        self.simulator.latency = 0.15
+        futures = [self.pipeline.Submit(txMessage) for txMessage in ('FIV 1', 'FIV 2', 'FIV 3')]
+        for future in futures:
+            with self.assertRaises(CpscTimeoutError):
+                future.result(waitTimeout)
+        self.simulator.latency = 0.0
+        self.interface.timeout = waitTimeout
+        self.assertEqual(self.pipeline.WriteReadMany(['GFS', '/VER']), ['0', 'CPSC1 simulator v0.1'])
+        self.assertEqual(self.pipeline.discard, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+###############################################################################
+# File name:      test_CpscRingBuffer.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscRingBuffer: windows before and after the buffer wraps, views
+# versus copies, Since() and the channel helpers. Run from the demo script
+# directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import unittest
+import numpy as np
+
+# JPE imports
+from CpscInterfaces.CpscPoller import CpscSample
+from CpscInterfaces.CpscRingBuffer import CpscRingBuffer, Channel
+
+def Filled(capacity, count):
+    # Buffer with 'count' samples: time i, channel 1 + i % 2, value 10 * i
+    ringBuffer = CpscRingBuffer(capacity)
+    for index in range(count):
+        ringBuffer.Append(float(index), 1 + index % 2, 10.0 * index)
+    return ringBuffer
+
+class CpscRingBufferTest(unittest.TestCase):
+
+    def testNotFull(self):
+        ringBuffer = Filled(5, 3)
+        self.assertEqual(len(ringBuffer), 3)
+        self.assertEqual(ringBuffer.Dropped(), 0)
+        times, channels, values = ringBuffer.Last()
+        np.testing.assert_array_equal(times, [0, 1, 2])
+        np.testing.assert_array_equal(channels, [1, 2, 1])
+        np.testing.assert_array_equal(values, [0, 10, 20])
+
+    def testWrap(self):
+        # 8 samples in 5 places: samples 0..2 are overwritten, 3..7 are contiguous
+        ringBuffer = Filled(5, 8)
+        self.assertEqual(len(ringBuffer), 5)
+        self.assertEqual(ringBuffer.Count(), 8)
+        self.assertEqual(ringBuffer.Dropped(), 3)
+        times, channels, values = ringBuffer.Last()
+        np.testing.assert_array_equal(times, [3, 4, 5, 6, 7])
+        np.testing.assert_array_equal(values, [30, 40, 50, 60, 70])
+        np.testing.assert_array_equal(ringBuffer.Last(2)[0], [6, 7])
+
+    def testWrapMany(self):
+        ringBuffer = Filled(5, 23)
+        np.testing.assert_array_equal(ringBuffer.Last()[0], [18, 19, 20, 21, 22])
+
+    def testWindow(self):
+        ringBuffer = Filled(5, 8)
+        np.testing.assert_array_equal(ringBuffer.Window(4, 6)[0], [4, 5])
+        np.testing.assert_array_equal(ringBuffer.Window(0, 5)[0], [3, 4]) # Samples 0..2 are no longer stored
+        np.testing.assert_array_equal(ringBuffer.Window(6, 100)[0], [6, 7])
+        self.assertEqual(len(ringBuffer.Window(0, 2)[0]), 0)
+
+    def testViewAndCopy(self):
+        # A view shows the stored samples until capacity more are appended, a copy keeps them
+        ringBuffer = Filled(5, 8)
+        view = ringBuffer.Last()[0]
+        copy = ringBuffer.Copy(3)[0]
+        self.assertTrue(np.shares_memory(view, ringBuffer.times))
+        self.assertFalse(np.shares_memory(copy, ringBuffer.times))
+        for index in range(8, 13):
+            ringBuffer.Append(float(index), 1, 0.0)
+        np.testing.assert_array_equal(copy, [3, 4, 5, 6, 7])
+        self.assertFalse(np.array_equal(view, copy))
+
+    def testSince(self):
+        ringBuffer = Filled(5, 8)
+        np.testing.assert_array_equal(ringBuffer.Since(5.5)[0], [6, 7])
+        np.testing.assert_array_equal(ringBuffer.Since(0.0)[0], [3, 4, 5, 6, 7])
+
+    def testChannel(self):
+        times, values = Channel(Filled(5, 8).Last(), 2)
+        np.testing.assert_array_equal(times, [3, 5, 7])
+        np.testing.assert_array_equal(values, [30, 50, 70])
+
+    def testAppendSample(self):
+        ringBuffer = CpscRingBuffer(10)
+        sample = CpscSample(0, 1.0, 1.5, '0.001,0.002,0.003')
+        ringBuffer.AppendSample(sample)
+        times, channels, values = ringBuffer.Last()
+        np.testing.assert_array_equal(channels, [1, 2, 3])
+        np.testing.assert_allclose(values, [0.001, 0.002, 0.003])
+        self.assertEqual(len(set(times)), 1)
+
+    def testClear(self):
+        ringBuffer = Filled(5, 8)
+        ringBuffer.Clear()
+        self.assertEqual(len(ringBuffer), 0)
+        self.assertEqual(len(ringBuffer.Last()[0]), 0)
+
+if __name__ == '__main__':
+    unittest.main()
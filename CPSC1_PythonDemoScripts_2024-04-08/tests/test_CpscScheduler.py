@@ -0,0 +1,179 @@
+###############################################################################
+# File name:      test_CpscScheduler.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscScheduler on a link that executes the commands on a
+# CpscSimulator: priority order (STP before queued commands before polls,
+# also between the commands of a WriteReadMany() batch), deadline expiry, the WriteRead() timeout and failing callbacks. The worker
+# is held busy by a blocking job while the jobs under test are queued, so
+# the order does not depend on thread timing. Run from the demo script
+# directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import time
+import threading
+import unittest
+
+# JPE imports
+from CpscInterfaces import CpscScheduler
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+from CpscInterfaces.CpscSimulator import CpscSimulator
+
+waitTimeout = 5.0 # [s] upper limit for the worker in these tests
+
+class CpscSimulatedLink:
+
+    # Link (CpscSession interface) executing the commands on a simulator and
+    # recording them in the order of execution
+
+    def __init__(self):
+        self.simulator = CpscSimulator()
+        self.commands = []
+        self.onCommand = None # Called with every command before it is executed
+
+    def WriteRead(self, txMessage, txTermination=0):
+        if self.onCommand is not None:
+            self.onCommand(txMessage)
+        self.commands.append(txMessage)
+        return self.simulator.Execute(txMessage)
+
+    def WriteReadMany(self, txMessages, txTermination=0, window=8):
+        return [self.WriteRead(txMessage, txTermination) for txMessage in txMessages]
+
+class CpscSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.link = CpscSimulatedLink()
+        self.scheduler = CpscScheduler.CpscScheduler(self.link)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.scheduler.Close()
+
+    def Block(self):
+        # Keep the worker busy until self.release is set
+        started = threading.Event()
+        def run(link):
+            started.set()
+            self.release.wait(waitTimeout)
+        future = self.scheduler.SubmitCall(run)
+        self.assertTrue(started.wait(waitTimeout))
+        return future
+
+    def testWriteRead(self):
+        self.assertEqual(self.scheduler.WriteRead('/VER'), 'CPSC1 simulator v0.1')
+        self.assertEqual(self.scheduler.WriteReadMany(['GFS', 'FIV 1']), ['0', 'CADM2 v1.0.0 (simulated)'])
+
+    def testCommandsInOrderOfArrival(self):
+        self.Block()
+        futures = [self.scheduler.Submit(txMessage) for txMessage in ('FIV 1', 'GFS', '/VER')]
+        self.release.set()
+        for future in futures:
+            future.result(waitTimeout)
+        self.assertEqual(self.link.commands, ['FIV 1', 'GFS', '/VER'])
+
+    def testStopFirst(self):
+        # STP overtakes the commands queued before it
+        self.Block()
+        futures = [self.scheduler.Submit(txMessage) for txMessage in ('FIV 1', 'GFS', 'STP 1')]
+        self.release.set()
+        for future in futures:
+            future.result(waitTimeout)
+        self.assertEqual(self.link.commands, ['STP 1', 'FIV 1', 'GFS'])
+
+    def testStopDuringWriteReadMany(self):
+        # A STP submitted while a batch runs goes out after the command in flight
+        stopFutures = []
+        def onCommand(txMessage):
+            if txMessage == 'FIV 1':
+                stopFutures.append(self.scheduler.Submit('STP 1'))
+        self.link.onCommand = onCommand
+        self.assertEqual(self.scheduler.WriteReadMany(['FIV 1', 'GFS', '/VER']), ['CADM2 v1.0.0 (simulated)', '0', 'CPSC1 simulator v0.1'])
+        self.assertEqual(stopFutures[0].result(waitTimeout), 'OK')
+        self.assertEqual(self.link.commands, ['FIV 1', 'STP 1', 'GFS', '/VER'])
+
+    def testWriteReadManyFailure(self):
+        # The commands after a failed one are not sent
+        def onCommand(txMessage):
+            if txMessage == 'GFS':
+                raise IOError('link failure')
+        self.link.onCommand = onCommand
+        with self.assertRaises(IOError):
+            self.scheduler.WriteReadMany(['FIV 1', 'GFS', '/VER'])
+        self.link.onCommand = None
+        self.scheduler.WriteRead('FIV 2') # Runs after the rest of the batch would have
+        self.assertEqual(self.link.commands, ['FIV 1', 'FIV 2'])
+
+    def testExplicitPriority(self):
+        self.Block()
+        futures = [self.scheduler.Submit('GFS'), self.scheduler.Submit('/VER', priority=CpscScheduler.PRIORITY_STOP)]
+        self.release.set()
+        for future in futures:
+            future.result(waitTimeout)
+        self.assertEqual(self.link.commands, ['/VER', 'GFS'])
+
+    def testCommandBeforePoll(self):
+        # A due poll waits for queued commands (it is not overdue by a full interval)
+        self.Block()
+        polled = threading.Event()
+        self.scheduler.AddPoll('PGVA 1', 60.0, lambda response: polled.set())
+        future = self.scheduler.Submit('GFS')
+        self.release.set()
+        future.result(waitTimeout)
+        self.assertTrue(polled.wait(waitTimeout))
+        self.assertEqual(self.link.commands, ['GFS', 'PGVA 1'])
+
+    def testDeadlineExpired(self):
+        self.Block()
+        expired = self.scheduler.Submit('FIV 1', deadline=0.05)
+        inTime = self.scheduler.Submit('GFS', deadline=waitTimeout)
+        time.sleep(0.1)
+        self.release.set()
+        with self.assertRaises(CpscTimeoutError):
+            expired.result(waitTimeout)
+        self.assertEqual(inTime.result(waitTimeout), '0')
+        self.assertEqual(self.link.commands, ['GFS'])
+        self.assertEqual(self.scheduler.Stats()['expired'], 1)
+
+    def testDeadlineFirst(self):
+        # Equal priority: earliest deadline first, commands without deadline last
+        self.Block()
+        futures = [self.scheduler.Submit('GFS'), self.scheduler.Submit('FIV 1', deadline=2 * waitTimeout),
+                   self.scheduler.Submit('/VER', deadline=waitTimeout)]
+        self.release.set()
+        for future in futures:
+            future.result(waitTimeout)
+        self.assertEqual(self.link.commands, ['/VER', 'FIV 1', 'GFS'])
+
+    def testWriteReadTimeout(self):
+        # The waiting command is cancelled and never sent
+        self.scheduler.timeout = 0.05
+        blocker = self.Block()
+        with self.assertRaises(CpscTimeoutError):
+            self.scheduler.WriteRead('GFS')
+        self.release.set()
+        blocker.result(waitTimeout)
+        self.scheduler.timeout = waitTimeout
+        self.assertEqual(self.scheduler.WriteRead('/VER'), 'CPSC1 simulator v0.1')
+        self.assertEqual(self.link.commands, ['/VER'])
+
+    def testFailingCallbacks(self):
+        # A failing callback or enabled() is counted, the worker keeps running
+        def callback(response):
+            raise ValueError(response)
+        def enabled():
+            raise RuntimeError('widget destroyed')
+        self.scheduler.AddPoll('PGVA 1', 0.01, callback)
+        self.scheduler.AddPoll('CGVA 1', 0.01, callback, enabled=enabled)
+        time.sleep(0.1)
+        self.assertEqual(self.scheduler.WriteRead('/VER'), 'CPSC1 simulator v0.1')
+        self.assertNotIn('CGVA 1', self.link.commands)
+        self.assertGreater(self.scheduler.Stats()['failed'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+###############################################################################
+# File name:      test_CpscSession.py
+# Creation:       2026-10-18
+# Author:         JPE
+# Python version: 3.9
+#
+# Tests of CpscSession against a CpscSimulator served on a local TCP port:
+# after a timed out command (WriteRead() or a WriteReadMany() window) the
+# next command gets its own response, not the late one. Run from the demo
+# script directory:
+#   python -m unittest discover tests   (or python -m pytest tests)
+###############################################################################
+
+# 3rd party imports
+import time
+import unittest
+
+# JPE imports
+from CpscInterfaces import CpscSession
+from CpscInterfaces.CpscErrors import CpscTimeoutError
+from CpscInterfaces.CpscSimulator import CpscSimulator, ServeTcp
+
+class CpscSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = CpscSimulator()
+        self.server = ServeTcp(self.simulator, tcpPort=0)
+        self.session = CpscSession.CpscSession('tcp://127.0.0.1:' + str(self.server.server_address[1]))
+        self.session.Open()
+        self.session.interface.timeout = 0.1
+
+    def tearDown(self):
+        self.session.Close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def testWriteRead(self):
+        self.assertEqual(self.session.WriteRead('/VER', 1), 'CPSC1 simulator v0.1')
+        self.assertEqual(self.session.WriteRead('GFS\r\n', 0), '0\r\n')
+
+    def testResponseAfterTimeout(self):
+        self.simulator.latency = 0.3
+        with self.assertRaises(CpscTimeoutError):
+            self.session.WriteRead('/VER', 1)
+        self.simulator.latency = 0.0
+        self.session.interface.timeout = 2.0
+        self.assertEqual(self.session.WriteRead('GFS', 1), '0') # Waits for the late /VER response first
+        self.assertEqual(self.session.WriteRead('FIV 1', 1), 'CADM2 v1.0.0 (simulated)')
+        self.assertEqual(self.session.late, 0)
+
+    def testResponseAfterLateArrived(self):
+        # The late response is already received when the next command is sent
+        self.simulator.latency = 0.2
+        with self.assertRaises(CpscTimeoutError):
+            self.session.WriteRead('/VER', 1)
+        time.sleep(0.3)
+        self.simulator.latency = 0.0
+        self.assertEqual(self.session.WriteRead('GFS', 1), '0')
+
+    def testWriteReadManyTimeout(self):
+        # All commands in flight are late, not only the one that timed out
+        self.simulator.latency = 0.15
+        with self.assertRaises(CpscTimeoutError):
+            self.session.WriteReadMany(['FIV 1', 'FIV 2', 'FIV 3', 'FIV 4'], 1)
+        self.assertEqual(self.session.late, 4)
+        self.simulator.latency = 0.0
+        self.session.interface.timeout = 2.0
+        self.assertEqual(self.session.WriteRead('GFS', 1), '0')
+        self.assertEqual(self.session.WriteReadMany(['/VER', 'GFS'], 1), ['CPSC1 simulator v0.1', '0'])
+
+if __name__ == '__main__':
+    unittest.main()